@@ -22,10 +22,13 @@ ALTER TABLE animais
 ADD COLUMN fazenda_id INT NULL,
 ADD CONSTRAINT fk_animal_fazenda FOREIGN KEY (fazenda_id) REFERENCES fazendas(id);
 
--- Inserir algumas fazendas de exemplo
+-- Inserir algumas fazendas de exemplo (só as que ainda não existem, para
+-- que a migração possa ser reaplicada)
 INSERT INTO fazendas (nome, municipio, estado, area_total, area_pastagem, capacidade_ua, responsavel)
-VALUES 
-    ('Fazenda São João', 'Cuiabá', 'MT', 1500.00, 1200.00, 1000, 'João Silva'),
-    ('Fazenda Boa Esperança', 'Rondonópolis', 'MT', 2200.50, 1800.00, 1500, 'Maria Oliveira'),
-    ('Sítio Recanto', 'Várzea Grande', 'MT', 150.00, 120.00, 100, 'Pedro Santos')
-ON DUPLICATE KEY UPDATE id = id;
\ No newline at end of file
+SELECT exemplos.* FROM (
+    SELECT 'Fazenda São João' AS nome, 'Cuiabá' AS municipio, 'MT' AS estado,
+           1500.00 AS area_total, 1200.00 AS area_pastagem, 1000 AS capacidade_ua, 'João Silva' AS responsavel
+    UNION ALL SELECT 'Fazenda Boa Esperança', 'Rondonópolis', 'MT', 2200.50, 1800.00, 1500, 'Maria Oliveira'
+    UNION ALL SELECT 'Sítio Recanto', 'Várzea Grande', 'MT', 150.00, 120.00, 100, 'Pedro Santos'
+) exemplos
+WHERE NOT EXISTS (SELECT 1 FROM fazendas f WHERE f.nome = exemplos.nome);
\ No newline at end of file
@@ -0,0 +1,10 @@
+-- Índices FULLTEXT para a busca de animais e fazendas
+-- O parser ngram (tokens de 2 caracteres por padrão) permite encontrar
+-- trechos no meio das palavras, como o LIKE '%termo%' fazia, mas usando índice.
+USE pecuaria_db;
+
+ALTER TABLE animais
+ADD FULLTEXT INDEX ft_animais_busca (codigo, tipo, raca, observacoes) WITH PARSER ngram;
+
+ALTER TABLE fazendas
+ADD FULLTEXT INDEX ft_fazendas_busca (nome, municipio, estado, responsavel) WITH PARSER ngram;
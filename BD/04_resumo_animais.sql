@@ -0,0 +1,26 @@
+-- Tabela de resumo dos animais, mantida pelos models a cada inclusão,
+-- alteração ou exclusão. Os relatórios leem daqui em vez de agrupar a
+-- tabela animais inteira a cada chamada.
+-- raca e fazenda_id nulos são guardados como '' e 0 para fazer parte da chave.
+USE pecuaria_db;
+
+CREATE TABLE IF NOT EXISTS animais_resumo (
+    tipo VARCHAR(50) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    raca VARCHAR(100) NOT NULL DEFAULT '',
+    fazenda_id INT NOT NULL DEFAULT 0,
+    total INT NOT NULL DEFAULT 0,
+    peso_soma DECIMAL(16,2) NOT NULL DEFAULT 0,
+    peso_contagem INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tipo, status, raca, fazenda_id)
+);
+
+-- Carga inicial a partir dos animais existentes (pode ser reaplicada)
+DELETE FROM animais_resumo;
+INSERT INTO animais_resumo (tipo, status, raca, fazenda_id, total, peso_soma, peso_contagem)
+SELECT tipo, status, COALESCE(raca, ''), COALESCE(fazenda_id, 0),
+       COUNT(*), COALESCE(SUM(peso), 0), COUNT(peso)
+FROM animais
+GROUP BY tipo, status, COALESCE(raca, ''), COALESCE(fazenda_id, 0)
+ON DUPLICATE KEY UPDATE total = VALUES(total), peso_soma = VALUES(peso_soma),
+                        peso_contagem = VALUES(peso_contagem);
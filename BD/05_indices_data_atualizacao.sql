@@ -0,0 +1,7 @@
+-- Índices para MAX(data_atualizacao), usado nos validadores ETag/Last-Modified
+-- de /api/animais e /api/fazendas
+USE pecuaria_db;
+
+ALTER TABLE animais ADD INDEX idx_animais_data_atualizacao (data_atualizacao);
+
+ALTER TABLE fazendas ADD INDEX idx_fazendas_data_atualizacao (data_atualizacao);
@@ -0,0 +1,25 @@
+-- Tarefas em segundo plano (backup, recálculo do resumo, exportações).
+-- Os workers do gunicorn leem e atualizam esta tabela; o limite de tarefas
+-- simultâneas por tipo é controlado com GET_LOCK sobre ela.
+USE pecuaria_db;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    status ENUM('pendente', 'executando', 'concluido', 'erro', 'cancelado') NOT NULL DEFAULT 'pendente',
+    parametros JSON NULL,
+    usuario_id INT NULL,
+    progresso DECIMAL(5,2) NULL COMMENT 'Percentual concluído, quando conhecido',
+    mensagem VARCHAR(255) NULL,
+    resultado JSON NULL,
+    erro TEXT NULL,
+    cancelar BOOLEAN NOT NULL DEFAULT FALSE,
+    worker VARCHAR(150) NULL COMMENT 'host:pid do worker que executa a tarefa',
+    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    iniciado_em DATETIME NULL,
+    concluido_em DATETIME NULL,
+    expira_em DATETIME NULL COMMENT 'A tarefa e o arquivo de resultado são removidos depois disso',
+    INDEX idx_jobs_tipo_status (tipo, status),
+    INDEX idx_jobs_usuario (usuario_id, id),
+    INDEX idx_jobs_expira_em (expira_em)
+);
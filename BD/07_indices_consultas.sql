@@ -0,0 +1,17 @@
+-- Índices para os filtros e agrupamentos mais usados de animais e para a
+-- listagem de fazendas ativas ordenada por nome. Criados sem bloquear
+-- leituras nem escritas (ALGORITHM=INPLACE, LOCK=NONE); um comando por
+-- índice, para que um índice já existente não impeça a criação dos outros.
+USE pecuaria_db;
+
+ALTER TABLE animais ADD INDEX idx_animais_tipo (tipo), ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE animais ADD INDEX idx_animais_status (status), ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE animais ADD INDEX idx_animais_raca (raca), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- A chave estrangeira já criou um índice implícito em fazenda_id; o InnoDB
+-- o descarta quando um índice explícito equivalente é criado
+ALTER TABLE animais ADD INDEX idx_animais_fazenda_id (fazenda_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE fazendas ADD INDEX idx_fazendas_ativo_nome (ativo, nome), ALGORITHM=INPLACE, LOCK=NONE;
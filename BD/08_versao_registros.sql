@@ -0,0 +1,10 @@
+-- Versão de cada registro para controle de concorrência otimista: PUT/PATCH
+-- com If-Match só alteram a linha se a versão ainda for a lida pelo cliente
+-- (UPDATE ... WHERE id = ? AND versao = ?), e toda alteração incrementa a
+-- versão. Coluna no fim da tabela com valor padrão: ALGORITHM=INSTANT altera
+-- só o dicionário de dados, sem reescrever a tabela.
+USE pecuaria_db;
+
+ALTER TABLE animais ADD COLUMN versao INT UNSIGNED NOT NULL DEFAULT 1, ALGORITHM=INSTANT;
+
+ALTER TABLE fazendas ADD COLUMN versao INT UNSIGNED NOT NULL DEFAULT 1, ALGORITHM=INSTANT;
@@ -0,0 +1,9 @@
+-- Sinal de vida das tarefas em execução: o worker que executa a tarefa
+-- atualiza heartbeat_em periodicamente; tarefas 'executando' sem sinal há
+-- mais de JOBS_HEARTBEAT_LIMITE segundos são de um worker que morreu (em
+-- qualquer host) e passam a 'erro', liberando a vaga do tipo.
+USE pecuaria_db;
+
+ALTER TABLE jobs ADD COLUMN heartbeat_em DATETIME NULL, ALGORITHM=INSTANT;
+
+ALTER TABLE jobs ADD INDEX idx_jobs_status_heartbeat (status, heartbeat_em), ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,12 @@
+-- Contador de alterações por conjunto de dados ('animais', 'fazendas'),
+-- incrementado depois de cada escrita confirmada. É a base do ETag das
+-- listagens: ao contrário de MAX(data_atualizacao), com precisão de
+-- segundos, muda a cada alteração e é o mesmo em todos os workers.
+USE pecuaria_db;
+
+CREATE TABLE IF NOT EXISTS versoes_dados (
+    nome VARCHAR(50) PRIMARY KEY,
+    versao BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO versoes_dados (nome, versao) VALUES ('animais', 0), ('fazendas', 0);
@@ -1,9 +1,16 @@
 from flask import Flask, render_template, send_from_directory
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import time
 from config import Config
 from extensions import bcrypt
-from routes import usuarios, auth, animais, relatorios, main, admin, fazendas
+from utils.database import init_request_connection
+from utils.cache import init_cache
+from utils.logs import init_logging
+from utils.metrics import init_metrics
+from utils.query_stats import init_query_stats
+from utils.jobs import init_jobs
+from routes import usuarios, auth, animais, relatorios, main, admin, fazendas, jobs
 
 
 app = Flask(__name__, static_folder='static')
@@ -13,7 +20,17 @@ def send_static(path):
     return send_from_directory('static', path)
 
 app.config.from_object(Config)
+init_logging(app)
+
+# Atrás de proxies reversos, ler o IP real do cliente de X-Forwarded-For
+if Config.PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_COUNT, x_proto=Config.PROXY_COUNT)
 bcrypt.init_app(app)
+init_metrics(app)
+init_request_connection(app)
+init_cache(app)
+init_query_stats(app)
+init_jobs(app)
 
 # Adicionar cache_buster ao contexto de todos os templates
 @app.context_processor
@@ -27,6 +44,7 @@ app.register_blueprint(animais.bp)
 app.register_blueprint(relatorios.bp)
 app.register_blueprint(usuarios.bp)
 app.register_blueprint(fazendas.bp)
+app.register_blueprint(jobs.bp)
 app.register_blueprint(admin.bp, url_prefix='/admin')
 
 ### Debug/Desenv ###
@@ -0,0 +1,68 @@
+"""
+Backup lógico do banco (usuarios, fazendas, animais) e restauração.
+
+O backup é gravado em BACKUP_DIR (padrão: backups/) e roda como a tarefa
+'backup' (registrada em jobs, uma por vez, também com as do app). Os backups
+incrementais contêm só as linhas alteradas desde o backup anterior; para
+restaurar, aplique o completo e depois os incrementais, em ordem.
+
+Uso:
+python backup.py criar [--incremental | --desde "2026-01-01 00:00:00"]
+python backup.py listar
+python backup.py restaurar backups/backup-...-completo.ndjson.gz [incrementais...] [--lote 1000]
+"""
+import argparse
+import sys
+from utils.backup import ler_status, listar_backups, restaurar_backup
+from utils.jobs import executar_agora
+from models.resumo import ResumoAnimais
+
+def main():
+    parser = argparse.ArgumentParser(description="Backup lógico e restauração do banco de dados")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    criar = subparsers.add_parser('criar', help="gera um backup completo ou incremental")
+    criar.add_argument('--incremental', action='store_true',
+                       help="só as linhas alteradas desde o último backup concluído")
+    criar.add_argument('--desde', help="só as linhas alteradas a partir desta data/hora")
+
+    subparsers.add_parser('listar', help="lista os backups e o estado de cada um")
+
+    restaurar = subparsers.add_parser('restaurar', help="restaura um ou mais arquivos de backup")
+    restaurar.add_argument('arquivos', nargs='+')
+    restaurar.add_argument('--lote', type=int, default=1000, help="linhas por INSERT em lote")
+    args = parser.parse_args()
+
+    if args.comando == 'criar':
+        try:
+            resultado = executar_agora('backup', {"incremental": args.incremental, "desde": args.desde})
+        except RuntimeError as e:
+            print(f"Backup não iniciado: {e}")
+            return 1
+        status = ler_status(resultado['backup_id'])
+        print(f"Backup {status['id']}: {status['linhas']} linhas, {status['bytes']} bytes")
+        for tabela, linhas in status['tabelas'].items():
+            print(f"  {tabela}: {linhas}")
+        return 0
+
+    if args.comando == 'listar':
+        for backup in listar_backups():
+            print(f"{backup['id']}  {backup['status']:<12} {backup['linhas']:>10} linhas  até {backup['ate']}")
+        return 0
+
+    for arquivo in args.arquivos:
+        print(f"Restaurando {arquivo}...")
+        totais = restaurar_backup(
+            arquivo, args.lote,
+            ao_progredir=lambda tabela, linhas: print(f"  {tabela}: {linhas}", end='\r')
+        )
+        print()
+        for tabela, linhas in totais.items():
+            print(f"  {tabela}: {linhas} linhas")
+
+    resultado = ResumoAnimais.rebuild()
+    print(f"Resumo recalculado: {resultado['grupos']} grupos")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
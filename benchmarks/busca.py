@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca de animais: índice FULLTEXT (Animal.search) contra o
+caminho antigo com LIKE '%termo%' (Animal.search_like).
+
+Insere um rebanho sintético com códigos BENCH-*, mede as duas buscas para
+uma lista de termos e remove os registros no final.
+
+Requisitos:
+- Banco configurado (config.json) com BD/03_busca_fulltext.sql aplicado
+
+Uso:
+python benchmarks/busca.py [--animais 200000] [--repeticoes 5] [--seed 42]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.animal import Animal
+from benchmarks.dados import gerar_rebanho, remover_rebanho
+
+PREFIXO = 'BENCH-'
+TERMOS = ['Nelore', 'BENCH-0001', 'aftosa', 'leiteira', 'Santa', 'desmamado']
+
+
+def medir(funcao, termo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(termo, 100, 0)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--animais', type=int, default=200000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.animais} animais...")
+    gerar_rebanho(args.animais, args.seed, PREFIXO)
+    try:
+        print(f"{'termo':<14} {'LIKE (ms)':>12} {'FULLTEXT (ms)':>14} {'ganho':>8}")
+        for termo in TERMOS:
+            like = medir(Animal.search_like, termo, args.repeticoes)
+            fulltext = medir(Animal.search, termo, args.repeticoes)
+            print(f"{termo:<14} {like:>12.1f} {fulltext:>14.1f} {like / fulltext:>7.1f}x")
+    finally:
+        print("Removendo animais gerados...")
+        remover_rebanho(PREFIXO)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP da API: sobe o app no gunicorn, dispara uma mistura de
+requisições (login, listagem, busca, relatórios e escritas) com concorrência
+fixa e mede latência (p50/p95/p99) e vazão por endpoint.
+
+Insere um rebanho sintético com códigos CARGA-* e usuários
+carga-NNNNN@sintetico.local antes da rodada e remove os registros no final
+(use --manter para reaproveitá-los na próxima rodada). Cada usuário virtual
+entra com a sua própria conta, e a operação 'login' alterna entre as contas.
+O resultado é gravado em JSON, junto com o commit testado, para comparar
+rodadas entre commits com --comparar.
+
+Requisitos:
+- Banco configurado (config.json) e gunicorn instalado
+- Todos os logins saem do mesmo IP: para não medir respostas 429 em vez do
+  bcrypt, os logins são espaçados para caber em LOGIN_LIMITE_IP_* (a
+  operação 'login' dá a vez a outra quando não há folga). Respostas fora
+  de 2xx contam como erro
+
+Uso:
+python benchmarks/carga.py [--animais 100000] [--concorrencia 16] [--duracao 60]
+                           [--workers 4] [--usuarios 50] [--saida resultado.json]
+                           [--comparar anterior.json]
+"""
+
+import argparse
+import http.cookiejar
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+from config import Config
+from gerar_dados import SENHA_PADRAO
+from benchmarks.dados import (
+    TIPOS, gerar_rebanho, gerar_usuarios, racas, remover_rebanho, remover_usuarios
+)
+
+PREFIXO = 'CARGA-'
+TERMOS = ['Nelore', 'CARGA-00012', 'aftosa', 'leiteira', 'Santa', 'Duroc']
+
+# Peso relativo de cada operação na mistura de tráfego
+MISTURA = {
+    'login': 2,
+    'listar_animais': 25,
+    'paginar_animais': 10,
+    'buscar_animais': 15,
+    'listar_fazendas': 8,
+    'relatorio_tipo': 8,
+    'relatorio_resumo': 7,
+    'dashboard': 5,
+    'criar_animal': 8,
+    'atualizar_animal': 8,
+    'excluir_animal': 4,
+}
+
+
+class RitmoLogin:
+    """
+    Balde de fichas com folga sobre o limite de login por IP do servidor,
+    compartilhado pelos usuários virtuais (todos saem do mesmo IP)
+    """
+
+    def __init__(self, rajada, por_minuto, folga=0.8):
+        self.capacidade = max(1.0, rajada * folga)
+        self.taxa = por_minuto * folga / 60
+        self.fichas = self.capacidade
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def tentar(self):
+        """Consome uma ficha se houver; senão devolve os segundos até a próxima"""
+        with self.lock:
+            agora = time.monotonic()
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+            if self.fichas >= 1:
+                self.fichas -= 1
+                return 0
+            return (1 - self.fichas) / self.taxa
+
+    def aguardar(self):
+        while True:
+            espera = self.tentar()
+            if not espera:
+                return
+            time.sleep(espera)
+
+
+class Cliente:
+    """Usuário virtual: mantém a própria sessão (cookie) e os animais que criou"""
+
+    def __init__(self, base, contas, rng):
+        self.base = base
+        self.contas = contas
+        self.rng = rng
+        self.criados = []
+        self.cursor = None
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies)
+        )
+        self.sequencia = 0
+
+    def requisitar(self, metodo, caminho, dados=None):
+        corpo = None
+        headers = {'Accept': 'application/json'}
+        if dados is not None:
+            corpo = json.dumps(dados).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base + caminho, data=corpo, headers=headers, method=metodo)
+        try:
+            with self.opener.open(req, timeout=30) as resposta:
+                return resposta.status, resposta.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self):
+        # Uma conta diferente a cada login, para não esbarrar no limite por email
+        return self.requisitar('POST', '/login', {'email': self.contas(), 'senha': SENHA_PADRAO})
+
+    def listar_animais(self):
+        return self.requisitar('GET', '/api/animais?limit=50')
+
+    def paginar_animais(self):
+        caminho = '/api/animais?limit=50'
+        if self.cursor:
+            caminho += '&after=' + urllib.request.quote(self.cursor)
+        status, corpo = self.requisitar('GET', caminho)
+        self.cursor = None
+        if status == 200:
+            self.cursor = json.loads(corpo).get('next_cursor')
+        return status, corpo
+
+    def buscar_animais(self):
+        termo = urllib.request.quote(self.rng.choice(TERMOS))
+        return self.requisitar('GET', f'/api/animais?busca={termo}&limit=50')
+
+    def listar_fazendas(self):
+        return self.requisitar('GET', '/api/fazendas?limit=50')
+
+    def relatorio_tipo(self):
+        return self.requisitar('GET', '/api/relatorios/animais_por_tipo')
+
+    def relatorio_resumo(self):
+        return self.requisitar('GET', '/api/relatorios/resumo')
+
+    def dashboard(self):
+        return self.requisitar('GET', '/api/dashboard/stats')
+
+    def criar_animal(self):
+        self.sequencia += 1
+        tipo = self.rng.choice(list(TIPOS))
+        status, corpo = self.requisitar('POST', '/api/animais', {
+            'codigo': f"{PREFIXO}T{threading.get_ident()}-{self.sequencia}",
+            'tipo': tipo,
+            'raca': self.rng.choice(racas(tipo)),
+            'peso': round(self.rng.uniform(30, 900), 2),
+            'sexo': self.rng.choice('MF'),
+            'status': 'Ativo',
+        })
+        if status == 201:
+            self.criados.append(json.loads(corpo)['id'])
+        return status, corpo
+
+    def atualizar_animal(self):
+        if not self.criados:
+            return self.criar_animal()
+        id = self.rng.choice(self.criados)
+        return self.requisitar('PUT', f'/api/animais/{id}', {
+            'peso': round(self.rng.uniform(30, 900), 2),
+            'observacoes': 'Pesagem do teste de carga',
+        })
+
+    def excluir_animal(self):
+        if not self.criados:
+            return self.criar_animal()
+        id = self.criados.pop(self.rng.randrange(len(self.criados)))
+        return self.requisitar('DELETE', f'/api/animais/{id}')
+
+
+def percentil(ordenados, p):
+    """Percentil pelo método do posto mais próximo"""
+    if not ordenados:
+        return None
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados))) - 1))
+    return round(ordenados[indice], 2)
+
+
+def resumir(amostras, duracao):
+    """amostras: lista de (latência em ms, status)"""
+    latencias = sorted(ms for ms, _ in amostras)
+    status = {}
+    for _, codigo in amostras:
+        status[str(codigo)] = status.get(str(codigo), 0) + 1
+    erros = sum(n for codigo, n in status.items() if not 200 <= int(codigo) < 300)
+    return {
+        'requisicoes': len(amostras),
+        'erros': erros,
+        'status': status,
+        'rps': round(len(amostras) / duracao, 2) if duracao else 0,
+        'media_ms': round(sum(latencias) / len(latencias), 2) if latencias else None,
+        'p50_ms': percentil(latencias, 50),
+        'p95_ms': percentil(latencias, 95),
+        'p99_ms': percentil(latencias, 99),
+        'max_ms': round(latencias[-1], 2) if latencias else None,
+    }
+
+
+def executar(base, args):
+    operacoes = list(MISTURA)
+    pesos = [MISTURA[nome] for nome in operacoes]
+    amostras = {nome: [] for nome in operacoes}
+    lock = threading.Lock()
+    sem_login = [nome for nome in operacoes if nome != 'login']
+    pesos_sem_login = [MISTURA[nome] for nome in sem_login]
+    ritmo = RitmoLogin(Config.LOGIN_LIMITE_IP_RAJADA, Config.LOGIN_LIMITE_IP_POR_MINUTO)
+    proxima = itertools.cycle(args.contas)
+    proxima_lock = threading.Lock()
+
+    def contas():
+        with proxima_lock:
+            return next(proxima)
+
+    # Login inicial de cada usuário virtual, no ritmo do limite por IP
+    clientes = [Cliente(base, contas, random.Random(args.seed + i)) for i in range(args.concorrencia)]
+    for cliente in clientes:
+        ritmo.aguardar()
+        status, corpo = cliente.login()
+        if status != 200:
+            sys.exit(f"Login falhou ({status}): {corpo.decode('utf-8', 'replace')}")
+    inicio_medicao = time.monotonic() + args.aquecimento
+    fim = inicio_medicao + args.duracao
+
+    def usuario_virtual(cliente):
+        while True:
+            agora = time.monotonic()
+            if agora >= fim:
+                break
+            nome = cliente.rng.choices(operacoes, pesos)[0]
+            if nome == 'login' and ritmo.tentar():
+                # Sem folga no limite de login: outra operação no lugar
+                nome = cliente.rng.choices(sem_login, pesos_sem_login)[0]
+            inicio = time.perf_counter()
+            try:
+                status, _ = getattr(cliente, nome)()
+            except (urllib.error.URLError, OSError):
+                status = 0
+            ms = (time.perf_counter() - inicio) * 1000
+            # Requisições do aquecimento não entram no resultado
+            if agora >= inicio_medicao:
+                with lock:
+                    amostras[nome].append((ms, status))
+
+    threads = [
+        threading.Thread(target=usuario_virtual, args=(cliente,), daemon=True)
+        for cliente in clientes
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Excluir o que sobrou das escritas para não acumular entre rodadas
+    for cliente in clientes:
+        for id in cliente.criados:
+            cliente.requisitar('DELETE', f'/api/animais/{id}')
+
+    endpoints = {nome: resumir(lista, args.duracao) for nome, lista in amostras.items() if lista}
+    todas = [a for lista in amostras.values() for a in lista]
+    return endpoints, resumir(todas, args.duracao)
+
+
+def iniciar_gunicorn(args):
+    comando = [
+        'gunicorn', 'app:app',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--bind', f'127.0.0.1:{args.porta}',
+        '--log-level', 'warning',
+    ]
+    processo = subprocess.Popen(comando, cwd=RAIZ)
+    base = f'http://127.0.0.1:{args.porta}'
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"gunicorn encerrou com código {processo.returncode}")
+        try:
+            urllib.request.urlopen(base + '/login', timeout=2).close()
+            return processo, base
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    processo.terminate()
+    raise RuntimeError("gunicorn não respondeu em 30s")
+
+
+def commit_atual():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=RAIZ, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(endpoints, total):
+    print(f"{'endpoint':<20} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'erros':>6}")
+    for nome, r in list(endpoints.items()) + [('TOTAL', total)]:
+        print(f"{nome:<20} {r['requisicoes']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['erros']:>6}")
+
+
+def comparar(atual, anterior):
+    """Variação percentual de rps e p95 em relação a uma rodada anterior"""
+    print(f"\nComparação com {anterior.get('commit') or '?'} ({anterior.get('data')}):")
+    print(f"{'endpoint':<20} {'rps':>10} {'p95':>10}")
+    linhas = dict(atual['endpoints'], TOTAL=atual['total'])
+    base = dict(anterior['endpoints'], TOTAL=anterior['total'])
+    for nome, r in linhas.items():
+        if nome not in base:
+            continue
+        b = base[nome]
+        rps = (r['rps'] / b['rps'] - 1) * 100 if b['rps'] else 0
+        p95 = (r['p95_ms'] / b['p95_ms'] - 1) * 100 if b['p95_ms'] else 0
+        print(f"{nome:<20} {rps:>+9.1f}% {p95:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--animais', type=int, default=100000,
+                        help='Tamanho do rebanho sintético (0 para não inserir)')
+    parser.add_argument('--concorrencia', type=int, default=16, help='Usuários virtuais simultâneos')
+    parser.add_argument('--duracao', type=float, default=60, help='Segundos de medição')
+    parser.add_argument('--aquecimento', type=float, default=5, help='Segundos descartados no início')
+    parser.add_argument('--workers', type=int, default=4, help='Workers do gunicorn')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker do gunicorn')
+    parser.add_argument('--porta', type=int, default=8099)
+    parser.add_argument('--url', help='Usar um servidor já em execução em vez de subir o gunicorn')
+    parser.add_argument('--usuarios', type=int, default=50,
+                        help='Contas sintéticas usadas nos logins (ao menos a concorrência)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--manter', action='store_true', help='Não remover o rebanho sintético no final')
+    parser.add_argument('--saida', help='Arquivo JSON do resultado (padrão: carga-<data>-<commit>.json)')
+    parser.add_argument('--comparar', help='Resultado anterior (JSON) para comparação')
+    args = parser.parse_args()
+
+    if args.animais:
+        print(f"Inserindo {args.animais} animais sintéticos...")
+        gerar_rebanho(args.animais, args.seed, PREFIXO)
+    args.usuarios = max(args.usuarios, args.concorrencia)
+    print(f"Inserindo {args.usuarios} usuários sintéticos...")
+    args.contas = gerar_usuarios(args.usuarios, PREFIXO)
+
+    processo = None
+    try:
+        if args.url:
+            base = args.url.rstrip('/')
+        else:
+            processo, base = iniciar_gunicorn(args)
+
+        print(f"Carga: {args.concorrencia} usuários virtuais por {args.duracao:.0f}s em {base}")
+        endpoints, total = executar(base, args)
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+        if not args.manter:
+            remover_usuarios(PREFIXO)
+            if args.animais:
+                remover_rebanho(PREFIXO)
+
+    if not total['requisicoes']:
+        sys.exit("Nenhuma requisição medida; verifique o login e a duração")
+
+    commit = commit_atual()
+    resultado = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {
+            'animais': args.animais,
+            'concorrencia': args.concorrencia,
+            'duracao': args.duracao,
+            'workers': args.workers,
+            'threads': args.threads,
+            'usuarios': args.usuarios,
+            'mistura': MISTURA,
+        },
+        'endpoints': endpoints,
+        'total': total,
+    }
+
+    imprimir(endpoints, total)
+
+    saida = args.saida or f"carga-{datetime.now():%Y%m%d-%H%M%S}-{(commit or 'sem-commit')[:8]}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
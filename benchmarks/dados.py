@@ -0,0 +1,76 @@
+"""
+Rebanho sintético para os benchmarks.
+
+Os animais gerados usam um prefixo próprio no código, e os usuários um
+prefixo próprio no email, para que possam ser removidos no final sem tocar
+nos dados reais. As distribuições (tipo, raça,
+idade, peso) são as mesmas de gerar_dados.py.
+"""
+
+import os
+import random
+import sys
+import bcrypt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from utils.database import get_db_connection
+from models.resumo import ResumoAnimais
+from gerar_dados import DOMINIO, SENHA_PADRAO, TIPOS, carregar_insert, linhas_animais
+
+
+def racas(tipo):
+    return [raca for raca in TIPOS[tipo][2] if raca]
+
+
+def gerar_rebanho(total, seed, prefixo, lote=5000):
+    """Insere 'total' animais com códigos <prefixo>0000000... e atualiza o resumo"""
+    conn = get_db_connection()
+    try:
+        carregar_insert(conn, 'animais', linhas_animais(random.Random(seed), total, [], prefixo=prefixo), lote)
+    finally:
+        conn.close()
+    ResumoAnimais.rebuild()
+
+
+def remover_rebanho(prefixo):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM animais WHERE codigo LIKE %s", (prefixo + '%',))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    ResumoAnimais.rebuild()
+
+
+def emails_usuarios(total, prefixo):
+    return [f"{prefixo.lower()}{i:05d}@{DOMINIO}" for i in range(1, total + 1)]
+
+
+def gerar_usuarios(total, prefixo):
+    """Insere 'total' usuários admin com a senha SENHA_PADRAO e devolve os emails"""
+    emails = emails_usuarios(total, prefixo)
+    senha_hash = bcrypt.hashpw(SENHA_PADRAO.encode('utf-8'),
+                               bcrypt.gensalt(Config.BCRYPT_LOG_ROUNDS)).decode('utf-8')
+    conn = get_db_connection()
+    try:
+        carregar_insert(conn, 'usuarios', (
+            (f"Usuário de teste {i}", email, senha_hash, 'admin', 0)
+            for i, email in enumerate(emails, 1)
+        ), 1000)
+    finally:
+        conn.close()
+    return emails
+
+
+def remover_usuarios(prefixo):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM usuarios WHERE email LIKE %s", (f"{prefixo.lower()}%@{DOMINIO}",))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Teste de regressão dos planos de execução: executa cada método dos models
+e cada endpoint de /api/relatorios contra o banco, captura os comandos SQL
+emitidos e roda EXPLAIN FORMAT=JSON em cada um. Falha (código de saída 1)
+se algum comando fizer varredura completa de tabela ou filesort acima dos
+limites de linhas, exceto nos cenários de PERMITIDOS.
+
+Por padrão só os cenários de leitura são executados. Os cenários de
+escrita (inclusão, alteração, exclusão, lote, recálculo do resumo) só rodam
+com --escritas, que exige --gerar e uma base em que animais e fazendas são
+todos sintéticos; recusa qualquer outro banco. Mesmo assim as escritas
+afetam apenas registros sintéticos e rodam dentro de uma transação de
+requisição desfeita no final. Os efeitos fora da transação (contador de
+versões dos ETags, cache de usuários) apenas forçam uma nova leitura.
+
+Com --gerar, carrega antes uma base sintética (gerar_dados.py) e a remove
+no final (exceto com --manter). O relatório com os planos é gravado em JSON,
+junto com o commit testado, para comparação entre rodadas com --comparar.
+
+Requisitos:
+- Banco configurado (config.json) com todas as migrações aplicadas
+
+Uso:
+python benchmarks/planos.py [--gerar 1000000 [--escritas]] [--max-linhas-scan 10000]
+                            [--max-linhas-filesort 10000] [--saida planos.json]
+                            [--comparar anterior.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+from app import app
+from utils.database import get_db_connection
+from utils.query_stats import capturar_consultas, fingerprint
+from models.animal import Animal
+from models.fazenda import Fazenda
+from models.resumo import ResumoAnimais
+from models.usuario import Usuario
+
+# Cenários em que a varredura ou a ordenação é inerente à operação
+PERMITIDOS = {
+    'animal_busca': "ordenação por relevância ordena todas as correspondências do termo",
+    'animal_busca_codigo': "a parte FULLTEXT da busca ordena por relevância todas as correspondências",
+    'animal_busca_like': "LIKE '%termo%' (termos curtos) não usa índice por definição",
+    'fazenda_busca': "ordenação por relevância ordena todas as correspondências do termo",
+    'fazenda_busca_like': "LIKE '%termo%' (termos curtos) não usa índice por definição",
+    'animal_export_completo': "exportação percorre todos os animais",
+    'resumo_rebuild': "recalcula o resumo a partir da tabela animais inteira",
+    'resumo_check': "compara o resumo com a tabela animais inteira",
+    'relatorio_resumo_periodo': "filtro por período de nascimento agrupa a tabela animais",
+}
+
+# Cenários que alteram o banco, executados somente com --escritas
+ESCRITAS = {
+    'animal_criar', 'animal_atualizar', 'animal_lote_ids', 'animal_lote_filtro',
+    'animal_lote_excluir', 'animal_excluir', 'fazenda_criar', 'fazenda_atualizar',
+    'fazenda_excluir', 'usuario_atualizar', 'resumo_rebuild',
+}
+
+# Comandos que encerram a transação implicitamente (e gravariam as escritas)
+COMMIT_IMPLICITO = re.compile(
+    r'\s*(COMMIT|BEGIN|START\s+TRANSACTION|SET\s+autocommit|CREATE|ALTER|DROP|TRUNCATE|RENAME|'
+    r'LOCK\s+TABLES|UNLOCK\s+TABLES|ANALYZE|OPTIMIZE|GRANT|REVOKE|LOAD\s+DATA)\b',
+    re.IGNORECASE
+)
+
+# Endpoints de relatórios, chamados pelo cliente de teste do Flask
+RELATORIOS = [
+    ('relatorio_por_tipo', '/api/relatorios/animais_por_tipo'),
+    ('relatorio_por_status', '/api/relatorios/animais_por_status'),
+    ('relatorio_por_raca', '/api/relatorios/animais_por_raca'),
+    ('relatorio_peso_medio', '/api/relatorios/peso_medio_por_tipo'),
+    ('relatorio_resumo', '/api/relatorios/resumo'),
+    ('relatorio_resumo_fazenda', '/api/relatorios/resumo?fazenda_id={fazenda_id}'),
+    ('relatorio_resumo_periodo', '/api/relatorios/resumo?data_inicio=01/01/2022&data_fim=31/12/2023'),
+]
+
+
+def _base_sintetica():
+    """Verifica se animais e fazendas do banco foram todos criados por gerar_dados.py"""
+    import gerar_dados
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM animais WHERE codigo NOT LIKE %s",
+                       (f"%-{gerar_dados.MARCA}_______",))
+        animais = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM fazendas WHERE email IS NULL OR email NOT LIKE %s",
+                       (f"%@{gerar_dados.DOMINIO}",))
+        fazendas = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+    return animais == 0 and fazendas == 0
+
+
+def _amostra():
+    """Ids e valores reais usados como parâmetros dos cenários"""
+    import gerar_dados
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, codigo, tipo, raca FROM animais ORDER BY id LIMIT 1")
+        animal = cursor.fetchone()
+        cursor.execute("""
+            SELECT fazenda_id FROM animais_resumo
+            WHERE fazenda_id <> 0
+            GROUP BY fazenda_id
+            ORDER BY SUM(total) DESC
+            LIMIT 1
+        """)
+        fazenda = cursor.fetchone()
+        cursor.execute("SELECT id FROM usuarios WHERE tipo_usuario = 'admin' ORDER BY id LIMIT 1")
+        admin = cursor.fetchone()
+        # Alvo de usuario_atualizar: nunca um usuário real
+        cursor.execute("SELECT id FROM usuarios WHERE email LIKE %s ORDER BY id LIMIT 1",
+                       (f"%@{gerar_dados.DOMINIO}",))
+        sintetico = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if animal is None or admin is None:
+        sys.exit("O banco precisa ter ao menos um animal e um usuário admin (use --gerar)")
+    return {
+        'animal_id': animal['id'],
+        'codigo': animal['codigo'],
+        'tipo': animal['tipo'],
+        'raca': animal['raca'] or 'Nelore',
+        'fazenda_id': fazenda['fazenda_id'] if fazenda else None,
+        'admin_id': admin['id'],
+        'usuario_id': sintetico['id'] if sintetico else None,
+    }
+
+
+def _cenarios_models(a):
+    """(nome, função) de cada caminho de consulta dos models"""
+    pagina = Animal.get_all(limit=50)
+    cursor_animais = Animal.next_cursor(pagina, 50)
+    pagina = Fazenda.get_all(limit=50)
+    cursor_fazendas = Fazenda.next_cursor(pagina, 50)
+    novo = {}
+
+    def criar_animal():
+        novo['animal'] = Animal.create({
+            'codigo': 'PLANO-0001', 'tipo': a['tipo'], 'raca': a['raca'],
+            'peso': 350, 'sexo': 'F', 'status': 'Ativo'
+        })['id']
+
+    def criar_fazenda():
+        novo['fazenda'] = Fazenda.create({
+            'nome': 'Fazenda Plano de Execução', 'municipio': 'Cuiabá', 'estado': 'MT', 'ativo': True
+        })['id']
+
+    return [
+        ('animal_validador', Animal.validador),
+        ('animal_listar', lambda: Animal.get_all(limit=50)),
+        ('animal_listar_cursor', lambda: Animal.get_all(limit=50, after=cursor_animais)),
+        ('animal_buscar_id', lambda: Animal.get_by_id(a['animal_id'])),
+        ('animal_busca', lambda: Animal.search(a['raca'], 50)),
+        ('animal_busca_codigo', lambda: Animal.search(a['codigo'], 50)),
+        ('animal_busca_like', lambda: Animal.search('N', 50)),
+        ('animal_export_filtrado', lambda: list(itertools.islice(Animal.iter_export(a['codigo']), 100))),
+        ('animal_export_completo', lambda: list(itertools.islice(Animal.iter_export(), 100))),
+        ('animal_importacao_validar', lambda: Animal.validate_bulk([
+            {'codigo': a['codigo'], 'tipo': a['tipo'], 'sexo': 'M'},
+            {'codigo': 'PLANO-0002', 'tipo': a['tipo'], 'sexo': 'F'},
+        ])),
+        ('animal_criar', criar_animal),
+        ('animal_atualizar', lambda: Animal.update(novo['animal'], {'peso': 360, 'status': 'Vendido'})),
+        ('animal_lote_ids', lambda: Animal.batch_update({'status': 'Ativo'}, ids=[novo['animal'], a['animal_id']])),
+        ('animal_lote_filtro', lambda: Animal.batch_update(
+            {'observacoes': 'Plano'}, filtro={'fazenda_id': a['fazenda_id'], 'raca': a['raca'], 'sexo': 'M'}
+        )),
+        ('animal_lote_excluir', lambda: Animal.batch_delete(ids=[novo['animal']])),
+        ('animal_excluir', lambda: Animal.delete(a['animal_id'])),
+        ('animal_por_tipo', Animal.count_by_tipo),
+        ('fazenda_validador', Fazenda.validador),
+        ('fazenda_listar', lambda: Fazenda.get_all(limit=50)),
+        ('fazenda_listar_cursor', lambda: Fazenda.get_all(limit=50, after=cursor_fazendas)),
+        ('fazenda_buscar_id', lambda: Fazenda.get_by_id(a['fazenda_id'])),
+        ('fazenda_busca', lambda: Fazenda.search('Santa', 50)),
+        ('fazenda_busca_like', lambda: Fazenda.search('S', 50)),
+        ('fazenda_ativas', Fazenda.get_active_fazendas),
+        ('fazenda_estatisticas', Fazenda.count_animais_por_fazenda),
+        ('fazenda_criar', criar_fazenda),
+        ('fazenda_atualizar', lambda: Fazenda.update(novo['fazenda'], {'responsavel': 'Plano'})),
+        ('fazenda_excluir', lambda: Fazenda.delete(novo['fazenda'])),
+        ('usuario_listar', Usuario.get_all),
+        ('usuario_buscar_id', lambda: Usuario.get_by_id(a['admin_id'])),
+        ('usuario_autorizacao', lambda: (Usuario.invalidate_cache(a['admin_id']),
+                                         Usuario.get_auth_record(a['admin_id']))),
+        ('usuario_atualizar', lambda: Usuario.update(a['usuario_id'], {'nome': 'Usuário Plano'})),
+        ('resumo_por_status', lambda: ResumoAnimais.count_by('status')),
+        ('resumo_por_raca_tipo', lambda: ResumoAnimais.count_by('raca', a['tipo'])),
+        ('resumo_peso_medio', ResumoAnimais.peso_medio_por_tipo),
+        ('resumo_check', ResumoAnimais.check),
+        ('resumo_rebuild', ResumoAnimais.rebuild),
+    ]
+
+
+def _explicavel(sql):
+    return re.match(r'\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b', sql, re.IGNORECASE) and \
+        (not re.match(r'\s*(INSERT|REPLACE)\b', sql, re.IGNORECASE) or re.search(r'\bSELECT\b', sql, re.IGNORECASE))
+
+
+def _linhas_produzidas(no):
+    """Maior rows_produced_per_join dentro de um nó do plano"""
+    maior = 0
+    if isinstance(no, dict):
+        maior = int(no.get('rows_produced_per_join', 0) or 0)
+        for valor in no.values():
+            maior = max(maior, _linhas_produzidas(valor))
+    elif isinstance(no, list):
+        for valor in no:
+            maior = max(maior, _linhas_produzidas(valor))
+    return maior
+
+
+def analisar(plano, max_scan, max_filesort):
+    """Tabelas acessadas (tipo de acesso, índice, linhas) e problemas do plano"""
+    tabelas = []
+    problemas = []
+
+    def visitar(no):
+        if isinstance(no, list):
+            for valor in no:
+                visitar(valor)
+            return
+        if not isinstance(no, dict):
+            return
+        if 'table_name' in no and 'access_type' in no:
+            linhas = int(no.get('rows_examined_per_scan', 0) or 0)
+            tabelas.append({
+                'tabela': no['table_name'],
+                'acesso': no['access_type'],
+                'indice': no.get('key'),
+                'linhas': linhas,
+            })
+            if no['access_type'] in ('ALL', 'index') and linhas > max_scan:
+                tipo = 'varredura completa' if no['access_type'] == 'ALL' else 'varredura completa do índice'
+                problemas.append(f"{tipo} de {no['table_name']} ({linhas} linhas)")
+        if no.get('using_filesort'):
+            linhas = _linhas_produzidas(no)
+            if linhas > max_filesort:
+                problemas.append(f"filesort de {linhas} linhas")
+        for valor in no.values():
+            visitar(valor)
+
+    visitar(plano)
+    return tabelas, problemas
+
+
+def explicar(cursor, sql, params):
+    cursor.execute("EXPLAIN FORMAT=JSON " + sql, params)
+    linha = cursor.fetchone()
+    return json.loads(linha[0])
+
+
+def executar(args, amostra):
+    consultas = []
+
+    # Relatórios pelos endpoints: cada chamada é uma requisição completa
+    # (somente leitura) com o usuário admin na sessão
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['user_id'] = amostra['admin_id']
+        sessao['user_type'] = 'admin'
+        sessao['senha_temporaria'] = False
+    for nome, caminho in RELATORIOS:
+        with capturar_consultas() as capturadas:
+            resposta = cliente.get(caminho.format(**amostra))
+        if resposta.status_code != 200:
+            print(f"Aviso: {caminho} respondeu {resposta.status_code}", file=sys.stderr)
+        consultas.extend((nome, c) for c in capturadas)
+
+    # Models dentro de uma única transação de requisição, desfeita no final
+    with app.test_request_context():
+        try:
+            for nome, funcao in _cenarios_models(amostra):
+                if nome in ESCRITAS and not args.escritas:
+                    continue
+                with capturar_consultas() as capturadas:
+                    funcao()
+                for sql, _params, _chamador in capturadas:
+                    sql = sql.decode('utf-8') if isinstance(sql, bytes) else str(sql)
+                    if COMMIT_IMPLICITO.match(sql):
+                        raise RuntimeError(f"[{nome}] comando com commit implícito: {sql[:100]}")
+                consultas.extend((nome, c) for c in capturadas)
+
+            resultados = []
+            vistos = set()
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                for nome, (sql, params, chamador) in consultas:
+                    sql = sql.decode('utf-8') if isinstance(sql, bytes) else str(sql)
+                    chave = (nome, fingerprint(sql))
+                    if chave in vistos or not _explicavel(sql):
+                        continue
+                    vistos.add(chave)
+                    plano = explicar(cursor, sql, params)
+                    tabelas, problemas = analisar(plano, args.max_linhas_scan, args.max_linhas_filesort)
+                    resultados.append({
+                        'cenario': nome,
+                        'chamador': chamador,
+                        'fingerprint': fingerprint(sql),
+                        'tabelas': tabelas,
+                        'problemas': problemas,
+                        'permitido': PERMITIDOS.get(nome) if problemas else None,
+                        'plano': plano,
+                    })
+            finally:
+                cursor.close()
+        finally:
+            get_db_connection().rollback()
+    return resultados
+
+
+def commit_atual():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=RAIZ, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, anterior):
+    """Mostra os comandos cujo tipo de acesso ou índice mudou desde a rodada anterior"""
+    def resumo(item):
+        return [(t['tabela'], t['acesso'], t['indice']) for t in item['tabelas']]
+
+    base = {(r['cenario'], r['fingerprint']): resumo(r) for r in anterior['consultas']}
+    print(f"\nComparação com {anterior.get('commit') or '?'} ({anterior.get('data')}):")
+    mudancas = 0
+    for item in resultados:
+        chave = (item['cenario'], item['fingerprint'])
+        if chave not in base:
+            print(f"  novo: [{item['cenario']}] {item['fingerprint'][:100]}")
+            mudancas += 1
+        elif base[chave] != resumo(item):
+            print(f"  mudou: [{item['cenario']}] {item['fingerprint'][:100]}")
+            print(f"    antes:  {base[chave]}")
+            print(f"    depois: {resumo(item)}")
+            mudancas += 1
+    if not mudancas:
+        print("  nenhum plano mudou")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gerar', type=int, default=0, metavar='ANIMAIS',
+                        help='Carrega uma base sintética com este número de animais antes do teste')
+    parser.add_argument('--fazendas', type=int, default=2000, help='Fazendas da base sintética')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--manter', action='store_true', help='Não remover a base sintética no final')
+    parser.add_argument('--escritas', action='store_true',
+                        help='Executa também os cenários de escrita (exige --gerar e base só sintética)')
+    parser.add_argument('--max-linhas-scan', type=int, default=10000,
+                        help='Linhas acima das quais uma varredura completa falha o teste')
+    parser.add_argument('--max-linhas-filesort', type=int, default=10000,
+                        help='Linhas acima das quais um filesort falha o teste')
+    parser.add_argument('--saida', help='Relatório JSON (padrão: planos-<data>-<commit>.json)')
+    parser.add_argument('--comparar', help='Relatório anterior (JSON) para comparação')
+    args = parser.parse_args()
+    if args.escritas and not args.gerar:
+        parser.error("--escritas só roda sobre uma base criada com --gerar")
+
+    if args.gerar:
+        import gerar_dados
+        gerar_dados.gerar(args.gerar, args.fazendas, 50, args.seed)
+
+    try:
+        if args.escritas and not _base_sintetica():
+            sys.exit("--escritas recusado: o banco tem animais ou fazendas que não são sintéticos")
+        resultados = executar(args, _amostra())
+    finally:
+        if args.gerar and not args.manter:
+            import gerar_dados
+            gerar_dados.remover()
+
+    falhas = [r for r in resultados if r['problemas'] and not r['permitido']]
+    for item in resultados:
+        if item['problemas']:
+            marca = 'PERMITIDO' if item['permitido'] else 'FALHA'
+            print(f"{marca:<10} [{item['cenario']}] {item['chamador']}")
+            print(f"           {item['fingerprint'][:120]}")
+            for problema in item['problemas']:
+                print(f"           - {problema}")
+    print(f"\n{len(resultados)} comandos analisados, {len(falhas)} falhas")
+    if not args.escritas:
+        print(f"Cenários de escrita não executados (use --gerar e --escritas): {', '.join(sorted(ESCRITAS))}")
+
+    commit = commit_atual()
+    relatorio = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'limites': {'scan': args.max_linhas_scan, 'filesort': args.max_linhas_filesort},
+        'escritas': args.escritas,
+        'consultas': resultados,
+    }
+    saida = args.saida or f"planos-{datetime.now():%Y%m%d-%H%M%S}-{(commit or 'sem-commit')[:8]}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Relatório gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Escolhe o custo do bcrypt (BCRYPT_LOG_ROUNDS) para um tempo alvo por hash.
+
+Rode no mesmo tipo de máquina do servidor de produção.
+
+Uso:
+python calibrar_bcrypt.py [--alvo-ms 250] [--amostras 3]
+"""
+import argparse
+import statistics
+import time
+import bcrypt
+
+def medir(rounds, amostras):
+    salt = bcrypt.gensalt(rounds)
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        bcrypt.hashpw(b'senha-de-calibracao', salt)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibração do custo do bcrypt")
+    parser.add_argument('--alvo-ms', type=float, default=250,
+                        help="tempo máximo desejado por hash, em milissegundos")
+    parser.add_argument('--amostras', type=int, default=3)
+    args = parser.parse_args()
+
+    escolhido = 4
+    for rounds in range(4, 20):
+        tempo = medir(rounds, args.amostras)
+        print(f"rounds={rounds:2d}  {tempo:8.1f} ms")
+        if tempo > args.alvo_ms:
+            break
+        escolhido = rounds
+
+    print()
+    print(f"Custo sugerido para {args.alvo_ms:.0f} ms: {escolhido}")
+    print(f'Adicione ao config.json: "BCRYPT_LOG_ROUNDS": {escolhido}')
+    print("Hashes com outro custo são refeitos automaticamente no próximo login de cada usuário.")
+
+if __name__ == "__main__":
+    main()
@@ -29,4 +29,86 @@ class Config:
     MYSQL_PASSWORD = db_config.get('PASSWORD')
     MYSQL_DB = db_config.get('DATABASE')
 
+    # Pool de conexões (um pool por worker do gunicorn)
+    MYSQL_POOL_SIZE = db_config.get('POOL_SIZE', 5)
+    # Tempo máximo (segundos) de espera por uma conexão livre
+    MYSQL_POOL_TIMEOUT = db_config.get('POOL_TIMEOUT', 10)
+    # Conexões ociosas há mais que isso (segundos) são validadas com ping ao sair do pool
+    MYSQL_POOL_VALIDATE_AFTER = db_config.get('POOL_VALIDATE_AFTER', 30)
+    # Idade máxima (segundos) de uma conexão antes de ser reciclada
+    MYSQL_POOL_MAX_AGE = db_config.get('POOL_MAX_AGE', 3600)
+
+    # Cache de respostas do dashboard e dos relatórios
+    # 'memoria' (um cache por worker) ou 'redis' (compartilhado, requer o pacote redis)
+    CACHE_BACKEND = db_config.get('CACHE_BACKEND', 'memoria')
+    CACHE_TTL = db_config.get('CACHE_TTL', 60)
+    CACHE_MAX_ENTRIES = db_config.get('CACHE_MAX_ENTRIES', 512)
+    CACHE_REDIS_URL = db_config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    # Custo do bcrypt (use calibrar_bcrypt.py para escolher o valor)
+    BCRYPT_LOG_ROUNDS = db_config.get('BCRYPT_LOG_ROUNDS', 12)
+    # Threads que calculam hashes de senha, por worker
+    BCRYPT_WORKERS = db_config.get('BCRYPT_WORKERS', os.cpu_count() or 2)
+    # Verificações aguardando uma thread livre antes de responder 503
+    BCRYPT_MAX_QUEUE = db_config.get('BCRYPT_MAX_QUEUE', 16)
+
+    # Limite de tentativas de login (token bucket): rajada máxima e tentativas por minuto
+    LOGIN_LIMITE_EMAIL_RAJADA = db_config.get('LOGIN_LIMITE_EMAIL_RAJADA', 5)
+    LOGIN_LIMITE_EMAIL_POR_MINUTO = db_config.get('LOGIN_LIMITE_EMAIL_POR_MINUTO', 5)
+    LOGIN_LIMITE_IP_RAJADA = db_config.get('LOGIN_LIMITE_IP_RAJADA', 20)
+    LOGIN_LIMITE_IP_POR_MINUTO = db_config.get('LOGIN_LIMITE_IP_POR_MINUTO', 20)
+    # 'memoria' (por worker) ou 'redis' (compartilhado, usa CACHE_REDIS_URL)
+    LOGIN_LIMITE_BACKEND = db_config.get('LOGIN_LIMITE_BACKEND', 'memoria')
+    # Número de proxies reversos confiáveis à frente da aplicação, para que o
+    # IP do cliente seja lido de X-Forwarded-For
+    PROXY_COUNT = db_config.get('PROXY_COUNT', 0)
+
+    # Segundos que o registro do usuário logado fica em cache entre requisições
+    USER_CACHE_TTL = db_config.get('USER_CACHE_TTL', 30)
+
+    # Logs: nível geral, níveis por módulo (ex.: {"utils.database": "DEBUG"}),
+    # formato ('json' ou 'texto') e amostragem das mensagens DEBUG (1 a cada N)
+    LOG_LEVEL = db_config.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = db_config.get('LOG_LEVELS', {})
+    LOG_FORMAT = db_config.get('LOG_FORMAT', 'json')
+    LOG_DEBUG_SAMPLE = db_config.get('LOG_DEBUG_SAMPLE', 10)
+    # Registros mantidos em memória por worker para /admin/api/system/logs
+    LOG_BUFFER_SIZE = db_config.get('LOG_BUFFER_SIZE', 5000)
+    # Arquivo de log opcional, compartilhado pelos workers e rotacionado
+    # externamente (logrotate)
+    LOG_FILE = db_config.get('LOG_FILE')
+
+    # Métricas por endpoint: diretório onde cada worker grava o seu snapshot
+    # (para a agregação entre workers) e intervalo de gravação em segundos.
+    # Os snapshots ficam num subdiretório por implantação (METRICS_NAMESPACE;
+    # padrão: derivado do diretório da aplicação e do banco)
+    METRICS_DIR = db_config.get('METRICS_DIR')
+    METRICS_NAMESPACE = db_config.get('METRICS_NAMESPACE')
+    METRICS_FLUSH_INTERVAL = db_config.get('METRICS_FLUSH_INTERVAL', 5)
+
+    # Consultas SQL: acima deste tempo (ms) vão para o log de consultas lentas
+    SQL_SLOW_MS = db_config.get('SQL_SLOW_MS', 200)
+    SQL_SLOW_LOG_SIZE = db_config.get('SQL_SLOW_LOG_SIZE', 500)
+    # Mesma consulta repetida este número de vezes numa requisição indica N+1
+    SQL_N_PLUS_ONE = db_config.get('SQL_N_PLUS_ONE', 10)
+
+    # Backups lógicos: diretório dos arquivos (padrão: backups/ na pasta do
+    # app) e linhas lidas por consulta ao percorrer cada tabela
+    BACKUP_DIR = db_config.get('BACKUP_DIR')
+    BACKUP_LOTE = db_config.get('BACKUP_LOTE', 5000)
+    # Sobreposição do backup incremental com o anterior, em segundos
+    BACKUP_MARGEM_SEGUNDOS = db_config.get('BACKUP_MARGEM_SEGUNDOS', 60)
+
+    # Tarefas em segundo plano: threads por worker, tarefas simultâneas por
+    # tipo (somando todos os workers), horas que tarefas concluídas e seus
+    # arquivos são mantidos e diretório dos arquivos de resultado; intervalo
+    # do sinal de vida das tarefas em execução e segundos sem sinal depois
+    # dos quais a tarefa é dada como órfã
+    JOBS_WORKERS = db_config.get('JOBS_WORKERS', 2)
+    JOBS_LIMITES = db_config.get('JOBS_LIMITES', {})
+    JOBS_RETENCAO_HORAS = db_config.get('JOBS_RETENCAO_HORAS', 72)
+    JOBS_DIR = db_config.get('JOBS_DIR')
+    JOBS_HEARTBEAT_SEGUNDOS = db_config.get('JOBS_HEARTBEAT_SEGUNDOS', 15)
+    JOBS_HEARTBEAT_LIMITE = db_config.get('JOBS_HEARTBEAT_LIMITE', 120)
+
     # Adicione outras configurações conforme necessário
\ No newline at end of file
@@ -0,0 +1,360 @@
+"""
+Gera uma base sintética grande (usuários, fazendas e animais) para testes de
+desempenho e experimentos com índices.
+
+Os dados são determinísticos a partir da semente: a mesma semente sobre o
+mesmo banco gera exatamente as mesmas linhas. Os registros gerados usam
+marcas próprias (códigos '<sigla>-S0000001' e e-mails '@sintetico.local')
+e podem ser removidos com --limpar.
+
+O carregamento usa LOAD DATA LOCAL INFILE (o servidor precisa de
+local_infile=ON); se não estiver disponível, usa INSERTs em lote.
+
+Uso:
+python gerar_dados.py [--animais 2000000] [--fazendas 3000] [--usuarios 200]
+                      [--seed 42] [--metodo auto|load-data|insert] [--lote 5000]
+python gerar_dados.py --limpar
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+import bcrypt
+import mysql.connector
+from config import Config
+from models.resumo import ResumoAnimais
+
+MARCA = 'S'
+DOMINIO = 'sintetico.local'
+SENHA_PADRAO = 'sintetico123'
+
+# tipo: (sigla, peso na população, raças com peso, idade máxima em anos,
+#        peso ao nascer, peso adulto da fêmea)
+TIPOS = {
+    'Bovino': ('BOV', 72, {'Nelore': 55, 'Angus': 10, 'Brahman': 6, 'Gir': 6, 'Girolando': 8,
+                           'Senepol': 4, 'Holandês': 5, 'Guzerá': 3, None: 3}, 12, 32, 480),
+    'Suíno': ('SUI', 14, {'Landrace': 30, 'Large White': 30, 'Duroc': 20, 'Pietrain': 15, None: 5},
+              4, 1.4, 230),
+    'Ovino': ('OVI', 8, {'Santa Inês': 40, 'Dorper': 30, 'Texel': 15, 'Morada Nova': 10, None: 5},
+              8, 3.5, 55),
+    'Caprino': ('CAP', 6, {'Boer': 40, 'Saanen': 25, 'Anglo-Nubiana': 20, 'Moxotó': 10, None: 5},
+                8, 3, 50),
+}
+STATUS = {'Ativo': 86, 'Vendido': 8, 'Abatido': 4, 'Morto': 2}
+
+OBSERVACOES = [
+    'Vacinado contra aftosa', 'Vacinado contra brucelose', 'Vermifugado',
+    'Matriz reprodutora', 'Reprodutor', 'Bezerro desmamado', 'Vaca leiteira',
+    'Em tratamento veterinário', 'Aguardando pesagem', 'Lote de engorda',
+    'Prenhe', 'Descarte previsto', 'Animal saudável', 'Casco tratado',
+    'Comprado em leilão', 'Nascido na propriedade', 'Confinamento',
+]
+
+ESTADOS = {
+    'MT': ['Cuiabá', 'Rondonópolis', 'Várzea Grande', 'Cáceres', 'Sinop', 'Juína', 'Barra do Garças'],
+    'MS': ['Campo Grande', 'Corumbá', 'Três Lagoas', 'Aquidauana', 'Ribas do Rio Pardo'],
+    'GO': ['Rio Verde', 'Jataí', 'Nova Crixás', 'São Miguel do Araguaia', 'Porangatu'],
+    'PA': ['São Félix do Xingu', 'Marabá', 'Novo Repartimento', 'Cumaru do Norte'],
+    'MG': ['Uberaba', 'Montes Claros', 'Unaí', 'Governador Valadares'],
+    'RO': ['Porto Velho', 'Ji-Paraná', 'Ariquemes', 'Vilhena'],
+    'TO': ['Araguaína', 'Paraíso do Tocantins', 'Gurupi'],
+    'BA': ['Itapetinga', 'Barreiras', 'Vitória da Conquista'],
+    'SP': ['Presidente Prudente', 'Araçatuba', 'Barretos'],
+    'RS': ['Alegrete', 'Bagé', 'Santana do Livramento'],
+}
+PESO_ESTADOS = {'MT': 18, 'MS': 12, 'GO': 13, 'PA': 14, 'MG': 12, 'RO': 8, 'TO': 6, 'BA': 7, 'SP': 5, 'RS': 5}
+
+NOMES = ['João', 'Maria', 'José', 'Ana', 'Antônio', 'Francisca', 'Carlos', 'Paulo', 'Luiz',
+         'Juliana', 'Marcos', 'Fernanda', 'Pedro', 'Patrícia', 'Rafael', 'Aline', 'Sebastião']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves',
+              'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho']
+NOMES_FAZENDA = ['São João', 'Boa Esperança', 'Santa Maria', 'Bela Vista', 'Santa Rita',
+                 'Três Irmãos', 'Água Limpa', 'Estrela', 'Primavera', 'Paraíso', 'Ouro Verde',
+                 'São José', 'Santo Antônio', 'Rio Bonito', 'Pontal', 'Recanto', 'Aurora']
+PREFIXOS_FAZENDA = {'Fazenda': 80, 'Sítio': 12, 'Estância': 5, 'Agropecuária': 3}
+
+HOJE = date(2026, 1, 1)
+
+
+def _escolha(rng, pesos):
+    """rng.choices para um dicionário {valor: peso}"""
+    return rng.choices(list(pesos), list(pesos.values()))[0]
+
+
+def _nome_pessoa(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def linhas_usuarios(rng, total, senha_hash):
+    for i in range(1, total + 1):
+        yield (
+            _nome_pessoa(rng),
+            f"usuario{i:05d}@{DOMINIO}",
+            senha_hash,
+            'admin' if i <= max(1, total // 50) else 'comum',
+            0,
+        )
+
+
+def linhas_fazendas(rng, total):
+    for i in range(1, total + 1):
+        estado = _escolha(rng, PESO_ESTADOS)
+        # Áreas com distribuição log-normal: muitas propriedades médias e
+        # poucas muito grandes (mediana ~900 ha)
+        area_total = round(min(rng.lognormvariate(6.8, 1.1), 200000), 2)
+        area_pastagem = round(area_total * rng.uniform(0.55, 0.85), 2)
+        responsavel = _nome_pessoa(rng)
+        yield (
+            f"{_escolha(rng, PREFIXOS_FAZENDA)} {rng.choice(NOMES_FAZENDA)} {i}",
+            rng.choice(ESTADOS[estado]),
+            estado,
+            area_total,
+            area_pastagem,
+            max(1, int(area_pastagem * rng.uniform(0.8, 1.6))),
+            responsavel,
+            f"({rng.randint(61, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            f"contato{i:05d}@{DOMINIO}",
+            1 if rng.random() < 0.93 else 0,
+        )
+
+
+def _observacao(rng):
+    if rng.random() < 0.3:
+        return None
+    return '. '.join(rng.sample(OBSERVACOES, rng.randint(1, 3)))
+
+
+def linhas_animais(rng, total, fazenda_ids, inicio=1, prefixo=''):
+    """
+    Animais com tipo/raça em proporções de um rebanho brasileiro, idade
+    concentrada em animais jovens e peso coerente com idade, tipo e sexo.
+    fazenda_ids recebe uma lista de ids; o tamanho dos rebanhos segue uma
+    distribuição de Pareto (poucas fazendas com muitos animais).
+    """
+    tipos = list(TIPOS)
+    pesos_tipo = [TIPOS[t][1] for t in tipos]
+    acumulado = None
+    if fazenda_ids:
+        acumulado = list(itertools.accumulate(rng.paretovariate(1.16) for _ in fazenda_ids))
+
+    for i in range(inicio, inicio + total):
+        tipo = rng.choices(tipos, pesos_tipo)[0]
+        sigla, _, racas, idade_max, peso_nascer, peso_adulto = TIPOS[tipo]
+        sexo = 'F' if rng.random() < 0.6 else 'M'
+
+        # Idade em dias, concentrada nos primeiros anos
+        idade = int(rng.triangular(0, idade_max * 365, idade_max * 365 * 0.12))
+        nascimento = HOJE - timedelta(days=idade)
+
+        # Curva de crescimento exponencial até o peso adulto
+        adulto = peso_adulto * (1.25 if sexo == 'M' else 1)
+        peso = peso_nascer + (adulto - peso_nascer) * (1 - math.exp(-idade / (idade_max * 365 * 0.15)))
+        peso = round(peso * rng.uniform(0.88, 1.12), 2)
+
+        fazenda_id = None
+        if acumulado and rng.random() >= 0.04:
+            fazenda_id = fazenda_ids[rng.choices(range(len(fazenda_ids)), cum_weights=acumulado)[0]]
+
+        yield (
+            f"{prefixo or sigla + '-' + MARCA}{i:07d}",
+            tipo,
+            _escolha(rng, racas),
+            nascimento if rng.random() >= 0.05 else None,
+            peso if rng.random() >= 0.03 else None,
+            sexo,
+            _escolha(rng, STATUS),
+            _observacao(rng),
+            fazenda_id,
+        )
+
+
+COLUNAS = {
+    'usuarios': ('nome', 'email', 'senha', 'tipo_usuario', 'senha_temporaria'),
+    'fazendas': ('nome', 'municipio', 'estado', 'area_total', 'area_pastagem', 'capacidade_ua',
+                 'responsavel', 'telefone', 'email', 'ativo'),
+    'animais': ('codigo', 'tipo', 'raca', 'data_nascimento', 'peso', 'sexo', 'status',
+                'observacoes', 'fazenda_id'),
+}
+
+
+def _campo_tsv(valor):
+    if valor is None:
+        return '\\N'
+    texto = str(valor)
+    return texto.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def carregar_load_data(conn, tabela, linhas, lote):
+    """Grava as linhas em um arquivo temporário (em blocos de 'lote' * 40) e usa LOAD DATA LOCAL INFILE"""
+    cursor = conn.cursor()
+    colunas = ', '.join(COLUNAS[tabela])
+    total = 0
+    try:
+        while True:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False) as arquivo:
+                quantidade = 0
+                for linha in linhas:
+                    arquivo.write('\t'.join(_campo_tsv(v) for v in linha) + '\n')
+                    quantidade += 1
+                    if quantidade >= lote * 40:
+                        break
+            try:
+                if quantidade:
+                    cursor.execute(f"""
+                        LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {tabela}
+                        CHARACTER SET utf8mb4 ({colunas})
+                    """, (arquivo.name,))
+                    conn.commit()
+                    total += quantidade
+                    print(f"  {tabela}: {total} linhas")
+            finally:
+                os.unlink(arquivo.name)
+            if quantidade < lote * 40:
+                return total
+    finally:
+        cursor.close()
+
+
+def carregar_insert(conn, tabela, linhas, lote):
+    """INSERT IGNORE com executemany, um commit por lote"""
+    cursor = conn.cursor()
+    colunas = COLUNAS[tabela]
+    query = f"""
+        INSERT IGNORE INTO {tabela} ({', '.join(colunas)})
+        VALUES ({', '.join(['%s'] * len(colunas))})
+    """
+    total = 0
+    bloco = []
+    try:
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) >= lote:
+                cursor.executemany(query, bloco)
+                conn.commit()
+                total += len(bloco)
+                bloco = []
+                if total % (lote * 40) == 0:
+                    print(f"  {tabela}: {total} linhas")
+        if bloco:
+            cursor.executemany(query, bloco)
+            conn.commit()
+            total += len(bloco)
+        print(f"  {tabela}: {total} linhas")
+        return total
+    finally:
+        cursor.close()
+
+
+def conectar(local_infile):
+    return mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+        allow_local_infile=local_infile
+    )
+
+
+def suporta_load_data(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT @@GLOBAL.local_infile")
+        return bool(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def limpar(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM animais WHERE codigo LIKE %s", (f"%-{MARCA}_______",))
+        animais = cursor.rowcount
+        cursor.execute("""
+            UPDATE animais SET fazenda_id = NULL
+            WHERE fazenda_id IN (SELECT id FROM fazendas WHERE email LIKE %s)
+        """, (f"%@{DOMINIO}",))
+        cursor.execute("DELETE FROM fazendas WHERE email LIKE %s", (f"%@{DOMINIO}",))
+        fazendas = cursor.rowcount
+        cursor.execute("DELETE FROM usuarios WHERE email LIKE %s", (f"%@{DOMINIO}",))
+        usuarios = cursor.rowcount
+        conn.commit()
+        print(f"Removidos: {animais} animais, {fazendas} fazendas, {usuarios} usuários")
+    finally:
+        cursor.close()
+
+
+def gerar(animais, fazendas, usuarios, seed=42, metodo='auto', lote=5000):
+    """Carrega a base sintética e recalcula o resumo dos animais"""
+    conn = conectar(metodo != 'insert')
+    try:
+        if metodo == 'auto':
+            metodo = 'load-data' if suporta_load_data(conn) else 'insert'
+        carregar = carregar_load_data if metodo == 'load-data' else carregar_insert
+        print(f"Método de carga: {metodo}")
+
+        # Cada tabela usa o seu próprio gerador, para que mudar a quantidade
+        # de uma não altere as linhas das outras
+        inicio = time.perf_counter()
+        senha_hash = bcrypt.hashpw(SENHA_PADRAO.encode('utf-8'),
+                                   bcrypt.gensalt(Config.BCRYPT_LOG_ROUNDS)).decode('utf-8')
+        carregar(conn, 'usuarios', linhas_usuarios(random.Random(f"{seed}-usuarios"), usuarios, senha_hash), lote)
+        carregar(conn, 'fazendas', linhas_fazendas(random.Random(f"{seed}-fazendas"), fazendas), lote)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM fazendas WHERE email LIKE %s ORDER BY id", (f"%@{DOMINIO}",))
+        fazenda_ids = [linha[0] for linha in cursor.fetchall()]
+        cursor.close()
+
+        carregar(conn, 'animais', linhas_animais(random.Random(f"{seed}-animais"), animais, fazenda_ids), lote)
+
+        # Estatísticas atualizadas para o otimizador escolher os índices certos
+        cursor = conn.cursor()
+        cursor.execute("ANALYZE TABLE usuarios, fazendas, animais")
+        cursor.fetchall()
+        cursor.close()
+        print(f"Carga concluída em {time.perf_counter() - inicio:.1f}s")
+    finally:
+        conn.close()
+
+    resultado = ResumoAnimais.rebuild()
+    print(f"Resumo recalculado: {resultado['grupos']} grupos")
+
+
+def remover():
+    """Remove os dados sintéticos e recalcula o resumo dos animais"""
+    conn = conectar(False)
+    try:
+        limpar(conn)
+    finally:
+        conn.close()
+    ResumoAnimais.rebuild()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de base sintética para testes de desempenho")
+    parser.add_argument('--animais', type=int, default=2000000)
+    parser.add_argument('--fazendas', type=int, default=3000)
+    parser.add_argument('--usuarios', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--metodo', choices=['auto', 'load-data', 'insert'], default='auto')
+    parser.add_argument('--lote', type=int, default=5000, help="linhas por INSERT em lote")
+    parser.add_argument('--limpar', action='store_true',
+                        help="remove os dados sintéticos gerados anteriormente e sai")
+    args = parser.parse_args()
+
+    if args.limpar:
+        remover()
+        return 0
+
+    gerar(args.animais, args.fazendas, args.usuarios, args.seed, args.metodo, args.lote)
+    print(f"Senha dos usuários sintéticos: {SENHA_PADRAO}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,94 @@
 import sys
 import os
+import unicodedata
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.database import get_db_connection
-from utils.date_utils import format_date, parse_date
+from utils.database import get_db_connection, VersaoConflitanteError, get_dedicated_connection
+from utils.cache import bump_data_version, incrementar_versao
+from utils.date_utils import parse_date
+from utils.pagination import decode_cursor, next_cursor
+from utils.busca import termo_fulltext, prefixo_like
+from models.resumo import ResumoAnimais
+
+# Colunas de Animal.iter_export, na ordem dos arquivos exportados
+EXPORT_CAMPOS = [
+    'id', 'codigo', 'tipo', 'raca', 'data_nascimento',
+    'peso', 'sexo', 'status', 'observacoes'
+]
+
+def _chave_codigo(codigo):
+    """
+    Forma normalizada do código para detectar duplicados como o índice único
+    de codigo: a collation padrão (utf8mb4_0900_ai_ci) ignora maiúsculas e
+    acentos, então "abc", "ABC" e "ábc" são o mesmo código
+    """
+    decomposto = unicodedata.normalize('NFKD', codigo)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
 
 class Animal:
     @staticmethod
-    def get_all(limit=100, offset=0):
+    def next_cursor(rows, limit):
+        """Cursor da página seguinte (paginação por chave, ordenada por codigo)"""
+        if rows and 'relevancia' in rows[0]:
+            # Resultado da busca FULLTEXT, ordenado por relevância
+            return next_cursor(rows, limit, 'relevancia', 'codigo')
+        return next_cursor(rows, limit, 'codigo')
+
+    @staticmethod
+    def validador():
+        """
+        Assinatura dos dados de animais para ETag/Last-Modified. A base é o
+        contador de alterações (versoes_dados), que muda a cada escrita
+        mesmo dentro do mesmo segundo; total, maior id e última
+        data_atualizacao cobrem escritas feitas fora do app
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT
+                    (SELECT versao FROM versoes_dados WHERE nome = 'animais'),
+                    (SELECT CAST(COALESCE(SUM(total), 0) AS SIGNED) FROM animais_resumo),
+                    (SELECT MAX(id) FROM animais),
+                    (SELECT UNIX_TIMESTAMP(MAX(data_atualizacao)) FROM animais)
+            """)
+            versao, total, ultimo_id, atualizado_em = cursor.fetchone()
+            return f"{versao}:{total}:{ultimo_id}:{atualizado_em}", atualizado_em
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def get_all(limit=100, offset=0, after=None):
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
             
-            query = """
-                SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes
-                FROM animais
-                ORDER BY codigo
-                LIMIT %s OFFSET %s
-            """
+            if after:
+                # Paginação por chave: o índice único de codigo posiciona
+                # direto na página, sem descartar as linhas anteriores
+                ultimo_codigo, = decode_cursor(after, 1)
+                query = """
+                    SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes
+                    FROM animais
+                    WHERE codigo > %s
+                    ORDER BY codigo
+                    LIMIT %s
+                """
+                params = (ultimo_codigo, limit)
+            else:
+                query = """
+                    SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes
+                    FROM animais
+                    ORDER BY codigo
+                    LIMIT %s OFFSET %s
+                """
+                params = (limit, offset)
             
-            cursor.execute(query, (limit, offset))
+            cursor.execute(query, params)
             return cursor.fetchall()
         finally:
             if cursor:
@@ -34,7 +103,7 @@ class Animal:
             cursor = conn.cursor(dictionary=True)
             
             query = """
-                SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes
+                SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes, versao
                 FROM animais
                 WHERE id = %s
             """
@@ -48,28 +117,97 @@ class Animal:
                 conn.close()
 
     @staticmethod
-    def search(termo_busca, limit=100, offset=0):
+    def search(termo_busca, limit=100, offset=0, after=None):
+        """
+        Busca pelo índice FULLTEXT, com os códigos que começam pelo termo
+        primeiro e o restante ordenado por relevância
+        """
+        termo = termo_fulltext(termo_busca)
+        if termo is None:
+            # Termo curto demais para o índice
+            return Animal.search_like(termo_busca, limit, offset, after)
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            params = [prefixo_like(termo_busca), termo, termo]
+            
+            if after:
+                ultima_relevancia, ultimo_codigo = decode_cursor(after, 2)
+                paginacao = """
+                    WHERE r.relevancia < %s OR (r.relevancia = %s AND a.codigo > %s)
+                    ORDER BY r.relevancia DESC, a.codigo
+                    LIMIT %s
+                """
+                params += [ultima_relevancia, ultima_relevancia, ultimo_codigo, limit]
+            else:
+                paginacao = """
+                    ORDER BY r.relevancia DESC, a.codigo
+                    LIMIT %s OFFSET %s
+                """
+                params += [limit, offset]
+            
+            # O UNION deixa cada parte usar o seu índice: o único de codigo
+            # para o prefixo e o FULLTEXT para o resto
+            query = """
+                SELECT a.id, a.codigo, a.tipo, a.raca, a.data_nascimento, a.peso, a.sexo,
+                       a.status, a.observacoes, r.relevancia
+                FROM (
+                    SELECT id, MAX(relevancia) AS relevancia
+                    FROM (
+                        SELECT id, 1000000 AS relevancia
+                        FROM animais
+                        WHERE codigo LIKE %s
+                        UNION ALL
+                        SELECT id, MATCH(codigo, tipo, raca, observacoes) AGAINST (%s IN BOOLEAN MODE)
+                        FROM animais
+                        WHERE MATCH(codigo, tipo, raca, observacoes) AGAINST (%s IN BOOLEAN MODE)
+                    ) encontrados
+                    GROUP BY id
+                ) r
+                JOIN animais a ON a.id = r.id
+            """ + paginacao
+            
+            cursor.execute(query, tuple(params))
+            
+            return cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def search_like(termo_busca, limit=100, offset=0, after=None):
+        """Busca com LIKE '%termo%' (percorre a tabela inteira)"""
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
             
             # Preparar o termo de busca para LIKE
             search_term = f"%{termo_busca}%"
+            params = [search_term, search_term, search_term, search_term]
+            
+            if after:
+                ultimo_codigo, = decode_cursor(after, 1)
+                paginacao = "AND codigo > %s ORDER BY codigo LIMIT %s"
+                params += [ultimo_codigo, limit]
+            else:
+                paginacao = "ORDER BY codigo LIMIT %s OFFSET %s"
+                params += [limit, offset]
             
             query = """
                 SELECT id, codigo, tipo, raca, data_nascimento, peso, sexo, status, observacoes
                 FROM animais
                 WHERE 
-                    codigo LIKE %s OR
+                    (codigo LIKE %s OR
                     tipo LIKE %s OR
                     raca LIKE %s OR
-                    observacoes LIKE %s
-                ORDER BY codigo
-                LIMIT %s OFFSET %s
-            """
+                    observacoes LIKE %s)
+            """ + paginacao
             
-            params = (search_term, search_term, search_term, search_term, limit, offset)
-            cursor.execute(query, params)
+            cursor.execute(query, tuple(params))
             
             return cursor.fetchall()
         finally:
@@ -78,6 +216,63 @@ class Animal:
             if conn:
                 conn.close()
 
+    @staticmethod
+    def _origem_busca(termo_busca):
+        """Cláusula FROM/WHERE (e parâmetros) equivalente aos filtros de search()"""
+        if not termo_busca:
+            return "FROM animais", ()
+
+        termo = termo_fulltext(termo_busca)
+        if termo is None:
+            search_term = f"%{termo_busca}%"
+            return """
+                FROM animais
+                WHERE codigo LIKE %s OR tipo LIKE %s OR raca LIKE %s OR observacoes LIKE %s
+            """, (search_term, search_term, search_term, search_term)
+
+        # JOIN com a tabela derivada em vez de "id IN (... UNION ...)", que o
+        # otimizador pode executar como subconsulta dependente, reavaliada a
+        # cada linha de animais
+        return """
+            FROM animais
+            JOIN (
+                SELECT id FROM animais WHERE codigo LIKE %s
+                UNION
+                SELECT id FROM animais
+                WHERE MATCH(codigo, tipo, raca, observacoes) AGAINST (%s IN BOOLEAN MODE)
+            ) encontrados USING (id)
+        """, (prefixo_like(termo_busca), termo)
+
+    @staticmethod
+    def iter_export(termo_busca='', lote=1000):
+        """
+        Gera todos os animais (opcionalmente filtrados como em search()),
+        ordenados por codigo, lendo do servidor em lotes por um cursor sem
+        buffer. O uso de memória não depende do tamanho do rebanho.
+        """
+        origem, params = Animal._origem_busca(termo_busca)
+        query = f"SELECT {', '.join(EXPORT_CAMPOS)} {origem} ORDER BY codigo"
+
+        conn = get_dedicated_connection()
+        completo = False
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params)
+            while True:
+                linhas = cursor.fetchmany(lote)
+                if not linhas:
+                    break
+                yield from linhas
+            cursor.close()
+            completo = True
+        finally:
+            if completo:
+                conn.close()
+            else:
+                # Cliente desconectou ou houve erro no meio da leitura: ainda há
+                # linhas pendentes no protocolo, então a conexão não é reaproveitada
+                conn.discard()
+
     @staticmethod
     def create(data):
         try:
@@ -109,7 +304,9 @@ class Animal:
             
             cursor.execute(query, params)
             novo_id = cursor.lastrowid
+            ResumoAnimais.aplicar(cursor, "id = %s", (novo_id,), 1)
             conn.commit()
+            bump_data_version('animais')
             
             return {"id": novo_id}
         except Exception as e:
@@ -122,7 +319,164 @@ class Animal:
                 conn.close()
 
     @staticmethod
-    def update(id, data):
+    def validate_bulk(linhas):
+        """
+        Valida uma lista de animais para importação em lote.
+
+        Verifica campos obrigatórios, datas, sexo, peso e códigos duplicados
+        (dentro do próprio arquivo e já cadastrados). Retorna a lista de
+        parâmetros prontos para o INSERT e a lista de erros por linha.
+        """
+        validas = []
+        erros = []
+        vistos = {}
+
+        for numero, data in enumerate(linhas, 1):
+            problemas = []
+            if not isinstance(data, dict):
+                erros.append({"linha": numero, "codigo": None, "erros": ["Linha em formato inválido"]})
+                continue
+
+            codigo = str(data.get('codigo') or '').strip()
+            if not codigo:
+                problemas.append("Código do animal é obrigatório")
+            elif _chave_codigo(codigo) in vistos:
+                problemas.append(f"Código repetido no arquivo (linha {vistos[_chave_codigo(codigo)]})")
+            else:
+                vistos[_chave_codigo(codigo)] = numero
+
+            if not data.get('tipo'):
+                problemas.append("Tipo do animal é obrigatório")
+
+            sexo = str(data.get('sexo') or '').strip().upper()
+            if sexo not in ('M', 'F'):
+                problemas.append("Sexo deve ser M ou F")
+
+            data_nascimento = data.get('data_nascimento') or None
+            if isinstance(data_nascimento, str):
+                data_nascimento = parse_date(data_nascimento)
+                if data_nascimento is None:
+                    problemas.append("Data de nascimento inválida (use dd/mm/aaaa)")
+
+            peso = data.get('peso')
+            if peso in ('', None):
+                peso = None
+            else:
+                try:
+                    peso = float(peso)
+                except (TypeError, ValueError):
+                    problemas.append("Peso inválido")
+
+            if problemas:
+                erros.append({"linha": numero, "codigo": codigo or None, "erros": problemas})
+                continue
+
+            validas.append((numero, (
+                codigo,
+                data.get('tipo'),
+                data.get('raca') or None,
+                data_nascimento,
+                peso,
+                sexo,
+                data.get('status') or 'Ativo',
+                data.get('observacoes') or ''
+            )))
+
+        # Códigos que já existem no banco, consultados em blocos
+        existentes = Animal._codigos_existentes([params[0] for _, params in validas])
+        if existentes:
+            filtradas = []
+            for numero, params in validas:
+                if _chave_codigo(params[0]) in existentes:
+                    erros.append({"linha": numero, "codigo": params[0], "erros": ["Código já cadastrado"]})
+                else:
+                    filtradas.append((numero, params))
+            validas = filtradas
+
+        erros.sort(key=lambda erro: erro["linha"])
+        return validas, erros
+
+    @staticmethod
+    def _codigos_existentes(codigos, bloco=1000):
+        """Códigos já cadastrados (normalizados com _chave_codigo) entre os informados"""
+        if not codigos:
+            return set()
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            existentes = set()
+            for i in range(0, len(codigos), bloco):
+                parte = codigos[i:i + bloco]
+                placeholders = ", ".join(["%s"] * len(parte))
+                cursor.execute(
+                    f"SELECT codigo FROM animais WHERE codigo IN ({placeholders})",
+                    tuple(parte)
+                )
+                # O IN compara pela collation; o retorno vem com a grafia do banco
+                existentes.update(_chave_codigo(row[0]) for row in cursor.fetchall())
+            return existentes
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def bulk_create(validas, lote=500):
+        """
+        Insere as linhas devolvidas por validate_bulk com executemany, uma
+        transação por lote. Um lote que falhar é desfeito e as suas linhas
+        entram no relatório de erros; os demais lotes seguem normalmente.
+        """
+        query = """
+            INSERT INTO animais (
+                codigo, tipo, raca, data_nascimento, 
+                peso, sexo, status, observacoes
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+
+        # Conexão própria para que cada lote seja confirmado de imediato,
+        # fora da transação única da requisição
+        conn = get_dedicated_connection()
+        cursor = conn.cursor()
+        inseridos = 0
+        erros = []
+        try:
+            for i in range(0, len(validas), lote):
+                parte = validas[i:i + lote]
+                try:
+                    codigos = [params[0] for _, params in parte]
+                    cursor.executemany(query, [params for _, params in parte])
+                    ResumoAnimais.aplicar(
+                        cursor,
+                        "codigo IN (" + ", ".join(["%s"] * len(codigos)) + ")",
+                        codigos,
+                        1
+                    )
+                    # Conexão própria: o contador dos ETags vai no mesmo commit do lote
+                    incrementar_versao(cursor, 'animais')
+                    conn.commit()
+                    bump_data_version('animais', banco=False)
+                    inseridos += len(parte)
+                except Exception as e:
+                    conn.rollback()
+                    erros.extend(
+                        {"linha": numero, "codigo": params[0], "erros": [f"Erro ao inserir lote: {e}"]}
+                        for numero, params in parte
+                    )
+            return {"inseridos": inseridos, "erros": erros}
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def update(id, data, versao=None):
+        """
+        Atualiza o animal num único UPDATE e retorna a nova versão. Com
+        versao, só altera se a versão atual for essa (If-Match); lança
+        ValueError se o animal não existir e VersaoConflitanteError se a
+        versão for outra.
+        """
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
@@ -146,16 +500,39 @@ class Animal:
                     else:
                         params.append(data[field])
             
+            where = "id = %s"
+            where_params = (id,)
+            if versao is not None:
+                where += " AND versao = %s"
+                where_params += (versao,)
+            
             if not update_fields:
-                return
+                return Animal._versao_atual(cursor, id, versao)
             
-            params.append(id)  # para o WHERE id = %s
+            # O resumo só muda se algum campo agrupado ou o peso mudar
+            altera_resumo = any(
+                field in data and data[field] is not None
+                for field in ('tipo', 'status', 'raca', 'peso')
+            )
+            if altera_resumo:
+                ResumoAnimais.aplicar(cursor, where, where_params, -1)
             
-            query = "UPDATE animais SET " + ", ".join(update_fields) + " WHERE id = %s"
-            cursor.execute(query, tuple(params))
+            # versao sempre muda, então rowcount é 1 sempre que a linha casar;
+            # LAST_INSERT_ID(expr) devolve a nova versão no próprio UPDATE
+            query = "UPDATE animais SET " + ", ".join(update_fields) + \
+                ", versao = LAST_INSERT_ID(versao + 1) WHERE " + where
+            cursor.execute(query, tuple(params) + where_params)
+            if cursor.rowcount == 0:
+                # Nada foi alterado (nem o resumo): inexistente ou versão antiga
+                raise VersaoConflitanteError(Animal._versao_atual(cursor, id))
+            nova_versao = cursor.lastrowid
+            
+            if altera_resumo:
+                ResumoAnimais.aplicar(cursor, "id = %s", (id,), 1)
             
             conn.commit()
-            return True
+            bump_data_version('animais')
+            return nova_versao
         except Exception as e:
             conn.rollback()
             raise e
@@ -165,6 +542,18 @@ class Animal:
             if conn:
                 conn.close()
 
+    @staticmethod
+    def _versao_atual(cursor, id, esperada=None):
+        """Versão atual do animal; ValueError se não existir, VersaoConflitanteError se diferir de esperada"""
+        # Leitura com bloqueio: vê a versão mais recente, não a do snapshot da transação
+        cursor.execute("SELECT versao FROM animais WHERE id = %s FOR UPDATE", (id,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError("Animal não encontrado")
+        if esperada is not None and row[0] != esperada:
+            raise VersaoConflitanteError(row[0])
+        return row[0]
+
     @staticmethod
     def delete(id):
         try:
@@ -177,8 +566,10 @@ class Animal:
                 raise ValueError("Animal não encontrado")
             
             # Excluir o animal
+            ResumoAnimais.aplicar(cursor, "id = %s", (id,), -1)
             cursor.execute("DELETE FROM animais WHERE id = %s", (id,))
             conn.commit()
+            bump_data_version('animais')
             
             return True
         except Exception as e:
@@ -190,23 +581,129 @@ class Animal:
             if conn:
                 conn.close()
 
+    # Campos que podem ser usados como filtro nas operações em lote
+    BATCH_FILTROS = ['tipo', 'raca', 'sexo', 'status', 'fazenda_id']
+    # Campos que podem ser alterados em lote (codigo é único por animal)
+    BATCH_CAMPOS = ['tipo', 'raca', 'data_nascimento', 'peso', 'sexo', 'status', 'observacoes']
+
     @staticmethod
-    def count_by_tipo():
+    def _alvo_lote(cursor, ids=None, filtro=None):
+        """
+        Resolve o alvo de uma operação em lote, por lista de ids ou por
+        filtro, bloqueando as linhas encontradas (FOR UPDATE). Retorna o WHERE
+        por id das linhas encontradas, os seus parâmetros e os ids que não
+        existem.
+
+        O filtro é convertido em ids antes da escrita porque um UPDATE pode
+        fazer as linhas deixarem de satisfazê-lo, e o resumo precisa somar de
+        volta exatamente as mesmas linhas.
+        """
+        if ids:
+            ids = sorted({int(i) for i in ids})
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(f"SELECT id FROM animais WHERE id IN ({placeholders}) FOR UPDATE", tuple(ids))
+            encontrados = {row[0] for row in cursor.fetchall()}
+            nao_encontrados = [i for i in ids if i not in encontrados]
+        else:
+            desconhecidos = set(filtro or {}) - set(Animal.BATCH_FILTROS)
+            if desconhecidos:
+                raise ValueError(f"Filtro inválido: {', '.join(sorted(desconhecidos))}")
+            condicoes = []
+            params = []
+            for campo in Animal.BATCH_FILTROS:
+                if filtro and campo in filtro:
+                    condicoes.append(f"{campo} = %s")
+                    params.append(filtro[campo])
+            if not condicoes:
+                # Nunca alterar a tabela inteira por engano
+                raise ValueError("Informe uma lista de ids ou ao menos um filtro válido")
+            cursor.execute(
+                "SELECT id FROM animais WHERE " + " AND ".join(condicoes) + " FOR UPDATE",
+                tuple(params)
+            )
+            encontrados = {row[0] for row in cursor.fetchall()}
+            nao_encontrados = []
+
+        if not encontrados:
+            return None, (), nao_encontrados
+        encontrados = sorted(encontrados)
+        where = "id IN (" + ", ".join(["%s"] * len(encontrados)) + ")"
+        return where, tuple(encontrados), nao_encontrados
+
+    @staticmethod
+    def batch_update(campos, ids=None, filtro=None):
+        """Atualiza vários animais com um único UPDATE"""
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
             
-            query = """
-                SELECT tipo, COUNT(*) as total
-                FROM animais
-                GROUP BY tipo
-                ORDER BY total DESC
-            """
+            update_fields = []
+            params = []
+            for field in Animal.BATCH_CAMPOS:
+                if field in campos and campos[field] is not None:
+                    update_fields.append(f"{field} = %s")
+                    if field == 'data_nascimento' and isinstance(campos[field], str):
+                        data_nascimento = parse_date(campos[field])
+                        if data_nascimento is None:
+                            # Nunca gravar NULL em todos os animais do lote por engano
+                            raise ValueError("Data de nascimento inválida (use dd/mm/aaaa)")
+                        params.append(data_nascimento)
+                    else:
+                        params.append(campos[field])
             
-            cursor.execute(query)
-            return cursor.fetchall()
+            if not update_fields:
+                raise ValueError("Nenhum campo válido para atualizar")
+            
+            where, where_params, nao_encontrados = Animal._alvo_lote(cursor, ids, filtro)
+            if where is None:
+                return {"afetados": 0, "nao_encontrados": nao_encontrados}
+            
+            ResumoAnimais.aplicar(cursor, where, where_params, -1)
+            query = "UPDATE animais SET " + ", ".join(update_fields) + ", versao = versao + 1 WHERE " + where
+            cursor.execute(query, tuple(params) + where_params)
+            afetados = cursor.rowcount
+            ResumoAnimais.aplicar(cursor, where, where_params, 1)
+            
+            conn.commit()
+            bump_data_version('animais')
+            return {"afetados": afetados, "nao_encontrados": nao_encontrados}
+        except Exception as e:
+            conn.rollback()
+            raise e
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
\ No newline at end of file
+                conn.close()
+
+    @staticmethod
+    def batch_delete(ids=None, filtro=None):
+        """Exclui vários animais com um único DELETE"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            where, where_params, nao_encontrados = Animal._alvo_lote(cursor, ids, filtro)
+            if where is None:
+                return {"afetados": 0, "nao_encontrados": nao_encontrados}
+            
+            ResumoAnimais.aplicar(cursor, where, where_params, -1)
+            cursor.execute("DELETE FROM animais WHERE " + where, where_params)
+            afetados = cursor.rowcount
+            
+            conn.commit()
+            bump_data_version('animais')
+            return {"afetados": afetados, "nao_encontrados": nao_encontrados}
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def count_by_tipo():
+        """Total de animais por tipo, lido da tabela de resumo"""
+        return ResumoAnimais.count_by('tipo')
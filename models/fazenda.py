@@ -1,25 +1,76 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, VersaoConflitanteError
+from utils.cache import bump_data_version
 import sys
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.pagination import decode_cursor, next_cursor
+from utils.busca import termo_fulltext
 
 class Fazenda:
     @staticmethod
-    def get_all(limit=100, offset=0):
+    def next_cursor(rows, limit):
+        """Cursor da página seguinte (paginação por chave, ordenada por nome e id)"""
+        if rows and 'relevancia' in rows[0]:
+            # Resultado da busca FULLTEXT, ordenado por relevância
+            return next_cursor(rows, limit, 'relevancia', 'nome', 'id')
+        return next_cursor(rows, limit, 'nome', 'id')
+
+    @staticmethod
+    def validador():
+        """
+        Assinatura dos dados de fazendas para ETag/Last-Modified. A base é o
+        contador de alterações (versoes_dados), que muda a cada escrita
+        mesmo dentro do mesmo segundo; total, maior id e última
+        data_atualizacao cobrem escritas feitas fora do app
+        """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = conn.cursor()
             
-            query = """
-                SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
-                       capacidade_ua, responsavel, telefone, email, observacoes, ativo
+            cursor.execute("""
+                SELECT
+                    (SELECT versao FROM versoes_dados WHERE nome = 'fazendas'),
+                    COUNT(*), MAX(id), UNIX_TIMESTAMP(MAX(data_atualizacao))
                 FROM fazendas
-                ORDER BY nome
-                LIMIT %s OFFSET %s
-            """
+            """)
+            versao, total, ultimo_id, atualizado_em = cursor.fetchone()
+            return f"{versao}:{total}:{ultimo_id}:{atualizado_em}", atualizado_em
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def get_all(limit=100, offset=0, after=None):
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
             
-            cursor.execute(query, (limit, offset))
+            if after:
+                # nome não é único, então o id desempata a ordenação
+                ultimo_nome, ultimo_id = decode_cursor(after, 2)
+                query = """
+                    SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
+                           capacidade_ua, responsavel, telefone, email, observacoes, ativo
+                    FROM fazendas
+                    WHERE nome > %s OR (nome = %s AND id > %s)
+                    ORDER BY nome, id
+                    LIMIT %s
+                """
+                params = (ultimo_nome, ultimo_nome, ultimo_id, limit)
+            else:
+                query = """
+                    SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
+                           capacidade_ua, responsavel, telefone, email, observacoes, ativo
+                    FROM fazendas
+                    ORDER BY nome, id
+                    LIMIT %s OFFSET %s
+                """
+                params = (limit, offset)
+            
+            cursor.execute(query, params)
             return cursor.fetchall()
         finally:
             if cursor:
@@ -35,7 +86,7 @@ class Fazenda:
             
             query = """
                 SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
-                       capacidade_ua, responsavel, telefone, email, observacoes, ativo
+                       capacidade_ua, responsavel, telefone, email, observacoes, ativo, versao
                 FROM fazendas
                 WHERE id = %s
             """
@@ -49,29 +100,86 @@ class Fazenda:
                 conn.close()
 
     @staticmethod
-    def search(termo_busca, limit=100, offset=0):
+    def search(termo_busca, limit=100, offset=0, after=None):
+        """Busca pelo índice FULLTEXT, ordenada por relevância"""
+        termo = termo_fulltext(termo_busca)
+        if termo is None:
+            # Termo curto demais para o índice
+            return Fazenda.search_like(termo_busca, limit, offset, after)
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            params = [termo, termo]
+            
+            if after:
+                ultima_relevancia, ultimo_nome, ultimo_id = decode_cursor(after, 3)
+                paginacao = """
+                    WHERE relevancia < %s
+                       OR (relevancia = %s AND (nome > %s OR (nome = %s AND id > %s)))
+                    ORDER BY relevancia DESC, nome, id
+                    LIMIT %s
+                """
+                params += [ultima_relevancia, ultima_relevancia, ultimo_nome, ultimo_nome,
+                           ultimo_id, limit]
+            else:
+                paginacao = """
+                    ORDER BY relevancia DESC, nome, id
+                    LIMIT %s OFFSET %s
+                """
+                params += [limit, offset]
+            
+            query = """
+                SELECT * FROM (
+                    SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
+                           capacidade_ua, responsavel, telefone, email, observacoes, ativo,
+                           MATCH(nome, municipio, estado, responsavel) AGAINST (%s IN BOOLEAN MODE) AS relevancia
+                    FROM fazendas
+                    WHERE MATCH(nome, municipio, estado, responsavel) AGAINST (%s IN BOOLEAN MODE)
+                ) encontradas
+            """ + paginacao
+            
+            cursor.execute(query, tuple(params))
+            
+            return cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def search_like(termo_busca, limit=100, offset=0, after=None):
+        """Busca com LIKE '%termo%' (percorre a tabela inteira)"""
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
             
             # Preparar o termo de busca para LIKE
             search_term = f"%{termo_busca}%"
+            params = [search_term, search_term, search_term, search_term]
+            
+            if after:
+                ultimo_nome, ultimo_id = decode_cursor(after, 2)
+                paginacao = "AND (nome > %s OR (nome = %s AND id > %s)) ORDER BY nome, id LIMIT %s"
+                params += [ultimo_nome, ultimo_nome, ultimo_id, limit]
+            else:
+                paginacao = "ORDER BY nome, id LIMIT %s OFFSET %s"
+                params += [limit, offset]
             
             query = """
                 SELECT id, nome, endereco, municipio, estado, area_total, area_pastagem, 
                        capacidade_ua, responsavel, telefone, email, observacoes, ativo
                 FROM fazendas
                 WHERE 
-                    nome LIKE %s OR
+                    (nome LIKE %s OR
                     municipio LIKE %s OR
                     estado LIKE %s OR
-                    responsavel LIKE %s
-                ORDER BY nome
-                LIMIT %s OFFSET %s
-            """
+                    responsavel LIKE %s)
+            """ + paginacao
             
-            params = (search_term, search_term, search_term, search_term, limit, offset)
-            cursor.execute(query, params)
+            cursor.execute(query, tuple(params))
             
             return cursor.fetchall()
         finally:
@@ -111,6 +219,7 @@ class Fazenda:
             cursor.execute(query, params)
             novo_id = cursor.lastrowid
             conn.commit()
+            bump_data_version('fazendas')
             
             return {"id": novo_id}
         except Exception as e:
@@ -123,7 +232,13 @@ class Fazenda:
                 conn.close()
 
     @staticmethod
-    def update(id, data):
+    def update(id, data, versao=None):
+        """
+        Atualiza a fazenda num único UPDATE e retorna a nova versão. Com
+        versao, só altera se a versão atual for essa (If-Match); lança
+        ValueError se a fazenda não existir e VersaoConflitanteError se a
+        versão for outra.
+        """
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
@@ -143,15 +258,26 @@ class Fazenda:
                     params.append(data[field])
             
             if not update_fields:
-                return
+                return Fazenda._versao_atual(cursor, id, versao)
             
-            params.append(id)  # para o WHERE id = %s
+            where = "id = %s"
+            params.append(id)
+            if versao is not None:
+                where += " AND versao = %s"
+                params.append(versao)
             
-            query = "UPDATE fazendas SET " + ", ".join(update_fields) + " WHERE id = %s"
+            # versao sempre muda, então rowcount é 1 sempre que a linha casar;
+            # LAST_INSERT_ID(expr) devolve a nova versão no próprio UPDATE
+            query = "UPDATE fazendas SET " + ", ".join(update_fields) + \
+                ", versao = LAST_INSERT_ID(versao + 1) WHERE " + where
             cursor.execute(query, tuple(params))
+            if cursor.rowcount == 0:
+                raise VersaoConflitanteError(Fazenda._versao_atual(cursor, id))
+            nova_versao = cursor.lastrowid
             
             conn.commit()
-            return True
+            bump_data_version('fazendas')
+            return nova_versao
         except Exception as e:
             conn.rollback()
             raise e
@@ -161,6 +287,18 @@ class Fazenda:
             if conn:
                 conn.close()
 
+    @staticmethod
+    def _versao_atual(cursor, id, esperada=None):
+        """Versão atual da fazenda; ValueError se não existir, VersaoConflitanteError se diferir de esperada"""
+        # Leitura com bloqueio: vê a versão mais recente, não a do snapshot da transação
+        cursor.execute("SELECT versao FROM fazendas WHERE id = %s FOR UPDATE", (id,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError("Fazenda não encontrada")
+        if esperada is not None and row[0] != esperada:
+            raise VersaoConflitanteError(row[0])
+        return row[0]
+
     @staticmethod
     def delete(id):
         try:
@@ -181,6 +319,7 @@ class Fazenda:
             # Excluir a fazenda
             cursor.execute("DELETE FROM fazendas WHERE id = %s", (id,))
             conn.commit()
+            bump_data_version('fazendas')
             
             return True
         except Exception as e:
@@ -0,0 +1,323 @@
+import json
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.database import get_dedicated_connection
+from config import Config
+
+# Todas as operações usam uma conexão própria em vez da transação da
+# requisição: o registro da tarefa precisa estar confirmado antes de outro
+# worker (ou a thread que vai executá-la) tentar lê-lo.
+
+CAMPOS = """
+    id, tipo, status, parametros, usuario_id, progresso, mensagem, resultado,
+    erro, cancelar, worker, criado_em, iniciado_em, concluido_em, expira_em,
+    heartbeat_em
+"""
+
+
+def _decodificar(job):
+    if job:
+        for campo in ('parametros', 'resultado'):
+            if isinstance(job[campo], (str, bytes)):
+                job[campo] = json.loads(job[campo])
+        job['cancelar'] = bool(job['cancelar'])
+        if job['progresso'] is not None:
+            job['progresso'] = float(job['progresso'])
+    return job
+
+
+class Job:
+    @staticmethod
+    def create(tipo, parametros, usuario_id=None):
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO jobs (tipo, parametros, usuario_id)
+                VALUES (%s, %s, %s)
+            """, (tipo, json.dumps(parametros or {}, default=str), usuario_id))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def get_by_id(id):
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(f"SELECT {CAMPOS} FROM jobs WHERE id = %s", (id,))
+            return _decodificar(cursor.fetchone())
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def get_all(usuario_id=None, tipo=None, status=None, limit=50):
+        """Tarefas mais recentes primeiro; usuario_id=None lista as de todos"""
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            condicoes = []
+            params = []
+            if usuario_id is not None:
+                condicoes.append("usuario_id = %s")
+                params.append(usuario_id)
+            if tipo:
+                condicoes.append("tipo = %s")
+                params.append(tipo)
+            if status:
+                condicoes.append("status = %s")
+                params.append(status)
+            where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+            params.append(limit)
+            cursor.execute(f"SELECT {CAMPOS} FROM jobs {where} ORDER BY id DESC LIMIT %s", tuple(params))
+            return [_decodificar(job) for job in cursor.fetchall()]
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def claim(tipo, limite, worker, id=None):
+        """
+        Marca a tarefa pendente mais antiga do tipo (ou a tarefa 'id') como
+        'executando' por este worker, se o tipo ainda não atingiu o limite de
+        tarefas simultâneas. Retorna a tarefa ou None.
+
+        O GET_LOCK serializa a contagem e a marcação entre todos os workers.
+        """
+        conn = None
+        cursor = None
+        trava = f"{Config.MYSQL_DB}.jobs.{tipo}"
+        travado = False
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT GET_LOCK(%s, 5) AS ok", (trava,))
+            travado = cursor.fetchone()['ok'] == 1
+            if not travado:
+                return None
+
+            cursor.execute("""
+                SELECT COUNT(*) AS executando FROM jobs
+                WHERE tipo = %s AND status = 'executando'
+            """, (tipo,))
+            if cursor.fetchone()['executando'] >= limite:
+                return None
+
+            cursor.execute("""
+                SELECT id FROM jobs
+                WHERE tipo = %s AND status = 'pendente'
+            """ + ("AND id = %s" if id is not None else "") + """
+                ORDER BY id
+                LIMIT 1
+            """, (tipo,) if id is None else (tipo, id))
+            pendente = cursor.fetchone()
+            if pendente is None:
+                return None
+
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'executando', worker = %s, iniciado_em = NOW(), heartbeat_em = NOW()
+                WHERE id = %s AND status = 'pendente'
+            """, (worker, pendente['id']))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return None
+
+            cursor.execute(f"SELECT {CAMPOS} FROM jobs WHERE id = %s", (pendente['id'],))
+            return _decodificar(cursor.fetchone())
+        finally:
+            if cursor:
+                if travado:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (trava,))
+                    cursor.fetchall()
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def update_progress(id, progresso=None, mensagem=None):
+        """Atualiza o andamento e retorna True se o cancelamento foi pedido"""
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                UPDATE jobs
+                SET progresso = COALESCE(%s, progresso), mensagem = COALESCE(%s, mensagem),
+                    heartbeat_em = NOW()
+                WHERE id = %s
+            """, (progresso, mensagem[:255] if mensagem else None, id))
+            cursor.execute("SELECT cancelar FROM jobs WHERE id = %s", (id,))
+            job = cursor.fetchone()
+            conn.commit()
+            return bool(job and job['cancelar'])
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def finish(id, status, resultado=None, erro=None):
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE jobs
+                SET status = %s, resultado = %s, erro = %s,
+                    progresso = IF(%s = 'concluido', 100, progresso),
+                    concluido_em = NOW(),
+                    expira_em = NOW() + INTERVAL %s HOUR
+                WHERE id = %s AND status = 'executando'
+            """, (
+                status,
+                json.dumps(resultado, default=str) if resultado is not None else None,
+                erro,
+                status,
+                Config.JOBS_RETENCAO_HORAS,
+                id
+            ))
+            conn.commit()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def cancel(id):
+        """
+        Cancela uma tarefa pendente na hora; uma em execução é apenas
+        marcada e para no próximo ponto de verificação. Retorna o novo
+        status, ou None se a tarefa já tinha terminado.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'cancelado', concluido_em = NOW(),
+                    expira_em = NOW() + INTERVAL %s HOUR
+                WHERE id = %s AND status = 'pendente'
+            """, (Config.JOBS_RETENCAO_HORAS, id))
+            if cursor.rowcount:
+                conn.commit()
+                return 'cancelado'
+            cursor.execute("""
+                UPDATE jobs SET cancelar = TRUE
+                WHERE id = %s AND status = 'executando'
+            """, (id,))
+            conn.commit()
+            return 'cancelando' if cursor.rowcount else None
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def heartbeat(ids):
+        """Registra o sinal de vida das tarefas em execução neste worker"""
+        if not ids:
+            return
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                UPDATE jobs SET heartbeat_em = NOW()
+                WHERE id IN ({', '.join(['%s'] * len(ids))}) AND status = 'executando'
+            """, tuple(ids))
+            conn.commit()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def expire_stale(limite_segundos):
+        """
+        Marca como erro as tarefas em execução sem sinal de vida há mais de
+        limite_segundos (o worker morreu, em qualquer host). Retorna as
+        tarefas marcadas.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            # Tarefas iniciadas antes da coluna heartbeat_em contam pelo início
+            cursor.execute("""
+                SELECT id, tipo, worker FROM jobs
+                WHERE status = 'executando'
+                  AND COALESCE(heartbeat_em, iniciado_em) < NOW() - INTERVAL %s SECOND
+                FOR UPDATE
+            """, (limite_segundos,))
+            orfas = cursor.fetchall()
+            if orfas:
+                cursor.execute(f"""
+                    UPDATE jobs
+                    SET status = 'erro', erro = 'Worker sem sinal de vida durante a execução',
+                        concluido_em = NOW(), expira_em = NOW() + INTERVAL %s HOUR
+                    WHERE id IN ({', '.join(['%s'] * len(orfas))})
+                """, (Config.JOBS_RETENCAO_HORAS,) + tuple(job['id'] for job in orfas))
+            conn.commit()
+            return orfas
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def delete_expired():
+        """Remove as tarefas vencidas e retorna os resultados delas (para apagar arquivos)"""
+        conn = None
+        cursor = None
+        try:
+            conn = get_dedicated_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, resultado FROM jobs
+                WHERE expira_em < NOW()
+                FOR UPDATE
+            """)
+            vencidas = [_decodificar(dict(job, parametros=None, cancelar=False, progresso=None))
+                        for job in cursor.fetchall()]
+            if vencidas:
+                ids = [job['id'] for job in vencidas]
+                cursor.execute(
+                    f"DELETE FROM jobs WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    tuple(ids)
+                )
+            conn.commit()
+            return [job['resultado'] for job in vencidas if job['resultado']]
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
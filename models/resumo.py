@@ -0,0 +1,282 @@
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.database import get_db_connection
+from utils.cache import bump_data_version
+
+# Agrupamento usado pela tabela animais_resumo (ver BD/04_resumo_animais.sql)
+_AGRUPAMENTO = """
+    SELECT tipo, status, COALESCE(raca, '') AS raca, COALESCE(fazenda_id, 0) AS fazenda_id,
+           COUNT(*) AS total, COALESCE(SUM(peso), 0) AS peso_soma, COUNT(peso) AS peso_contagem
+    FROM animais
+    {where}
+    GROUP BY tipo, status, COALESCE(raca, ''), COALESCE(fazenda_id, 0)
+"""
+
+class ResumoAnimais:
+    """
+    Contagens e somas de peso por tipo/status/raça/fazenda, mantidas de forma
+    incremental para que os relatórios custem O(grupos) e não O(rebanho).
+    """
+
+    # Colunas que podem ser usadas para agrupar os relatórios
+    CAMPOS = ['tipo', 'status', 'raca', 'fazenda_id']
+
+    @staticmethod
+    def aplicar(cursor, where, params, sinal):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) do resumo os animais que
+        satisfazem o WHERE informado. Deve ser chamado com o cursor da mesma
+        transação da escrita: subtraindo antes de UPDATE/DELETE e somando
+        depois de INSERT/UPDATE.
+        """
+        query = """
+            INSERT INTO animais_resumo (tipo, status, raca, fazenda_id, total, peso_soma, peso_contagem)
+            SELECT tipo, status, raca, fazenda_id,
+                   %s * total, %s * peso_soma, %s * peso_contagem
+            FROM (""" + _AGRUPAMENTO.format(where="WHERE " + where) + """) delta
+            ON DUPLICATE KEY UPDATE
+                animais_resumo.total = animais_resumo.total + VALUES(total),
+                animais_resumo.peso_soma = animais_resumo.peso_soma + VALUES(peso_soma),
+                animais_resumo.peso_contagem = animais_resumo.peso_contagem + VALUES(peso_contagem)
+        """
+        cursor.execute(query, (sinal, sinal, sinal) + tuple(params))
+
+    @staticmethod
+    def count_by(campo, tipo=None):
+        """Total de animais agrupado por um dos CAMPOS, opcionalmente filtrado por tipo"""
+        if campo not in ResumoAnimais.CAMPOS:
+            raise ValueError(f"Campo de agrupamento inválido: {campo}")
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            where = "WHERE tipo = %s" if tipo else ""
+            params = (tipo,) if tipo else ()
+            
+            # raca e fazenda_id vazios voltam a ser NULL, como na tabela animais
+            coluna = {
+                'raca': "NULLIF(raca, '')",
+                'fazenda_id': "NULLIF(fazenda_id, 0)"
+            }.get(campo, campo)
+            
+            query = f"""
+                SELECT {coluna} AS {campo}, CAST(SUM(total) AS SIGNED) AS total
+                FROM animais_resumo
+                {where}
+                GROUP BY {campo}
+                HAVING SUM(total) > 0
+                ORDER BY total DESC
+            """
+            
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def peso_medio_por_tipo():
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            query = """
+                SELECT tipo, SUM(peso_soma) / NULLIF(SUM(peso_contagem), 0) AS peso_medio
+                FROM animais_resumo
+                GROUP BY tipo
+                HAVING SUM(total) > 0
+                ORDER BY peso_medio DESC
+            """
+            
+            cursor.execute(query)
+            return cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def resumo_geral(fazenda_id=None, data_inicio=None, data_fim=None):
+        """
+        Totais por tipo, status e raça e peso médio por tipo em uma única
+        consulta com GROUP BY ... WITH ROLLUP.
+
+        Sem filtro de data a consulta agrupa a tabela de resumo; com filtro de
+        data de nascimento ela passa uma única vez pela tabela animais.
+        """
+        condicoes = []
+        params = []
+        if data_inicio or data_fim:
+            if fazenda_id:
+                condicoes.append("fazenda_id = %s")
+                params.append(fazenda_id)
+            if data_inicio:
+                condicoes.append("data_nascimento >= %s")
+                params.append(data_inicio)
+            if data_fim:
+                condicoes.append("data_nascimento <= %s")
+                params.append(data_fim)
+            query = """
+                SELECT tipo, status, raca,
+                       COUNT(*) AS total, COALESCE(SUM(peso), 0) AS peso_soma, COUNT(peso) AS peso_contagem,
+                       GROUPING(tipo) AS g_tipo, GROUPING(status) AS g_status, GROUPING(raca) AS g_raca
+                FROM animais
+                {where}
+                GROUP BY tipo, status, raca WITH ROLLUP
+            """
+        else:
+            if fazenda_id:
+                condicoes.append("fazenda_id = %s")
+                params.append(fazenda_id)
+            query = """
+                SELECT tipo, status, NULLIF(raca, '') AS raca,
+                       SUM(total) AS total, SUM(peso_soma) AS peso_soma, SUM(peso_contagem) AS peso_contagem,
+                       GROUPING(tipo) AS g_tipo, GROUPING(status) AS g_status, GROUPING(raca) AS g_raca
+                FROM animais_resumo
+                {where}
+                GROUP BY tipo, status, raca WITH ROLLUP
+            """
+        where = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query.format(where=where), tuple(params))
+            linhas = cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+        # O ROLLUP já traz os subtotais por tipo e o total geral; os totais
+        # por status e por raça (somando todos os tipos) saem das linhas
+        # de detalhe, em O(grupos)
+        total_geral = {'total': 0, 'peso_soma': 0, 'peso_contagem': 0}
+        por_tipo = {}
+        por_status = {}
+        por_raca = {}
+        for linha in linhas:
+            total = int(linha['total'] or 0)
+            if linha['g_tipo']:
+                total_geral = {
+                    'total': total,
+                    'peso_soma': float(linha['peso_soma'] or 0),
+                    'peso_contagem': int(linha['peso_contagem'] or 0)
+                }
+            elif linha['g_status']:
+                por_tipo[linha['tipo']] = {
+                    'total': total,
+                    'peso_soma': float(linha['peso_soma'] or 0),
+                    'peso_contagem': int(linha['peso_contagem'] or 0)
+                }
+            elif linha['g_raca']:
+                por_status[linha['status']] = por_status.get(linha['status'], 0) + total
+            else:
+                por_raca[linha['raca']] = por_raca.get(linha['raca'], 0) + total
+
+        def media(grupo):
+            if not grupo['peso_contagem']:
+                return None
+            return round(grupo['peso_soma'] / grupo['peso_contagem'], 2)
+
+        def ordenar(contagens, campo):
+            return sorted(
+                ({campo: chave, 'total': total} for chave, total in contagens.items() if total > 0),
+                key=lambda item: item['total'],
+                reverse=True
+            )
+
+        peso_medio = [
+            {'tipo': tipo, 'peso_medio': media(grupo)}
+            for tipo, grupo in por_tipo.items() if grupo['total'] > 0
+        ]
+        peso_medio.sort(key=lambda item: item['peso_medio'] or 0, reverse=True)
+
+        return {
+            'total': total_geral['total'],
+            'peso_medio_geral': media(total_geral),
+            'por_tipo': ordenar({tipo: grupo['total'] for tipo, grupo in por_tipo.items()}, 'tipo'),
+            'por_status': ordenar(por_status, 'status'),
+            'por_raca': ordenar(por_raca, 'raca'),
+            'peso_medio_por_tipo': peso_medio
+        }
+
+    @staticmethod
+    def rebuild():
+        """Recalcula o resumo inteiro a partir da tabela animais"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            # Bloquear escritas em animais enquanto o resumo é recalculado
+            cursor.execute("SELECT COUNT(*) FROM animais FOR UPDATE")
+            cursor.fetchall()
+            cursor.execute("DELETE FROM animais_resumo")
+            cursor.execute("""
+                INSERT INTO animais_resumo (tipo, status, raca, fazenda_id, total, peso_soma, peso_contagem)
+            """ + _AGRUPAMENTO.format(where=""))
+            grupos = cursor.rowcount
+            
+            conn.commit()
+            bump_data_version('animais')
+            return {"grupos": grupos}
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def check():
+        """
+        Compara o resumo com um agrupamento completo da tabela animais.
+        Retorna a lista de grupos divergentes (vazia se estiver consistente).
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            cursor.execute(_AGRUPAMENTO.format(where=""))
+            esperado = {
+                (r['tipo'], r['status'], r['raca'], r['fazenda_id']): r
+                for r in cursor.fetchall()
+            }
+            
+            cursor.execute("""
+                SELECT tipo, status, raca, fazenda_id, total, peso_soma, peso_contagem
+                FROM animais_resumo
+            """)
+            atual = {
+                (r['tipo'], r['status'], r['raca'], r['fazenda_id']): r
+                for r in cursor.fetchall()
+            }
+            
+            divergencias = []
+            for chave in sorted(set(esperado) | set(atual), key=str):
+                vazio = {'total': 0, 'peso_soma': 0, 'peso_contagem': 0}
+                e = esperado.get(chave, vazio)
+                a = atual.get(chave, vazio)
+                if any(e[c] != a[c] for c in ('total', 'peso_soma', 'peso_contagem')):
+                    divergencias.append({
+                        'tipo': chave[0],
+                        'status': chave[1],
+                        'raca': chave[2],
+                        'fazenda_id': chave[3],
+                        'esperado': {c: e[c] for c in ('total', 'peso_soma', 'peso_contagem')},
+                        'resumo': {c: a[c] for c in ('total', 'peso_soma', 'peso_contagem')}
+                    })
+            return divergencias
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
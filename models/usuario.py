@@ -2,10 +2,63 @@ import sys
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.database import get_db_connection
+from utils.database import get_db_connection, apos_transacao
 from extensions import bcrypt
+from config import Config
+import threading
+import time
+
+# Cache curto dos registros usados na autorização (id -> (expira_em, registro))
+_cache_usuarios = {}
+_cache_lock = threading.Lock()
 
 class Usuario:
+    @staticmethod
+    def get_auth_record(id):
+        """
+        Campos usados na autorização (tipo e senha temporária), com cache de
+        USER_CACHE_TTL segundos. Retorna None se o usuário não existir.
+        """
+        agora = time.monotonic()
+        with _cache_lock:
+            item = _cache_usuarios.get(id)
+        if item and item[0] > agora:
+            return item[1]
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, nome, email, tipo_usuario, senha_temporaria
+                FROM usuarios
+                WHERE id = %s
+            """, (id,))
+            usuario = cursor.fetchone()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+        with _cache_lock:
+            _cache_usuarios[id] = (agora + Config.USER_CACHE_TTL, usuario)
+        return usuario
+
+    @staticmethod
+    def invalidate_cache(id):
+        """
+        Descarta o registro em cache (neste worker) após uma alteração. Dentro
+        de uma requisição, descarta de novo depois do commit: uma requisição
+        concorrente pode ter lido e guardado o registro antigo nesse meio tempo.
+        """
+        Usuario._descartar(id)
+        apos_transacao(lambda: Usuario._descartar(id))
+
+    @staticmethod
+    def _descartar(id):
+        with _cache_lock:
+            _cache_usuarios.pop(id, None)
+
     @staticmethod
     def get_all():
         try:
@@ -97,6 +150,7 @@ class Usuario:
             cursor.execute(query, tuple(params))
             
             conn.commit()
+            Usuario.invalidate_cache(id)
         except Exception as e:
             conn.rollback()
             raise e
@@ -129,6 +183,7 @@ class Usuario:
             # Se passou por todas as verificações, excluir o usuário
             cursor.execute("DELETE FROM usuarios WHERE id = %s", (id,))
             conn.commit()
+            Usuario.invalidate_cache(id)
             
             return True
 
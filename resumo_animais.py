@@ -0,0 +1,29 @@
+import argparse
+import json
+import sys
+from models.resumo import ResumoAnimais
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção da tabela de resumo dos animais")
+    parser.add_argument('comando', choices=['rebuild', 'check'],
+                        help="rebuild: recalcula o resumo; check: compara o resumo com a tabela animais")
+    args = parser.parse_args()
+
+    if args.comando == 'rebuild':
+        resultado = ResumoAnimais.rebuild()
+        print(f"Resumo recalculado: {resultado['grupos']} grupos")
+        return 0
+
+    divergencias = ResumoAnimais.check()
+    if not divergencias:
+        print("Resumo consistente com a tabela animais")
+        return 0
+
+    print(f"{len(divergencias)} grupos divergentes:")
+    for divergencia in divergencias:
+        print(json.dumps(divergencia, default=str, ensure_ascii=False))
+    print("Execute 'python resumo_animais.py rebuild' para corrigir")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,22 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response, send_file
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.auth import login_required, admin_required, check_temp_password
-from utils.database import get_db_connection
+from utils.database import get_db_connection, get_pool_stats
+from utils.cache import get_cache_stats
+from utils.logs import get_ring_buffer
+from utils.metrics import get_metricas, agregar_workers, resumo_json, formato_prometheus
+from utils.query_stats import get_query_stats
+from utils.backup import ler_status, listar_backups, caminho_arquivo, ultimo_backup_concluido
+from utils.jobs import enviar
+from routes.jobs import resposta_job
+from datetime import datetime, timezone
 
 bp = Blueprint('admin', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/')
 @login_required
@@ -51,12 +61,18 @@ def system_info():
         """)
         info['ultimos_logins'] = cursor.fetchall()
         
+        # Contadores do pool de conexões deste worker
+        info['pool_conexoes'] = get_pool_stats()
+        
+        # Acertos e falhas do cache de respostas
+        info['cache'] = get_cache_stats()
+        
         return jsonify({
             "success": True,
             "info": info
         }), 200
-    except Exception as e:
-        print(f"Erro ao obter informações do sistema: {e}")
+    except Exception:
+        logger.exception("Erro ao obter informações do sistema")
         return jsonify({
             "success": False,
             "error": "Erro ao obter informações do sistema"
@@ -71,33 +87,214 @@ def system_info():
 @login_required
 @admin_required
 def create_backup():
-    # Esta função seria implementada para criar um backup do banco de dados
-    # Como é apenas um exemplo, retornaremos uma mensagem de sucesso
+    try:
+        data = request.get_json(silent=True) or {}
+        incremental = bool(data.get('incremental'))
+        desde = data.get('desde')
+        if incremental and not desde and ultimo_backup_concluido() is None:
+            return jsonify({
+                "success": False,
+                "error": "Nenhum backup concluído para servir de base ao incremental"
+            }), 400
+        
+        # Backups rodam como tarefa em segundo plano (um por vez)
+        job = enviar('backup', {"incremental": incremental, "desde": desde}, session['user_id'])
+        return resposta_job(job, "Backup iniciado")
+    except Exception as e:
+        logger.exception("Erro ao iniciar backup")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao iniciar backup: {str(e)}"
+        }), 500
+
+@bp.route('/api/system/backup', methods=['GET'])
+@login_required
+@admin_required
+def get_backups():
+    try:
+        return jsonify({
+            "success": True,
+            "backups": listar_backups()
+        }), 200
+    except Exception as e:
+        logger.exception("Erro ao listar backups")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao listar backups: {str(e)}"
+        }), 500
+
+@bp.route('/api/system/backup/<id>', methods=['GET'])
+@login_required
+@admin_required
+def get_backup(id):
+    status = ler_status(id)
+    if status is None:
+        return jsonify({
+            "success": False,
+            "error": "Backup não encontrado"
+        }), 404
     return jsonify({
         "success": True,
-        "message": "Backup criado com sucesso"
+        "backup": status
     }), 200
 
+@bp.route('/api/system/backup/<id>/download', methods=['GET'])
+@login_required
+@admin_required
+def download_backup(id):
+    status = ler_status(id)
+    if status is None or status['status'] != 'concluido':
+        return jsonify({
+            "success": False,
+            "error": "Backup não encontrado ou ainda não concluído"
+        }), 404
+    return send_file(caminho_arquivo(id), mimetype='application/gzip',
+                     as_attachment=True, download_name=f"{id}.ndjson.gz")
+
+@bp.route('/api/system/resumo/rebuild', methods=['POST'])
+@login_required
+@admin_required
+def rebuild_resumo():
+    try:
+        job = enviar('resumo_rebuild', {}, session['user_id'])
+        return resposta_job(job, "Recálculo do resumo iniciado")
+    except Exception as e:
+        logger.exception("Erro ao iniciar recálculo do resumo")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao iniciar recálculo do resumo: {str(e)}"
+        }), 500
+
+def _parse_instante(valor):
+    """Converte data/hora ISO 8601 (sem fuso = UTC) para epoch"""
+    if not valor:
+        return None
+    instante = datetime.fromisoformat(valor)
+    if instante.tzinfo is None:
+        instante = instante.replace(tzinfo=timezone.utc)
+    return instante.timestamp()
+
 @bp.route('/api/system/logs', methods=['GET'])
 @login_required
 @admin_required
 def get_logs():
     try:
-        # Esta função seria implementada para obter logs do sistema
-        # Como é apenas um exemplo, retornaremos dados fictícios
-        logs = [
-            {"timestamp": "2025-06-27 08:00:00", "level": "INFO", "message": "Sistema iniciado"},
-            {"timestamp": "2025-06-27 08:01:00", "level": "INFO", "message": "Usuário logado"},
-            {"timestamp": "2025-06-27 08:02:00", "level": "WARNING", "message": "Tentativa de acesso não autorizado"}
-        ]
+        buffer = get_ring_buffer()
+        if buffer is None:
+            return jsonify({
+                "success": False,
+                "error": "Logging não inicializado"
+            }), 503
+        
+        try:
+            # Nível mínimo (DEBUG, INFO, WARNING, ERROR)
+            nome_nivel = request.args.get('level', 'NOTSET').upper()
+            nivel = logging.getLevelName(nome_nivel)
+            if not isinstance(nivel, int):
+                raise ValueError(f"Nível de log inválido: {nome_nivel}")
+            
+            inicio = _parse_instante(request.args.get('inicio'))
+            fim = _parse_instante(request.args.get('fim'))
+            # Cursor "<pid>:<seq>": a sequência só vale no worker que a gerou
+            cursor = request.args.get('after', '')
+            worker, after = os.getpid(), 0
+            if cursor:
+                worker, separador, after = cursor.partition(':')
+                if not separador:
+                    raise ValueError("Cursor inválido; use o next_cursor da resposta anterior")
+                worker, after = int(worker), int(after)
+            limite = min(int(request.args.get('limit', 200)), 1000)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        # Outro worker (ou o mesmo PID depois de um reinício): a sequência do
+        # cursor não corresponde a estes registros
+        if worker != os.getpid() or after > buffer.ultima_sequencia():
+            return jsonify({
+                "success": False,
+                "error": "O cursor é de outro worker; recomece sem 'after'",
+                "worker": os.getpid(),
+                "reiniciar": True
+            }), 409
+        
+        logs = buffer.consultar(
+            nivel=nivel,
+            inicio=inicio,
+            fim=fim,
+            texto=request.args.get('texto'),
+            after=after,
+            limite=limite
+        )
         
         return jsonify({
             "success": True,
-            "logs": logs
+            "worker": os.getpid(),
+            "logs": logs,
+            # Passar como ?after= para receber apenas os registros seguintes
+            "next_cursor": f"{os.getpid()}:{logs[-1]['seq'] if logs else after}"
         }), 200
-    except Exception as e:
-        print(f"Erro ao obter logs: {e}")
+    except Exception:
+        logger.exception("Erro ao obter logs")
         return jsonify({
             "success": False,
             "error": "Erro ao obter logs"
-        }), 500
\ No newline at end of file
+        }), 500
+
+@bp.route('/api/system/metrics', methods=['GET'])
+@login_required
+@admin_required
+def get_metrics():
+    try:
+        # aggregate=1 soma os dados de todos os workers do gunicorn
+        if request.args.get('aggregate', '').lower() in ('1', 'true', 'sim'):
+            snapshot = agregar_workers()
+            origem = "todos os workers"
+        else:
+            snapshot = get_metricas().snapshot()
+            origem = f"worker {os.getpid()}"
+        
+        if request.args.get('format') == 'prometheus':
+            return Response(formato_prometheus(snapshot), mimetype='text/plain; version=0.0.4')
+        
+        return jsonify({
+            "success": True,
+            "origem": origem,
+            "endpoints": resumo_json(snapshot)
+        }), 200
+    except Exception:
+        logger.exception("Erro ao obter métricas")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao obter métricas"
+        }), 500
+
+@bp.route('/api/system/queries', methods=['GET'])
+@login_required
+@admin_required
+def get_queries():
+    try:
+        try:
+            min_ms = float(request.args.get('min_ms', 0))
+            limite = min(int(request.args.get('limit', 100)), 500)
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": "Parâmetros inválidos"
+            }), 400
+        
+        dados = get_query_stats().consultar(min_ms=min_ms, limite=limite)
+        
+        return jsonify({
+            "success": True,
+            "worker": os.getpid(),
+            **dados
+        }), 200
+    except Exception:
+        logger.exception("Erro ao obter consultas SQL")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao obter consultas SQL"
+        }), 500
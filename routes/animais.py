@@ -1,12 +1,21 @@
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, render_template, request, jsonify, session, Response
 import sys
+import logging
 import os
+import io
+import csv
+import json
+import itertools
+import time
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.auth import login_required, check_temp_password
-from models.animal import Animal
+from models.animal import Animal, EXPORT_CAMPOS
+from utils.database import VersaoConflitanteError
+from utils.http_cache import conditional_get, etag_versao, versao_if_match
 
 bp = Blueprint('animais', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/animais')
 @login_required
@@ -16,30 +25,100 @@ def animais_page():
 
 @bp.route('/api/animais', methods=['GET'])
 @login_required
+@conditional_get(Animal.validador)
 def get_animais():
     try:
         limit = int(request.args.get('limit', 100))
         offset = int(request.args.get('offset', 0))
+        # Cursor opaco da página anterior (paginação por chave); offset
+        # continua aceito para compatibilidade
+        after = request.args.get('after')
         
         # Verificar se há um termo de busca
         termo_busca = request.args.get('busca', '')
         
         if termo_busca:
-            animais = Animal.search(termo_busca, limit, offset)
+            animais = Animal.search(termo_busca, limit, offset, after)
         else:
-            animais = Animal.get_all(limit, offset)
+            animais = Animal.get_all(limit, offset, after)
         
         return jsonify({
             "success": True,
-            "animais": animais
+            "animais": animais,
+            "next_cursor": Animal.next_cursor(animais, limit)
         }), 200
-    except Exception as e:
-        print(f"Erro ao buscar animais: {e}")
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception:
+        logger.exception("Erro ao buscar animais")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar animais"
         }), 500
 
+def _export_csv(linhas, lote=500):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CAMPOS)
+    writer.writeheader()
+    for i, linha in enumerate(linhas, 1):
+        writer.writerow(linha)
+        if i % lote == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+def _export_ndjson(linhas):
+    for linha in linhas:
+        yield json.dumps(linha, default=str, ensure_ascii=False) + "\n"
+
+@bp.route('/api/animais/export', methods=['GET'])
+@login_required
+def export_animais():
+    formato = request.args.get('format', 'csv')
+    if formato not in ('csv', 'ndjson'):
+        return jsonify({
+            "success": False,
+            "error": "Formato inválido. Use csv ou ndjson"
+        }), 400
+    
+    try:
+        # Mesmo filtro da busca de /api/animais
+        termo_busca = request.args.get('busca', '')
+        exportacao = Animal.iter_export(termo_busca)
+        
+        # Ler a primeira linha antes de responder, para que erros de conexão
+        # ou de consulta ainda possam virar uma resposta 500
+        primeira = next(exportacao, None)
+        linhas = exportacao
+        if primeira is not None:
+            linhas = itertools.chain([primeira], exportacao)
+    except Exception:
+        logger.exception("Erro ao exportar animais")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao exportar animais"
+        }), 500
+    
+    if formato == 'csv':
+        corpo = _export_csv(linhas)
+        mimetype = 'text/csv'
+    else:
+        corpo = _export_ndjson(linhas)
+        mimetype = 'application/x-ndjson'
+    
+    resposta = Response(corpo, mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=animais.{formato}"
+    })
+    # Se o cliente desconectar no meio, o servidor fecha a resposta: encerra
+    # o gerador para que a conexão dedicada volte ao pool (ou seja descartada)
+    # na hora, e não só quando o coletor de lixo o alcançar
+    resposta.call_on_close(exportacao.close)
+    return resposta
+
 @bp.route('/api/animais/<int:id>', methods=['GET'])
 @login_required
 def get_animal(id):
@@ -55,9 +134,9 @@ def get_animal(id):
         return jsonify({
             "success": True,
             "animal": animal
-        }), 200
-    except Exception as e:
-        print(f"Erro ao buscar animal: {e}")
+        }), 200, {"ETag": etag_versao(animal['versao'])}
+    except Exception:
+        logger.exception("Erro ao buscar animal")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar animal"
@@ -91,35 +170,115 @@ def create_animal():
             "id": result["id"]
         }), 201
     except Exception as e:
-        print(f"Erro ao cadastrar animal: {e}")
+        logger.exception("Erro ao cadastrar animal")
         return jsonify({
             "success": False,
             "error": f"Erro ao cadastrar animal: {str(e)}"
         }), 500
 
-@bp.route('/api/animais/<int:id>', methods=['PUT'])
+IMPORT_MAX_LINHAS = 50000
+
+def _linhas_importacao():
+    """Lê as linhas enviadas como arquivo CSV, corpo CSV ou array JSON"""
+    if 'arquivo' in request.files:
+        texto = request.files['arquivo'].read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto)))
+    
+    if request.mimetype == 'text/csv':
+        texto = request.get_data().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto)))
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('animais')
+    if not isinstance(data, list):
+        raise ValueError("Envie um arquivo CSV ou um array JSON de animais")
+    return data
+
+@bp.route('/api/animais/import', methods=['POST'])
+@login_required
+def import_animais():
+    try:
+        try:
+            linhas = _linhas_importacao()
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return jsonify({
+                "success": False,
+                "error": f"Arquivo inválido: {str(e)}"
+            }), 400
+        
+        if len(linhas) > IMPORT_MAX_LINHAS:
+            return jsonify({
+                "success": False,
+                "error": f"Máximo de {IMPORT_MAX_LINHAS} animais por importação"
+            }), 400
+        
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'sim')
+        
+        inicio = time.perf_counter()
+        validas, erros = Animal.validate_bulk(linhas)
+        
+        inseridos = 0
+        if not dry_run:
+            resultado = Animal.bulk_create(validas)
+            inseridos = resultado["inseridos"]
+            erros = sorted(erros + resultado["erros"], key=lambda erro: erro["linha"])
+        
+        duracao = time.perf_counter() - inicio
+        
+        return jsonify({
+            "success": True,
+            "dry_run": dry_run,
+            "total": len(linhas),
+            "validos": len(validas),
+            "inseridos": inseridos,
+            "erros": erros,
+            "duracao_segundos": round(duracao, 3),
+            "linhas_por_segundo": round(len(linhas) / duracao, 1) if duracao > 0 else None
+        }), 200
+    except Exception as e:
+        logger.exception("Erro ao importar animais")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao importar animais: {str(e)}"
+        }), 500
+
+@bp.route('/api/animais/<int:id>', methods=['PUT', 'PATCH'])
 @login_required
 def update_animal(id):
     try:
         data = request.json
         
-        # Verificar se o animal existe
-        animal = Animal.get_by_id(id)
-        if not animal:
+        # Com If-Match, só altera se ninguém alterou desde a leitura
+        try:
+            versao = versao_if_match()
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": "Animal não encontrado"
-            }), 404
+                "error": str(e)
+            }), 400
         
-        # Atualizar animal
-        Animal.update(id, data)
+        # Atualizar animal (um único UPDATE, que também detecta o conflito)
+        versao = Animal.update(id, data, versao)
         
         return jsonify({
             "success": True,
-            "message": "Animal atualizado com sucesso"
-        }), 200
+            "message": "Animal atualizado com sucesso",
+            "versao": versao
+        }), 200, {"ETag": etag_versao(versao)}
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 404
+    except VersaoConflitanteError as e:
+        return jsonify({
+            "success": False,
+            "error": "O animal foi alterado por outro usuário. Recarregue os dados e tente novamente",
+            "versao": e.versao_atual
+        }), 412, {"ETag": etag_versao(e.versao_atual)}
     except Exception as e:
-        print(f"Erro ao atualizar animal: {e}")
+        logger.exception("Erro ao atualizar animal")
         return jsonify({
             "success": False,
             "error": f"Erro ao atualizar animal: {str(e)}"
@@ -142,8 +301,93 @@ def delete_animal(id):
             "error": str(e)
         }), 404
     except Exception as e:
-        print(f"Erro ao excluir animal: {e}")
+        logger.exception("Erro ao excluir animal")
         return jsonify({
             "success": False,
             "error": f"Erro ao excluir animal: {str(e)}"
-        }), 500
\ No newline at end of file
+        }), 500
+
+BATCH_MAX_IDS = 10000
+
+def _alvo_batch(data):
+    ids = data.get('ids')
+    filtro = data.get('filtro')
+    if ids is not None and not isinstance(ids, list):
+        raise ValueError("ids deve ser uma lista")
+    if ids and any(not isinstance(i, int) or isinstance(i, bool) for i in ids):
+        raise ValueError("ids deve ser uma lista de números inteiros")
+    if ids and len(ids) > BATCH_MAX_IDS:
+        raise ValueError(f"Máximo de {BATCH_MAX_IDS} ids por operação")
+    if filtro is not None and not isinstance(filtro, dict):
+        raise ValueError("filtro deve ser um objeto")
+    if filtro:
+        # Uma chave desconhecida ignorada ampliaria o alvo da operação
+        desconhecidos = sorted(set(filtro) - set(Animal.BATCH_FILTROS))
+        if desconhecidos:
+            raise ValueError(f"Filtro inválido: {', '.join(desconhecidos)} "
+                             f"(use {', '.join(Animal.BATCH_FILTROS)})")
+        for campo, valor in filtro.items():
+            if not isinstance(valor, (str, int, float)) or isinstance(valor, bool):
+                raise ValueError(f"Valor inválido no filtro: {campo}")
+    return ids, filtro
+
+@bp.route('/api/animais/batch', methods=['PATCH'])
+@login_required
+def batch_update_animais():
+    try:
+        data = request.json or {}
+        ids, filtro = _alvo_batch(data)
+        
+        campos = data.get('campos')
+        if not isinstance(campos, dict) or not campos:
+            return jsonify({
+                "success": False,
+                "error": "Informe os campos a alterar"
+            }), 400
+        
+        resultado = Animal.batch_update(campos, ids, filtro)
+        
+        return jsonify({
+            "success": True,
+            "message": "Animais atualizados com sucesso",
+            "afetados": resultado["afetados"],
+            "nao_encontrados": resultado["nao_encontrados"]
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        logger.exception("Erro ao atualizar animais em lote")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao atualizar animais em lote: {str(e)}"
+        }), 500
+
+@bp.route('/api/animais/batch', methods=['DELETE'])
+@login_required
+def batch_delete_animais():
+    try:
+        data = request.json or {}
+        ids, filtro = _alvo_batch(data)
+        
+        resultado = Animal.batch_delete(ids, filtro)
+        
+        return jsonify({
+            "success": True,
+            "message": "Animais excluídos com sucesso",
+            "afetados": resultado["afetados"],
+            "nao_encontrados": resultado["nao_encontrados"]
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        logger.exception("Erro ao excluir animais em lote")
+        return jsonify({
+            "success": False,
+            "error": f"Erro ao excluir animais em lote: {str(e)}"
+        }), 500
@@ -1,19 +1,25 @@
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from extensions import bcrypt
+from utils.rate_limit import limitar_login
+from utils.senhas import verificar_senha, gerar_hash, precisa_rehash, HashOcupadoError
 from utils.database import get_db_connection
 from utils.date_utils import get_current_time_gmt4
+from utils.auth import get_current_user
+from models.usuario import Usuario
 from functools import wraps
+import math
 
 bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if get_current_user() is None:
             return jsonify({"error": "Não autorizado"}), 401
         return f(*args, **kwargs)
     return decorated_function
@@ -26,38 +32,34 @@ def index():
 
 @bp.route('/login', methods=['GET'])
 def login_page():
-    print("Recebida requisição GET para /login")
     if 'user_id' in session:
-        print("Usuário já está logado, redirecionando para dashboard")
         return redirect(url_for('main.dashboard'))
-    print("Renderizando página de login")
     return render_template('login.html')
 
 @bp.route('/login', methods=['POST'])
 def login():
-    print("Recebida requisição POST para /login")
-    
-    # Verificar o tipo de conteúdo
-    content_type = request.headers.get('Content-Type', '')
-    print(f"Content-Type: {content_type}")
-    
     # Verificar se é JSON
     if not request.is_json:
-        print(f"Requisição não é JSON. Dados: {request.data}")
+        logger.debug("Requisição de login não é JSON: %s", request.content_type)
         return jsonify({"error": "Requisição deve ser JSON"}), 400
     
     data = request.json
-    print(f"Dados recebidos: {data}")
-    
     email = data.get('email')
     senha = data.get('senha')
     
     if not email or not senha:
-        print("Email ou senha não fornecidos")
         return jsonify({"error": "Email e senha são obrigatórios"}), 400
 
+    # Limitar tentativas por IP e por conta antes de qualquer consulta ou bcrypt
+    espera = limitar_login(email, request.remote_addr)
+    if espera is not None:
+        segundos = max(1, math.ceil(espera))
+        logger.warning("Limite de tentativas de login atingido: %s (%s)", email, request.remote_addr)
+        return jsonify({
+            "error": f"Muitas tentativas de login. Tente novamente em {segundos} segundos"
+        }), 429, {"Retry-After": str(segundos)}
+
     try:
-        print(f"Tentando conectar ao banco de dados para verificar usuário: {email}")
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
@@ -65,30 +67,35 @@ def login():
         user = cursor.fetchone()
         
         if not user:
-            print(f"Usuário não encontrado: {email}")
+            logger.info("Login com usuário inexistente: %s", email)
             return jsonify({"error": "Credenciais inválidas"}), 401
             
-        print(f"Usuário encontrado: {user['nome']}")
-        
         # Verificar se a senha está em hash ou não
         senha_correta = False
         try:
-            senha_correta = bcrypt.check_password_hash(user['senha'], senha)
+            senha_correta = verificar_senha(user['senha'], senha)
+            if senha_correta and precisa_rehash(user['senha']):
+                # Hash gerado com outro custo: refazer com o custo configurado
+                logger.info("Custo do hash difere do configurado, refazendo hash do usuário %s", user['id'])
+                cursor.execute("UPDATE usuarios SET senha = %s WHERE id = %s",
+                             (gerar_hash(senha), user['id']))
+                conn.commit()
         except ValueError:
             # Se a senha não estiver em hash, comparar diretamente (para o usuário inicial)
             senha_correta = user['senha'] == senha
             if senha_correta:
-                print("Senha não está em hash, mas está correta. Atualizando para hash.")
-                hashed_password = bcrypt.generate_password_hash(senha).decode('utf-8')
+                logger.warning("Senha sem hash para o usuário %s, atualizando para hash", user['id'])
+                hashed_password = gerar_hash(senha)
                 cursor.execute("UPDATE usuarios SET senha = %s WHERE id = %s",
                              (hashed_password, user['id']))
                 conn.commit()
         
         if senha_correta:
-            print("Senha correta, criando sessão")
+            logger.info("Login bem-sucedido: usuário %s", user['id'])
             session['user_id'] = user['id']
             session['user_type'] = user['tipo_usuario']
             session['senha_temporaria'] = user['senha_temporaria']
+            Usuario.invalidate_cache(user['id'])
             
             current_time = get_current_time_gmt4()
             cursor.execute("UPDATE usuarios SET ultimo_login = %s WHERE id = %s",
@@ -101,13 +108,14 @@ def login():
                 "senha_temporaria": user['senha_temporaria']
             }), 200
         else:
-            print("Senha incorreta")
+            logger.info("Senha incorreta para %s", email)
             return jsonify({"error": "Credenciais inválidas"}), 401
 
+    except HashOcupadoError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
     except Exception as e:
-        print(f"Erro ao fazer login: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao fazer login")
         return jsonify({"error": f"Erro ao fazer login: {str(e)}"}), 500
 
     finally:
@@ -128,17 +136,18 @@ def logout():
 
 @bp.route('/check_login')
 def check_login():
+    usuario = get_current_user()
     return jsonify({
-        "logged_in": 'user_id' in session,
-        "user_type": session.get('user_type', ''),
-        "senha_temporaria": session.get('senha_temporaria', False)
+        "logged_in": usuario is not None,
+        "user_type": usuario['tipo_usuario'] if usuario else '',
+        "senha_temporaria": bool(usuario['senha_temporaria']) if usuario else False
     }), 200
 
 @bp.route('/check_temp_password')
 @login_required
 def check_temp_password():
     return jsonify({
-        "senha_temporaria": session.get('senha_temporaria', False)
+        "senha_temporaria": bool(get_current_user()['senha_temporaria'])
     })
                         
 @bp.route('/api/alterar_senha', methods=['POST'])
@@ -171,11 +180,11 @@ def alterar_senha():
             if not senha_atual:
                 return jsonify({"error": "Senha atual é obrigatória"}), 400
             
-            if not bcrypt.check_password_hash(usuario['senha'], senha_atual):
+            if not verificar_senha(usuario['senha'], senha_atual):
                 return jsonify({"error": "Senha atual incorreta"}), 400
 
         # Criptografar e salvar nova senha
-        hashed_password = bcrypt.generate_password_hash(nova_senha).decode('utf-8')
+        hashed_password = gerar_hash(nova_senha)
         
         cursor.execute("""
             UPDATE usuarios 
@@ -185,11 +194,15 @@ def alterar_senha():
         """, (hashed_password, session['user_id']))
         
         conn.commit()
+        Usuario.invalidate_cache(session['user_id'])
         session['senha_temporaria'] = False
         return jsonify({"message": "Senha alterada com sucesso"}), 200
 
-    except Exception as e:
-        print(f"Erro ao alterar senha: {e}")
+    except HashOcupadoError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
+    except Exception:
+        logger.exception("Erro ao alterar senha")
         conn.rollback()
         return jsonify({"error": "Erro ao alterar senha"}), 500
 
@@ -207,6 +220,6 @@ def alterar_senha_page():
 @bp.route('/check_access')
 @login_required
 def check_access():
-    if session.get('senha_temporaria'):
+    if get_current_user()['senha_temporaria']:
         return jsonify({"error": "É necessário alterar a senha temporária"}), 403
     return jsonify({"message": "Acesso permitido"}), 200
\ No newline at end of file
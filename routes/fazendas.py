@@ -1,12 +1,17 @@
 from flask import Blueprint, render_template, request, jsonify, session
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.auth import login_required, check_temp_password
 from models.fazenda import Fazenda
+from utils.database import VersaoConflitanteError
+from utils.cache import cached_response
+from utils.http_cache import conditional_get, etag_versao, versao_if_match
 
 bp = Blueprint('fazendas', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/fazendas')
 @login_required
@@ -23,25 +28,35 @@ def adicionar_fazenda():
 
 @bp.route('/api/fazendas', methods=['GET'])
 @login_required
+@conditional_get(Fazenda.validador)
 def get_fazendas():
     try:
         limit = int(request.args.get('limit', 100))
         offset = int(request.args.get('offset', 0))
+        # Cursor opaco da página anterior (paginação por chave); offset
+        # continua aceito para compatibilidade
+        after = request.args.get('after')
         
         # Verificar se há um termo de busca
         termo_busca = request.args.get('busca', '')
         
         if termo_busca:
-            fazendas = Fazenda.search(termo_busca, limit, offset)
+            fazendas = Fazenda.search(termo_busca, limit, offset, after)
         else:
-            fazendas = Fazenda.get_all(limit, offset)
+            fazendas = Fazenda.get_all(limit, offset, after)
         
         return jsonify({
             "success": True,
-            "fazendas": fazendas
+            "fazendas": fazendas,
+            "next_cursor": Fazenda.next_cursor(fazendas, limit)
         }), 200
-    except Exception as e:
-        print(f"Erro ao buscar fazendas: {e}")
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception:
+        logger.exception("Erro ao buscar fazendas")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar fazendas"
@@ -62,9 +77,9 @@ def get_fazenda(id):
         return jsonify({
             "success": True,
             "fazenda": fazenda
-        }), 200
-    except Exception as e:
-        print(f"Erro ao buscar fazenda: {e}")
+        }), 200, {"ETag": etag_versao(fazenda['versao'])}
+    except Exception:
+        logger.exception("Erro ao buscar fazenda")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar fazenda"
@@ -104,35 +119,48 @@ def create_fazenda():
             "id": result["id"]
         }), 201
     except Exception as e:
-        print(f"Erro ao cadastrar fazenda: {e}")
+        logger.exception("Erro ao cadastrar fazenda")
         return jsonify({
             "success": False,
             "error": f"Erro ao cadastrar fazenda: {str(e)}"
         }), 500
 
-@bp.route('/api/fazendas/<int:id>', methods=['PUT'])
+@bp.route('/api/fazendas/<int:id>', methods=['PUT', 'PATCH'])
 @login_required
 def update_fazenda(id):
     try:
         data = request.json
         
-        # Verificar se a fazenda existe
-        fazenda = Fazenda.get_by_id(id)
-        if not fazenda:
+        # Com If-Match, só altera se ninguém alterou desde a leitura
+        try:
+            versao = versao_if_match()
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": "Fazenda não encontrada"
-            }), 404
+                "error": str(e)
+            }), 400
         
-        # Atualizar fazenda
-        Fazenda.update(id, data)
+        # Atualizar fazenda (um único UPDATE, que também detecta o conflito)
+        versao = Fazenda.update(id, data, versao)
         
         return jsonify({
             "success": True,
-            "message": "Fazenda atualizada com sucesso"
-        }), 200
+            "message": "Fazenda atualizada com sucesso",
+            "versao": versao
+        }), 200, {"ETag": etag_versao(versao)}
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 404
+    except VersaoConflitanteError as e:
+        return jsonify({
+            "success": False,
+            "error": "A fazenda foi alterada por outro usuário. Recarregue os dados e tente novamente",
+            "versao": e.versao_atual
+        }), 412, {"ETag": etag_versao(e.versao_atual)}
     except Exception as e:
-        print(f"Erro ao atualizar fazenda: {e}")
+        logger.exception("Erro ao atualizar fazenda")
         return jsonify({
             "success": False,
             "error": f"Erro ao atualizar fazenda: {str(e)}"
@@ -155,7 +183,7 @@ def delete_fazenda(id):
             "error": str(e)
         }), 400
     except Exception as e:
-        print(f"Erro ao excluir fazenda: {e}")
+        logger.exception("Erro ao excluir fazenda")
         return jsonify({
             "success": False,
             "error": f"Erro ao excluir fazenda: {str(e)}"
@@ -163,6 +191,7 @@ def delete_fazenda(id):
 
 @bp.route('/api/fazendas/ativas', methods=['GET'])
 @login_required
+@conditional_get(Fazenda.validador)
 def get_fazendas_ativas():
     try:
         fazendas = Fazenda.get_active_fazendas()
@@ -171,8 +200,8 @@ def get_fazendas_ativas():
             "success": True,
             "fazendas": fazendas
         }), 200
-    except Exception as e:
-        print(f"Erro ao buscar fazendas ativas: {e}")
+    except Exception:
+        logger.exception("Erro ao buscar fazendas ativas")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar fazendas ativas"
@@ -180,6 +209,7 @@ def get_fazendas_ativas():
 
 @bp.route('/api/fazendas/estatisticas', methods=['GET'])
 @login_required
+@cached_response('animais', 'fazendas')
 def get_estatisticas_fazendas():
     try:
         estatisticas = Fazenda.count_animais_por_fazenda()
@@ -188,8 +218,8 @@ def get_estatisticas_fazendas():
             "success": True,
             "estatisticas": estatisticas
         }), 200
-    except Exception as e:
-        print(f"Erro ao buscar estatísticas de fazendas: {e}")
+    except Exception:
+        logger.exception("Erro ao buscar estatísticas de fazendas")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar estatísticas de fazendas"
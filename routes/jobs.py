@@ -0,0 +1,137 @@
+from flask import Blueprint, request, jsonify, session, send_file
+import sys
+import logging
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.auth import login_required, get_current_user
+from utils.jobs import jobs_dir
+from models.job import Job
+
+bp = Blueprint('jobs', __name__)
+logger = logging.getLogger(__name__)
+
+def _job_visivel(id):
+    """A tarefa, se existir e pertencer ao usuário logado (admins veem todas)"""
+    job = Job.get_by_id(id)
+    if job is None:
+        return None
+    if get_current_user()['tipo_usuario'] != 'admin' and job['usuario_id'] != session['user_id']:
+        return None
+    return job
+
+def _formatar(job):
+    """Registro da tarefa para a API, sem caminhos de arquivo do servidor"""
+    job = dict(job)
+    resultado = job.get('resultado')
+    if isinstance(resultado, dict) and 'arquivo' in resultado:
+        resultado = {k: v for k, v in resultado.items() if k != 'arquivo'}
+        if job['status'] == 'concluido':
+            resultado['download'] = f"/api/jobs/{job['id']}/download"
+        job['resultado'] = resultado
+    job.pop('worker', None)
+    return job
+
+def resposta_job(job, mensagem="Tarefa iniciada"):
+    """Resposta 202 padrão para endpoints que enviam uma tarefa"""
+    return jsonify({
+        "success": True,
+        "message": mensagem,
+        "job": _formatar(job)
+    }), 202, {"Location": f"/api/jobs/{job['id']}"}
+
+@bp.route('/api/jobs', methods=['GET'])
+@login_required
+def get_jobs():
+    try:
+        # Usuários comuns veem só as próprias tarefas
+        usuario_id = None if get_current_user()['tipo_usuario'] == 'admin' else session['user_id']
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        jobs = Job.get_all(
+            usuario_id=usuario_id,
+            tipo=request.args.get('tipo'),
+            status=request.args.get('status'),
+            limit=limit
+        )
+        return jsonify({
+            "success": True,
+            "jobs": [_formatar(job) for job in jobs]
+        }), 200
+    except Exception:
+        logger.exception("Erro ao listar tarefas")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao listar tarefas"
+        }), 500
+
+@bp.route('/api/jobs/<int:id>', methods=['GET'])
+@login_required
+def get_job(id):
+    try:
+        job = _job_visivel(id)
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": "Tarefa não encontrada"
+            }), 404
+        return jsonify({
+            "success": True,
+            "job": _formatar(job)
+        }), 200
+    except Exception:
+        logger.exception("Erro ao buscar tarefa")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao buscar tarefa"
+        }), 500
+
+@bp.route('/api/jobs/<int:id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(id):
+    try:
+        if _job_visivel(id) is None:
+            return jsonify({
+                "success": False,
+                "error": "Tarefa não encontrada"
+            }), 404
+
+        status = Job.cancel(id)
+        if status is None:
+            return jsonify({
+                "success": False,
+                "error": "A tarefa já terminou"
+            }), 409
+
+        return jsonify({
+            "success": True,
+            "message": "Tarefa cancelada" if status == 'cancelado' else "Cancelamento solicitado",
+            "status": status
+        }), 200
+    except Exception:
+        logger.exception("Erro ao cancelar tarefa")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao cancelar tarefa"
+        }), 500
+
+@bp.route('/api/jobs/<int:id>/download', methods=['GET'])
+@login_required
+def download_job(id):
+    job = _job_visivel(id)
+    resultado = job.get('resultado') if job else None
+    if job is None or job['status'] != 'concluido' or not isinstance(resultado, dict) \
+            or 'arquivo' not in resultado:
+        return jsonify({
+            "success": False,
+            "error": "Arquivo não encontrado"
+        }), 404
+
+    arquivo = os.path.abspath(resultado['arquivo'])
+    if os.path.dirname(arquivo) != os.path.abspath(jobs_dir()) or not os.path.exists(arquivo):
+        return jsonify({
+            "success": False,
+            "error": "Arquivo não encontrado"
+        }), 404
+
+    return send_file(arquivo, mimetype='application/gzip', as_attachment=True,
+                     download_name=resultado.get('nome') or os.path.basename(arquivo))
@@ -1,12 +1,15 @@
 from flask import Blueprint, render_template, jsonify, session
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.auth import login_required, check_temp_password
 from models.animal import Animal
+from utils.cache import cached_response
 
 bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/dashboard')
 @login_required
@@ -16,6 +19,7 @@ def dashboard():
 
 @bp.route('/api/dashboard/stats')
 @login_required
+@cached_response('animais')
 def dashboard_stats():
     try:
         # Obter estatísticas para o dashboard
@@ -30,8 +34,8 @@ def dashboard_stats():
             "success": True,
             "stats": stats
         }), 200
-    except Exception as e:
-        print(f"Erro ao obter estatísticas: {e}")
+    except Exception:
+        logger.exception("Erro ao obter estatísticas")
         return jsonify({
             "success": False,
             "error": "Erro ao obter estatísticas"
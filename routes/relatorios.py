@@ -1,13 +1,19 @@
 from flask import Blueprint, render_template, request, jsonify, session
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.auth import login_required, check_temp_password
 from models.animal import Animal
-from utils.database import get_db_connection
+from models.resumo import ResumoAnimais
+from utils.cache import cached_response
+from utils.date_utils import parse_date
+from utils.jobs import enviar
+from routes.jobs import resposta_job
 
 bp = Blueprint('relatorios', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/relatorios')
 @login_required
@@ -18,6 +24,7 @@ def relatorios_page():
 
 @bp.route('/api/relatorios/animais_por_tipo', methods=['GET'])
 @login_required
+@cached_response('animais')
 def relatorio_animais_por_tipo():
     try:
         dados = Animal.count_by_tipo()
@@ -26,8 +33,8 @@ def relatorio_animais_por_tipo():
             "success": True,
             "dados": dados
         }), 200
-    except Exception as e:
-        print(f"Erro ao gerar relatório: {e}")
+    except Exception:
+        logger.exception("Erro ao gerar relatório")
         return jsonify({
             "success": False,
             "error": "Erro ao gerar relatório"
@@ -35,98 +42,48 @@ def relatorio_animais_por_tipo():
 
 @bp.route('/api/relatorios/animais_por_status', methods=['GET'])
 @login_required
+@cached_response('animais')
 def relatorio_animais_por_status():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT status, COUNT(*) as total
-            FROM animais
-            GROUP BY status
-            ORDER BY total DESC
-        """
-        
-        cursor.execute(query)
-        dados = cursor.fetchall()
+        dados = ResumoAnimais.count_by('status')
         
         return jsonify({
             "success": True,
             "dados": dados
         }), 200
-    except Exception as e:
-        print(f"Erro ao gerar relatório: {e}")
+    except Exception:
+        logger.exception("Erro ao gerar relatório")
         return jsonify({
             "success": False,
             "error": "Erro ao gerar relatório"
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 @bp.route('/api/relatorios/animais_por_raca', methods=['GET'])
 @login_required
+@cached_response('animais')
 def relatorio_animais_por_raca():
     try:
         tipo = request.args.get('tipo', '')
         
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        if tipo:
-            query = """
-                SELECT raca, COUNT(*) as total
-                FROM animais
-                WHERE tipo = %s
-                GROUP BY raca
-                ORDER BY total DESC
-            """
-            cursor.execute(query, (tipo,))
-        else:
-            query = """
-                SELECT raca, COUNT(*) as total
-                FROM animais
-                GROUP BY raca
-                ORDER BY total DESC
-            """
-            cursor.execute(query)
-            
-        dados = cursor.fetchall()
+        dados = ResumoAnimais.count_by('raca', tipo or None)
         
         return jsonify({
             "success": True,
             "dados": dados
         }), 200
-    except Exception as e:
-        print(f"Erro ao gerar relatório: {e}")
+    except Exception:
+        logger.exception("Erro ao gerar relatório")
         return jsonify({
             "success": False,
             "error": "Erro ao gerar relatório"
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 @bp.route('/api/relatorios/peso_medio_por_tipo', methods=['GET'])
 @login_required
+@cached_response('animais')
 def relatorio_peso_medio_por_tipo():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT tipo, AVG(peso) as peso_medio
-            FROM animais
-            GROUP BY tipo
-            ORDER BY peso_medio DESC
-        """
-        
-        cursor.execute(query)
-        dados = cursor.fetchall()
+        dados = ResumoAnimais.peso_medio_por_tipo()
         
         # Formatar o peso médio para 2 casas decimais
         for item in dados:
@@ -137,14 +94,106 @@ def relatorio_peso_medio_por_tipo():
             "success": True,
             "dados": dados
         }), 200
-    except Exception as e:
-        print(f"Erro ao gerar relatório: {e}")
+    except Exception:
+        logger.exception("Erro ao gerar relatório")
         return jsonify({
             "success": False,
             "error": "Erro ao gerar relatório"
         }), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
\ No newline at end of file
+
+@bp.route('/api/relatorios/resumo', methods=['GET'])
+@login_required
+@cached_response('animais')
+def relatorio_resumo():
+    """Todos os relatórios de animais em uma única resposta"""
+    try:
+        fazenda_id = request.args.get('fazenda_id', type=int)
+        
+        # Período de nascimento, no formato dd/mm/aaaa
+        data_inicio = request.args.get('data_inicio', '')
+        data_fim = request.args.get('data_fim', '')
+        inicio = parse_date(data_inicio)
+        fim = parse_date(data_fim)
+        if (data_inicio and not inicio) or (data_fim and not fim):
+            return jsonify({
+                "success": False,
+                "error": "Data inválida. Use o formato dd/mm/aaaa"
+            }), 400
+        
+        dados = ResumoAnimais.resumo_geral(fazenda_id, inicio, fim)
+        
+        return jsonify({
+            "success": True,
+            "dados": dados
+        }), 200
+    except Exception:
+        logger.exception("Erro ao gerar relatório")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao gerar relatório"
+        }), 500
+
+@bp.route('/api/relatorios/resumo', methods=['POST'])
+@login_required
+def relatorio_resumo_job():
+    """Mesmo relatório do GET, gerado em segundo plano (para períodos longos)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        data_inicio = data.get('data_inicio', '')
+        data_fim = data.get('data_fim', '')
+        inicio = parse_date(data_inicio)
+        fim = parse_date(data_fim)
+        if (data_inicio and not inicio) or (data_fim and not fim):
+            return jsonify({
+                "success": False,
+                "error": "Data inválida. Use o formato dd/mm/aaaa"
+            }), 400
+        
+        # Mesmo tipo do GET (?fazenda_id= com type=int)
+        fazenda_id = data.get('fazenda_id')
+        if isinstance(fazenda_id, str) and fazenda_id.strip().isdigit():
+            fazenda_id = int(fazenda_id)
+        if fazenda_id is not None and (not isinstance(fazenda_id, int) or isinstance(fazenda_id, bool)):
+            return jsonify({
+                "success": False,
+                "error": "fazenda_id deve ser um número inteiro"
+            }), 400
+        
+        job = enviar('relatorio_resumo', {
+            "fazenda_id": fazenda_id,
+            "data_inicio": inicio.date().isoformat() if inicio else None,
+            "data_fim": fim.date().isoformat() if fim else None
+        }, session['user_id'])
+        return resposta_job(job, "Relatório em geração")
+    except Exception:
+        logger.exception("Erro ao iniciar relatório")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao iniciar relatório"
+        }), 500
+
+@bp.route('/api/relatorios/export', methods=['POST'])
+@login_required
+def relatorio_export_job():
+    """Exportação de animais em segundo plano; o arquivo é baixado em /api/jobs/<id>/download"""
+    try:
+        data = request.get_json(silent=True) or {}
+        formato = data.get('format', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            return jsonify({
+                "success": False,
+                "error": "Formato inválido. Use csv ou ndjson"
+            }), 400
+        
+        job = enviar('export_animais', {
+            "formato": formato,
+            "busca": data.get('busca', '')
+        }, session['user_id'])
+        return resposta_job(job, "Exportação iniciada")
+    except Exception:
+        logger.exception("Erro ao iniciar exportação")
+        return jsonify({
+            "success": False,
+            "error": "Erro ao iniciar exportação"
+        }), 500
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, session
 import sys
+import logging
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -7,6 +8,7 @@ from utils.auth import login_required, admin_required, check_temp_password
 from models.usuario import Usuario
 
 bp = Blueprint('usuarios', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/usuarios')
 @login_required
@@ -31,8 +33,8 @@ def get_usuarios():
             "success": True,
             "usuarios": usuarios
         }), 200
-    except Exception as e:
-        print(f"Erro ao buscar usuários: {e}")
+    except Exception:
+        logger.exception("Erro ao buscar usuários")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar usuários"
@@ -59,8 +61,8 @@ def get_usuario(id):
             "success": False,
             "error": str(e)
         }), 404
-    except Exception as e:
-        print(f"Erro ao buscar usuário: {e}")
+    except Exception:
+        logger.exception("Erro ao buscar usuário")
         return jsonify({
             "success": False,
             "error": "Erro ao buscar usuário"
@@ -107,7 +109,7 @@ def create_usuario():
             "id": result["id"]
         }), 201
     except Exception as e:
-        print(f"Erro ao cadastrar usuário: {e}")
+        logger.exception("Erro ao cadastrar usuário")
         return jsonify({
             "success": False,
             "error": f"Erro ao cadastrar usuário: {str(e)}"
@@ -141,7 +143,7 @@ def update_usuario(id):
             "message": "Usuário atualizado com sucesso"
         }), 200
     except Exception as e:
-        print(f"Erro ao atualizar usuário: {e}")
+        logger.exception("Erro ao atualizar usuário")
         return jsonify({
             "success": False,
             "error": f"Erro ao atualizar usuário: {str(e)}"
@@ -172,7 +174,7 @@ def delete_usuario(id):
             "error": str(e)
         }), 400
     except Exception as e:
-        print(f"Erro ao excluir usuário: {e}")
+        logger.exception("Erro ao excluir usuário")
         return jsonify({
             "success": False,
             "error": f"Erro ao excluir usuário: {str(e)}"
@@ -1,44 +1,342 @@
-import mysql.connector
+"""
+Cria o banco de dados e aplica as migrações de BD/ em ordem.
+
+Cada arquivo BD/NN_nome.sql é uma migração de versão NN. As versões
+aplicadas ficam registradas na tabela schema_migracoes, então rodar o
+script de novo aplica só as novas. Os comandos USE e CREATE DATABASE dos
+arquivos são ignorados: o banco usado é o do config.json.
+
+Comandos que falham porque o objeto já existe (tabela, coluna, índice,
+chave estrangeira) são ignorados; um índice que já existe com o mesmo nome
+mas outras colunas interrompe a migração. Em bancos criados antes deste
+script, registre as migrações que já foram aplicadas à mão com
+'baseline --ate NN'.
+
+O MySQL grava cada DDL na hora, mas os comandos de dados de uma migração só
+são gravados junto com o registro da versão. Uma migração interrompida no
+meio é reaplicada do início na próxima execução, então os comandos de dados
+precisam ser idempotentes (INSERT IGNORE, ON DUPLICATE KEY UPDATE ou
+WHERE NOT EXISTS).
+
+Índices novos devem ser criados sem bloquear escritas:
+    ALTER TABLE animais ADD INDEX idx_x (x), ALGORITHM=INPLACE, LOCK=NONE;
+
+Uso:
+python setup_db.py [migrar] [--ate 07] [--lock-wait-timeout 30]
+python setup_db.py status
+python setup_db.py baseline --ate 06
+"""
+import argparse
+import glob
+import hashlib
 import os
+import re
+import sys
+import time
+import mysql.connector
+from mysql.connector import errorcode
+from config import Config
+
+DIRETORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'BD')
+
+# Erros de "já existe", tratados como comando já aplicado
+JA_EXISTE = {
+    errorcode.ER_TABLE_EXISTS_ERROR,      # 1050
+    errorcode.ER_DUP_FIELDNAME,           # 1060
+    errorcode.ER_DUP_KEYNAME,             # 1061
+    errorcode.ER_FK_DUP_NAME,             # 1826
+}
+
+IGNORADOS = re.compile(r'^\s*(USE\s|CREATE\s+(DATABASE|SCHEMA)\s)', re.IGNORECASE)
+
+# ALTER TABLE t ... ADD [UNIQUE|FULLTEXT] INDEX nome (...) e CREATE [UNIQUE|FULLTEXT] INDEX nome ON t (...)
+ALTER_TABLE = re.compile(r'^\s*ALTER\s+TABLE\s+`?(\w+)`?', re.IGNORECASE)
+ADD_INDICE = re.compile(r'\bADD\s+(?:(UNIQUE|FULLTEXT|SPATIAL)\s+)?(?:INDEX|KEY)\s+`?(\w+)`?\s*\(', re.IGNORECASE)
+CREATE_INDICE = re.compile(
+    r'^\s*CREATE\s+(?:(UNIQUE|FULLTEXT|SPATIAL)\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?\s*\(', re.IGNORECASE
+)
+
+
+def dividir_comandos(sql):
+    """Divide um script em comandos por ';', respeitando strings e comentários"""
+    comandos = []
+    atual = []
+    i = 0
+    aspas = None
+    while i < len(sql):
+        c = sql[i]
+        if aspas:
+            atual.append(c)
+            if c == '\\' and aspas != '`' and i + 1 < len(sql):
+                atual.append(sql[i + 1])
+                i += 1
+            elif c == aspas:
+                aspas = None
+        elif c in ("'", '"', '`'):
+            aspas = c
+            atual.append(c)
+        elif sql.startswith('--', i) or c == '#':
+            fim = sql.find('\n', i)
+            i = len(sql) if fim == -1 else fim
+            continue
+        elif sql.startswith('/*', i):
+            fim = sql.find('*/', i + 2)
+            i = len(sql) if fim == -1 else fim + 2
+            continue
+        elif c == ';':
+            comandos.append(''.join(atual).strip())
+            atual = []
+        else:
+            atual.append(c)
+        i += 1
+    comandos.append(''.join(atual).strip())
+    return [comando for comando in comandos if comando and not IGNORADOS.match(comando)]
+
+
+def _colunas(comando, inicio):
+    """Nomes das colunas da lista entre parênteses que começa em 'inicio'"""
+    nivel = 0
+    for fim in range(inicio, len(comando)):
+        if comando[fim] == '(':
+            nivel += 1
+        elif comando[fim] == ')':
+            nivel -= 1
+            if nivel == 0:
+                break
+    partes = []
+    atual = ''
+    nivel = 0
+    for c in comando[inicio + 1:fim]:
+        if c == ',' and nivel == 0:
+            partes.append(atual)
+            atual = ''
+            continue
+        nivel += (c == '(') - (c == ')')
+        atual += c
+    partes.append(atual)
+    return [re.match(r'\s*`?(\w+)', parte).group(1).lower() for parte in partes if parte.strip()]
 
-def setup_database():
-    print("Iniciando configuração do banco de dados...")
-    
-    # Conectar ao MySQL sem especificar um banco de dados
+
+def indices_do_comando(comando):
+    """[(tabela, índice, tipo, colunas)] dos índices criados por um comando"""
+    criar = CREATE_INDICE.match(comando)
+    if criar:
+        return [(criar.group(3), criar.group(2), (criar.group(1) or '').upper(), _colunas(comando, criar.end() - 1))]
+    alterar = ALTER_TABLE.match(comando)
+    if not alterar:
+        return []
+    return [(alterar.group(1), add.group(2), (add.group(1) or '').upper(), _colunas(comando, add.end() - 1))
+            for add in ADD_INDICE.finditer(comando)]
+
+
+def indices_divergentes(conn, comando):
+    """Índices do comando que já existem no banco com outra definição"""
+    divergentes = []
+    cursor = conn.cursor()
     try:
-        conn = mysql.connector.connect(
-            host="127.0.0.1",
-            user="root",
-            password=""
+        for tabela, indice, tipo, colunas in indices_do_comando(comando):
+            cursor.execute("""
+                SELECT COLUMN_NAME, NON_UNIQUE, INDEX_TYPE FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+                ORDER BY SEQ_IN_INDEX
+            """, (tabela, indice))
+            linhas = cursor.fetchall()
+            if not linhas:
+                continue
+            existentes = [linha[0].lower() for linha in linhas]
+            if linhas[0][2] in ('FULLTEXT', 'SPATIAL'):
+                tipo_existente = linhas[0][2]
+            else:
+                tipo_existente = '' if linhas[0][1] else 'UNIQUE'
+            if existentes != colunas or tipo_existente != tipo:
+                divergentes.append(
+                    f"{tabela}.{indice}: existe {tipo_existente} ({', '.join(existentes)}), "
+                    f"migração cria {tipo} ({', '.join(colunas)})"
+                )
+    finally:
+        cursor.close()
+    return divergentes
+
+
+def listar_migracoes():
+    """[(versão, nome do arquivo, caminho)] em ordem de versão"""
+    migracoes = []
+    for caminho in glob.glob(os.path.join(DIRETORIO, '*.sql')):
+        nome = os.path.basename(caminho)
+        versao = re.match(r'^(\d+)_', nome)
+        if versao:
+            migracoes.append((versao.group(1), nome, caminho))
+    migracoes.sort(key=lambda m: int(m[0]))
+    return migracoes
+
+
+def checksum(caminho):
+    with open(caminho, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def conectar():
+    conn = mysql.connector.connect(
+        host=Config.MYSQL_HOST or "127.0.0.1",
+        user=Config.MYSQL_USER or "root",
+        password=Config.MYSQL_PASSWORD or ""
+    )
+    banco = Config.MYSQL_DB or "pecuaria_db"
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{banco}`")
+    cursor.execute(f"USE `{banco}`")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migracoes (
+            versao VARCHAR(20) PRIMARY KEY,
+            arquivo VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            duracao_ms INT NOT NULL,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        cursor = conn.cursor()
-        print("Conexão ao MySQL estabelecida com sucesso!")
-        
-        # Ler o arquivo SQL
-        script_path = os.path.join(os.path.dirname(__file__), 'BD', '01_inicial.sql')
-        with open(script_path, 'r') as file:
-            sql_script = file.read()
-        
-        # Dividir o script em comandos individuais
-        commands = sql_script.split(';')
-        
-        # Executar cada comando
-        for command in commands:
-            command = command.strip()
-            if command:
-                cursor.execute(command)
-                print(f"Comando executado: {command[:50]}...")
-        
+    """)
+    cursor.close()
+    return conn
+
+
+def aplicadas(conn):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT versao, arquivo, checksum, aplicada_em FROM schema_migracoes")
+    resultado = {linha['versao']: linha for linha in cursor.fetchall()}
+    cursor.close()
+    return resultado
+
+
+def registrar(conn, versao, nome, caminho, duracao_ms):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO schema_migracoes (versao, arquivo, checksum, duracao_ms)
+            VALUES (%s, %s, %s, %s)
+        """, (versao, nome, checksum(caminho), duracao_ms))
         conn.commit()
-        print("Banco de dados configurado com sucesso!")
-        
+    finally:
+        cursor.close()
+
+
+def aplicar(conn, versao, nome, caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        comandos = dividir_comandos(f.read())
+
+    cursor = conn.cursor()
+    inicio = time.perf_counter()
+    try:
+        # Sem commit por comando: os de dados são gravados com o registro da
+        # versão (DDL faz commit implícito no MySQL)
+        for comando in comandos:
+            resumo = ' '.join(comando.split())[:70]
+            try:
+                cursor.execute(comando)
+                if cursor.with_rows:
+                    cursor.fetchall()
+                print(f"  ok: {resumo}")
+            except mysql.connector.Error as err:
+                if err.errno not in JA_EXISTE:
+                    conn.rollback()
+                    raise
+                if err.errno == errorcode.ER_DUP_KEYNAME:
+                    divergentes = indices_divergentes(conn, comando)
+                    if divergentes:
+                        conn.rollback()
+                        for divergente in divergentes:
+                            print(f"  índice com outra definição: {divergente}")
+                        raise
+                print(f"  já existe: {resumo}")
+
+        duracao_ms = int((time.perf_counter() - inicio) * 1000)
+        registrar(conn, versao, nome, caminho, duracao_ms)
+        return duracao_ms
+    finally:
+        cursor.close()
+
+
+def migrar(ate=None, lock_wait_timeout=30):
+    conn = conectar()
+    try:
+        # DDL espera por metadata lock enquanto houver transações abertas na
+        # tabela; com um limite, a migração falha em vez de travar o app
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION lock_wait_timeout = %s", (lock_wait_timeout,))
+        cursor.close()
+
+        feitas = aplicadas(conn)
+        pendentes = [m for m in listar_migracoes()
+                     if m[0] not in feitas and (ate is None or int(m[0]) <= int(ate))]
+        if not pendentes:
+            print("Banco de dados atualizado; nenhuma migração pendente")
+            return 0
+
+        for versao, nome, caminho in pendentes:
+            print(f"Aplicando {nome}...")
+            duracao_ms = aplicar(conn, versao, nome, caminho)
+            print(f"  {nome} aplicada em {duracao_ms} ms")
+        print(f"{len(pendentes)} migrações aplicadas")
+        return 0
     except mysql.connector.Error as err:
-        print(f"Erro ao configurar o banco de dados: {err}")
+        print(f"Erro ao aplicar migração: {err}")
+        if err.errno == errorcode.ER_LOCK_WAIT_TIMEOUT:
+            print("A tabela está em uso por transações longas; tente de novo ou aumente --lock-wait-timeout")
+        return 1
     finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
+        conn.close()
+
+
+def baseline(ate):
+    """Registra as migrações até 'ate' como aplicadas, sem executá-las"""
+    conn = conectar()
+    try:
+        feitas = aplicadas(conn)
+        for versao, nome, caminho in listar_migracoes():
+            if int(versao) <= int(ate) and versao not in feitas:
+                registrar(conn, versao, nome, caminho, 0)
+                print(f"{nome} registrada como aplicada")
+        return 0
+    finally:
+        conn.close()
+
+
+def status():
+    conn = conectar()
+    try:
+        feitas = aplicadas(conn)
+        for versao, nome, caminho in listar_migracoes():
+            registro = feitas.get(versao)
+            if registro is None:
+                print(f"{versao}  pendente            {nome}")
+                continue
+            alerta = "" if registro['checksum'] == checksum(caminho) else "  (arquivo alterado depois de aplicado)"
+            print(f"{versao}  {registro['aplicada_em']}  {nome}{alerta}")
+        return 0
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrações do banco de dados")
+    parser.add_argument('comando', nargs='?', choices=['migrar', 'status', 'baseline'], default='migrar',
+                        help="migrar: aplica as pendentes; status: lista as versões; "
+                             "baseline: registra como aplicadas sem executar (exige --ate)")
+    parser.add_argument('--ate', help="considera as migrações só até esta versão")
+    parser.add_argument('--lock-wait-timeout', type=int, default=30,
+                        help="segundos de espera por metadata lock em cada comando")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'status':
+            return status()
+        if args.comando == 'baseline':
+            if not args.ate:
+                parser.error("baseline exige --ate")
+            return baseline(args.ate)
+        return migrar(args.ate, args.lock_wait_timeout)
+    except mysql.connector.Error as err:
+        print(f"Erro ao conectar ao banco de dados: {err}")
+        return 1
+
 
 if __name__ == "__main__":
-    setup_database()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,318 @@
+// Variáveis globais
+let animalIdParaExcluir = null;
+let animalModal = null;
+let confirmDeleteAnimalModal = null;
+let animalVersaoEmEdicao = null; // ETag do animal aberto no formulário
+let animaisProximoCursor = null;
+let animaisBuscaAtual = '';
+
+// Inicializar quando o DOM estiver carregado
+document.addEventListener('DOMContentLoaded', function() {
+    animalModal = new bootstrap.Modal(document.getElementById('animalModal'));
+    confirmDeleteAnimalModal = new bootstrap.Modal(document.getElementById('confirmDeleteAnimalModal'));
+
+    carregarAnimais();
+
+    // Adicionar evento de busca ao pressionar Enter
+    document.getElementById('busca-animal').addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            buscarAnimais();
+        }
+    });
+});
+
+// Função para carregar a primeira página de animais (com o termo de busca atual)
+async function carregarAnimais() {
+    animaisProximoCursor = null;
+    document.getElementById('animais-table-body').innerHTML = '';
+    await carregarPaginaAnimais();
+}
+
+// Função para carregar a página seguinte (paginação por cursor)
+function carregarMaisAnimais() {
+    carregarPaginaAnimais();
+}
+
+async function carregarPaginaAnimais() {
+    try {
+        mostrarLoadingAnimais(true);
+
+        const params = new URLSearchParams({ limit: 100 });
+        if (animaisBuscaAtual) {
+            params.set('busca', animaisBuscaAtual);
+        }
+        if (animaisProximoCursor) {
+            params.set('after', animaisProximoCursor);
+        }
+
+        const response = await fetch(`/api/animais?${params}`);
+
+        if (response.status === 401) {
+            // Redirecionar para a página de login se não estiver autenticado
+            window.location.href = '/login';
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            animaisProximoCursor = data.next_cursor;
+            renderizarAnimais(data.animais);
+        } else {
+            showAlert('error', data.error || 'Erro ao carregar animais');
+        }
+    } catch (error) {
+        console.error('Erro ao carregar animais:', error);
+        showAlert('error', 'Erro ao carregar animais');
+    } finally {
+        mostrarLoadingAnimais(false);
+    }
+}
+
+// Função para buscar animais
+function buscarAnimais() {
+    animaisBuscaAtual = document.getElementById('busca-animal').value.trim();
+    carregarAnimais();
+}
+
+// Escapar texto vindo da API antes de inserir no HTML
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto == null ? '' : String(texto);
+    return div.innerHTML;
+}
+
+// Função para renderizar (acrescentar) animais na tabela
+function renderizarAnimais(animais) {
+    const tableBody = document.getElementById('animais-table-body');
+    const emptyMessage = document.getElementById('animais-empty');
+
+    emptyMessage.style.display = tableBody.children.length === 0 && animais.length === 0 ? 'block' : 'none';
+    document.getElementById('animais-mais').style.display = animaisProximoCursor ? 'inline-block' : 'none';
+
+    animais.forEach(animal => {
+        const row = document.createElement('tr');
+
+        row.innerHTML = `
+            <td>${escaparHtml(animal.codigo)}</td>
+            <td>${escaparHtml(animal.tipo)}</td>
+            <td class="hide-xs">${animal.raca ? escaparHtml(animal.raca) : '-'}</td>
+            <td class="hide-xs">${escaparHtml(animal.sexo)}</td>
+            <td class="hide-xs">${animal.peso ? escaparHtml(animal.peso) : '-'}</td>
+            <td>${escaparHtml(animal.status)}</td>
+            <td>
+                <div class="d-flex flex-column flex-sm-row">
+                    <button class="btn btn-sm btn-info mb-1 mb-sm-0 me-sm-1" onclick="editarAnimal(${animal.id})">
+                        <i class="fas fa-edit"></i>
+                    </button>
+                    <button class="btn btn-sm btn-danger mb-1 mb-sm-0 me-sm-1" data-codigo="${escaparHtml(animal.codigo)}" onclick="excluirAnimal(${animal.id}, this.dataset.codigo)">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+            </td>
+        `;
+
+        tableBody.appendChild(row);
+    });
+}
+
+// Função para mostrar/esconder o loading
+function mostrarLoadingAnimais(mostrar) {
+    document.getElementById('animais-loading').style.display = mostrar ? 'block' : 'none';
+}
+
+// Converte a data da API (RFC 1123 ou ISO) para o campo date (aaaa-mm-dd)
+function dataParaCampo(valor) {
+    if (!valor) return '';
+    const data = new Date(valor);
+    if (isNaN(data)) return '';
+    return data.toISOString().slice(0, 10);
+}
+
+// Converte o campo date (aaaa-mm-dd) para o formato da API (dd/mm/aaaa)
+function campoParaData(valor) {
+    if (!valor) return null;
+    const [ano, mes, dia] = valor.split('-');
+    return `${dia}/${mes}/${ano}`;
+}
+
+// Função para mostrar o modal de cadastro de animal
+function showAnimalModal() {
+    document.getElementById('animal-form').reset();
+    document.getElementById('animal-id').value = '';
+    animalVersaoEmEdicao = null;
+    document.getElementById('animalModalLabel').textContent = 'Novo Animal';
+    animalModal.show();
+}
+
+// Função para editar um animal
+async function editarAnimal(id) {
+    try {
+        const response = await fetch(`/api/animais/${id}`);
+
+        if (response.status === 401) {
+            // Redirecionar para a página de login se não estiver autenticado
+            window.location.href = '/login';
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            const animal = data.animal;
+
+            // Versão lida, enviada no If-Match ao salvar
+            animalVersaoEmEdicao = response.headers.get('ETag');
+
+            // Preencher o formulário
+            document.getElementById('animal-id').value = animal.id;
+            document.getElementById('animal-codigo').value = animal.codigo || '';
+            document.getElementById('animal-tipo').value = animal.tipo || '';
+            document.getElementById('animal-raca').value = animal.raca || '';
+            document.getElementById('animal-data-nascimento').value = dataParaCampo(animal.data_nascimento);
+            document.getElementById('animal-sexo').value = animal.sexo || '';
+            document.getElementById('animal-peso').value = animal.peso || '';
+            document.getElementById('animal-status').value = animal.status || 'Ativo';
+            document.getElementById('animal-observacoes').value = animal.observacoes || '';
+
+            document.getElementById('animalModalLabel').textContent = 'Editar Animal';
+            animalModal.show();
+        } else {
+            showAlert('error', data.error || 'Erro ao carregar dados do animal');
+        }
+    } catch (error) {
+        console.error('Erro ao carregar dados do animal:', error);
+        showAlert('error', 'Erro ao carregar dados do animal');
+    }
+}
+
+// Função para salvar um animal (criar ou atualizar)
+async function salvarAnimal() {
+    const form = document.getElementById('animal-form');
+    if (!form.checkValidity()) {
+        form.reportValidity();
+        return;
+    }
+
+    const id = document.getElementById('animal-id').value;
+    const animal = {
+        codigo: document.getElementById('animal-codigo').value.trim(),
+        tipo: document.getElementById('animal-tipo').value,
+        raca: document.getElementById('animal-raca').value,
+        data_nascimento: campoParaData(document.getElementById('animal-data-nascimento').value),
+        sexo: document.getElementById('animal-sexo').value,
+        peso: document.getElementById('animal-peso').value || null,
+        status: document.getElementById('animal-status').value,
+        observacoes: document.getElementById('animal-observacoes').value
+    };
+
+    try {
+        let url = '/api/animais';
+        let method = 'POST';
+        const headers = {
+            'Content-Type': 'application/json',
+            'X-Requested-With': 'XMLHttpRequest'
+        };
+
+        if (id) {
+            url = `/api/animais/${id}`;
+            method = 'PUT';
+            if (animalVersaoEmEdicao) {
+                // Não sobrescrever alterações feitas por outro usuário
+                headers['If-Match'] = animalVersaoEmEdicao;
+            }
+        }
+
+        const response = await fetch(url, {
+            method: method,
+            headers: headers,
+            body: JSON.stringify(animal)
+        });
+
+        if (response.status === 401) {
+            // Redirecionar para a página de login se não estiver autenticado
+            window.location.href = '/login';
+            return;
+        }
+
+        if (response.status === 412) {
+            const conflito = await response.json();
+            showAlert('error', conflito.error || 'O animal foi alterado por outro usuário');
+            animalModal.hide();
+            carregarAnimais();
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            showAlert('success', data.message || 'Animal salvo com sucesso');
+            animalModal.hide();
+            carregarAnimais();
+        } else {
+            showAlert('error', data.error || 'Erro ao salvar animal');
+        }
+    } catch (error) {
+        console.error('Erro ao salvar animal:', error);
+        showAlert('error', 'Erro ao salvar animal');
+    }
+}
+
+// Função para mostrar o modal de confirmação de exclusão
+function excluirAnimal(id, codigo) {
+    animalIdParaExcluir = id;
+    document.getElementById('delete-animal-codigo').textContent = codigo;
+    confirmDeleteAnimalModal.show();
+}
+
+// Função para confirmar a exclusão de um animal
+async function confirmarExclusaoAnimal() {
+    if (!animalIdParaExcluir) return;
+
+    try {
+        const response = await fetch(`/api/animais/${animalIdParaExcluir}`, {
+            method: 'DELETE',
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        });
+
+        if (response.status === 401) {
+            window.location.href = '/login';
+            return;
+        }
+
+        const data = await response.json();
+        confirmDeleteAnimalModal.hide();
+
+        if (data.success) {
+            showAlert('success', data.message || 'Animal excluído com sucesso');
+            carregarAnimais();
+        } else {
+            showAlert('error', data.error || 'Erro ao excluir animal');
+        }
+    } catch (error) {
+        console.error('Erro ao excluir animal:', error);
+        showAlert('error', 'Erro ao excluir animal');
+    } finally {
+        animalIdParaExcluir = null;
+    }
+}
+
+// Função auxiliar para mostrar alertas
+function showAlert(type, message) {
+    const alertContainer = document.getElementById('alert-container');
+    if (!alertContainer) return;
+
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type === 'error' ? 'danger' : type}`;
+    alertDiv.textContent = message;
+
+    alertContainer.innerHTML = '';
+    alertContainer.appendChild(alertDiv);
+
+    // Remover o alerta após 5 segundos
+    setTimeout(() => {
+        alertDiv.remove();
+    }, 5000);
+}
@@ -3,6 +3,7 @@ let fazendaIdParaExcluir = null;
 let fazendaModal = null;
 let confirmDeleteModal = null;
 let detalhesFazendaModal = null; // Declare globalmente
+let fazendaVersaoEmEdicao = null; // ETag da fazenda aberta no formulário
 
 // Inicializar quando o DOM estiver carregado
 document.addEventListener('DOMContentLoaded', function() {
@@ -158,6 +159,7 @@ function showFazendaModal() {
     // Limpar o formulário
     document.getElementById('fazenda-form').reset();
     document.getElementById('fazenda-id').value = '';
+    fazendaVersaoEmEdicao = null;
     document.getElementById('fazendaModalLabel').textContent = 'Nova Fazenda';
     
     // Mostrar o modal
@@ -180,6 +182,9 @@ async function editarFazenda(id) {
         if (data.success) {
             const fazenda = data.fazenda;
             
+            // Versão lida, enviada no If-Match ao salvar
+            fazendaVersaoEmEdicao = response.headers.get('ETag');
+            
             // Preencher o formulário
             document.getElementById('fazenda-id').value = fazenda.id;
             document.getElementById('fazenda-nome').value = fazenda.nome || '';
@@ -238,18 +243,23 @@ async function salvarFazenda() {
     try {
         let url = '/api/fazendas';
         let method = 'POST';
+        const headers = {
+            'Content-Type': 'application/json',
+            'X-Requested-With': 'XMLHttpRequest'
+        };
         
         if (id) {
             url = `/api/fazendas/${id}`;
             method = 'PUT';
+            if (fazendaVersaoEmEdicao) {
+                // Não sobrescrever alterações feitas por outro usuário
+                headers['If-Match'] = fazendaVersaoEmEdicao;
+            }
         }
         
         const response = await fetch(url, {
             method: method,
-            headers: {
-                'Content-Type': 'application/json',
-                'X-Requested-With': 'XMLHttpRequest'
-            },
+            headers: headers,
             body: JSON.stringify(fazenda)
         });
         
@@ -259,6 +269,14 @@ async function salvarFazenda() {
             return;
         }
         
+        if (response.status === 412) {
+            const conflito = await response.json();
+            showAlert('error', conflito.error || 'A fazenda foi alterada por outro usuário');
+            fazendaModal.hide();
+            carregarFazendas();
+            return;
+        }
+        
         const data = await response.json();
         
         if (data.success) {
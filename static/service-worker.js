@@ -1,4 +1,4 @@
-const CACHE_NAME = 'pecuaria-v4'; // Incrementado para forçar atualização do cache
+const CACHE_NAME = 'pecuaria-v6'; // Incrementado para forçar atualização do cache
 // Recursos a serem cacheados
 const urlsToCache = [
     '/',
@@ -1,10 +1,38 @@
-from flask import session, jsonify, request, redirect, url_for
+from flask import session, jsonify, request, redirect, url_for, g
 from functools import wraps
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.usuario import Usuario
+
+def get_current_user():
+    """
+    Registro atual do usuário logado (tipo e senha temporária), lido uma vez
+    por requisição e mantido em cache curto entre requisições.
+
+    Mantém os campos da sessão sincronizados com o banco, para que um admin
+    rebaixado perca o acesso sem precisar sair. Retorna None se não houver
+    usuário logado ou se ele tiver sido excluído.
+    """
+    if 'user_id' not in session:
+        return None
+    if 'current_user' not in g:
+        usuario = Usuario.get_auth_record(session['user_id'])
+        if usuario is None:
+            session.clear()
+        else:
+            if session.get('user_type') != usuario['tipo_usuario']:
+                session['user_type'] = usuario['tipo_usuario']
+            if session.get('senha_temporaria') != usuario['senha_temporaria']:
+                session['senha_temporaria'] = usuario['senha_temporaria']
+        g.current_user = usuario
+    return g.current_user
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if get_current_user() is None:
             # Verificar se a requisição espera JSON ou HTML
             if request.path.startswith('/api/') or request.is_xhr or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return jsonify({"error": "Não autorizado", "redirect": "/login"}), 401
@@ -16,9 +44,10 @@ def login_required(f):
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        usuario = get_current_user()
+        if usuario is None:
             return jsonify({"error": "Não autorizado"}), 401
-        if session.get('user_type') != 'admin':
+        if usuario['tipo_usuario'] != 'admin':
             return jsonify({"error": "Acesso restrito a administradores"}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -26,7 +55,8 @@ def admin_required(f):
 def check_temp_password(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if session.get('senha_temporaria'):
+        usuario = get_current_user()
+        if usuario and usuario['senha_temporaria']:
             return jsonify({"error": "É necessário alterar a senha temporária"}), 403
         return f(*args, **kwargs)
-    return decorated_function
\ No newline at end of file
+    return decorated_function
@@ -0,0 +1,361 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import gzip
+import json
+import logging
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config, get_application_path
+from utils.database import get_dedicated_connection
+from utils.cache import bump_data_version
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Ordem de gravação e de restauração (fazendas antes de animais, por causa
+# da chave estrangeira)
+TABELAS = ('usuarios', 'fazendas', 'animais')
+FORMATO = 'pecuaria-backup'
+VERSAO_FORMATO = 1
+
+
+class BackupEmAndamentoError(Exception):
+    """Já existe um backup sendo gerado"""
+
+
+def backup_dir():
+    diretorio = Config.BACKUP_DIR or os.path.join(get_application_path(), 'backups')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def _caminho_status(id):
+    return os.path.join(backup_dir(), f"{id}.status.json")
+
+
+def caminho_arquivo(id):
+    return os.path.join(backup_dir(), f"{id}.ndjson.gz")
+
+
+def _gravar_status(status):
+    # O estado fica em arquivo para que qualquer worker possa responder
+    # à consulta, não só o que iniciou o backup
+    caminho = _caminho_status(status['id'])
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def ler_status(id):
+    """Estado de um backup, ou None se não existir"""
+    if not id or os.path.basename(id) != id:
+        return None
+    try:
+        with open(_caminho_status(id), encoding='utf-8') as f:
+            status = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    # O backup roda como tarefa 'backup': se ela não está mais em execução
+    # (o worker parou e a tarefa expirou pelo sinal de vida, em qualquer
+    # host), o arquivo parcial não serve
+    if status['status'] == 'executando':
+        job = Job.get_by_id(status['job_id']) if status.get('job_id') else None
+        if job is None or job['status'] != 'executando':
+            status['status'] = 'interrompido'
+    return status
+
+
+def listar_backups():
+    """Todos os backups conhecidos, do mais recente para o mais antigo"""
+    backups = []
+    for nome in os.listdir(backup_dir()):
+        if nome.endswith('.status.json'):
+            status = ler_status(nome[:-len('.status.json')])
+            if status:
+                backups.append(status)
+    backups.sort(key=lambda b: b['iniciado_em'], reverse=True)
+    return backups
+
+
+def _valor_json(valor):
+    if isinstance(valor, (datetime, date, Decimal)):
+        return str(valor)
+    if isinstance(valor, timedelta):
+        return str(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.decode('utf-8')
+    raise TypeError(f"Tipo não suportado no backup: {type(valor).__name__}")
+
+
+def _linha(dados):
+    return json.dumps(dados, default=_valor_json, ensure_ascii=False) + '\n'
+
+
+def _base_incremental(cursor):
+    """
+    Instante a partir do qual o próximo backup incremental deve ler.
+
+    Uma linha alterada por uma transação ainda aberta no momento do snapshot
+    não entra neste backup, mas o seu data_atualizacao é o horário do
+    comando, anterior ao snapshot. Por isso o próximo incremental começa no
+    início da transação aberta mais antiga (ou agora, se não houver), menos
+    BACKUP_MARGEM_SEGUNDOS. A sobreposição é inofensiva: a restauração
+    atualiza as linhas que já existem.
+    """
+    margem = Config.BACKUP_MARGEM_SEGUNDOS
+    try:
+        cursor.execute("""
+            SELECT LEAST(NOW(), COALESCE(MIN(trx_started), NOW())) - INTERVAL %s SECOND
+            FROM information_schema.innodb_trx
+        """, (margem,))
+    except Exception as e:
+        # Sem o privilégio PROCESS, innodb_trx não pode ser lida
+        logger.warning("Não foi possível consultar as transações abertas (%s); usando só a margem", e)
+        cursor.execute("SELECT NOW() - INTERVAL %s SECOND", (margem,))
+    return str(cursor.fetchone()[0])
+
+
+def gerar_backup(status, lote=None, ao_progredir=None):
+    """
+    Grava o backup descrito em 'status' (id, desde) e atualiza o progresso.
+
+    Todas as tabelas são lidas dentro de uma única transação com snapshot
+    consistente, em blocos pela chave primária, e gravadas comprimidas
+    linha a linha; nenhuma tabela é carregada inteira na memória.
+
+    Formato (JSON por linha, gzip): um cabeçalho, depois para cada tabela
+    {"tabela", "colunas"}, as linhas como arrays e {"fim", "linhas"}.
+
+    ao_progredir(status) é chamado a cada bloco; uma exceção lançada por
+    ele interrompe o backup e remove o arquivo parcial.
+    """
+    lote = lote or Config.BACKUP_LOTE
+    arquivo = caminho_arquivo(status['id'])
+    parcial = arquivo + '.parcial'
+    conn = None
+    cursor = None
+    try:
+        conn = get_dedicated_connection()
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        # Ponto de partida do próximo incremental, calculado antes do snapshot
+        status['base_incremental'] = _base_incremental(cursor)
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        # Momento do snapshot
+        cursor.execute("SELECT NOW()")
+        status['ate'] = str(cursor.fetchone()[0])
+
+        filtro = ""
+        if status.get('desde'):
+            filtro = " AND data_atualizacao >= %s"
+
+        descritor = os.open(parcial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # Só o dono do processo lê o arquivo: ele contém os hashes das senhas
+        with os.fdopen(descritor, 'wb') as bruto, gzip.open(bruto, 'wt', encoding='utf-8') as saida:
+            saida.write(_linha({
+                "formato": FORMATO,
+                "versao": VERSAO_FORMATO,
+                "tipo": status['tipo'],
+                "desde": status.get('desde'),
+                "ate": status['ate'],
+                "tabelas": list(TABELAS)
+            }))
+
+            for tabela in TABELAS:
+                status['tabela_atual'] = tabela
+                total = 0
+                ultimo_id = 0
+                colunas = None
+                while True:
+                    params = [ultimo_id]
+                    if filtro:
+                        params.append(status['desde'])
+                    params.append(lote)
+                    cursor.execute(
+                        f"SELECT * FROM {tabela} WHERE id > %s{filtro} ORDER BY id LIMIT %s",
+                        tuple(params)
+                    )
+                    linhas = cursor.fetchall()
+                    if colunas is None:
+                        colunas = list(cursor.column_names)
+                        saida.write(_linha({"tabela": tabela, "colunas": colunas}))
+                    if not linhas:
+                        break
+
+                    posicao_id = colunas.index('id')
+                    for linha in linhas:
+                        saida.write(_linha(list(linha)))
+                    total += len(linhas)
+                    ultimo_id = linhas[-1][posicao_id]
+
+                    status['tabelas'][tabela] = total
+                    status['linhas'] = sum(status['tabelas'].values())
+                    _gravar_status(status)
+                    if ao_progredir:
+                        ao_progredir(status)
+                    if len(linhas) < lote:
+                        break
+
+                saida.write(_linha({"fim": tabela, "linhas": total}))
+                status['tabelas'][tabela] = total
+
+        os.replace(parcial, arquivo)
+        status.update({
+            "status": "concluido",
+            "tabela_atual": None,
+            "linhas": sum(status['tabelas'].values()),
+            "bytes": os.path.getsize(arquivo),
+            "concluido_em": datetime.now().isoformat(timespec='seconds')
+        })
+        _gravar_status(status)
+        logger.info("Backup %s concluído: %d linhas, %d bytes",
+                    status['id'], status['linhas'], status['bytes'])
+        return status
+    except Exception as e:
+        logger.exception("Erro ao gerar backup %s", status['id'])
+        status.update({
+            "status": "erro",
+            "erro": str(e),
+            "concluido_em": datetime.now().isoformat(timespec='seconds')
+        })
+        _gravar_status(status)
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def ultimo_backup_concluido():
+    for backup in listar_backups():
+        if backup['status'] == 'concluido':
+            return backup
+    return None
+
+
+def novo_backup(job_id, incremental=False, desde=None):
+    """
+    Registra um backup completo, ou incremental a partir de 'desde' (por
+    padrão, o instante do último backup concluído), gerado pela tarefa
+    job_id. Não inicia a gravação.
+    """
+    for backup in listar_backups():
+        if backup['status'] == 'executando':
+            raise BackupEmAndamentoError(f"O backup {backup['id']} ainda está em andamento")
+
+    if incremental and not desde:
+        anterior = ultimo_backup_concluido()
+        if anterior is None:
+            raise ValueError("Nenhum backup concluído para servir de base ao incremental")
+        # Backups anteriores a base_incremental só têm o instante do snapshot
+        desde = anterior.get('base_incremental') or anterior['ate']
+
+    tipo = 'incremental' if desde else 'completo'
+    agora = datetime.now()
+    status = {
+        "id": f"backup-{agora:%Y%m%d-%H%M%S}-{tipo}",
+        "tipo": tipo,
+        "status": "executando",
+        "job_id": job_id,
+        "desde": desde,
+        "ate": None,
+        "base_incremental": None,
+        "iniciado_em": agora.isoformat(timespec='seconds'),
+        "concluido_em": None,
+        "tabela_atual": None,
+        "tabelas": {},
+        "linhas": 0,
+        "bytes": None,
+        "erro": None
+    }
+    _gravar_status(status)
+    return status
+
+
+def ler_backup(caminho):
+    """
+    Percorre um arquivo de backup devolvendo (tabela, colunas, linhas) em
+    blocos, sem carregar o arquivo inteiro. O cabeçalho é validado antes.
+    """
+    with gzip.open(caminho, 'rt', encoding='utf-8') as entrada:
+        cabecalho = json.loads(entrada.readline())
+        if cabecalho.get('formato') != FORMATO or cabecalho.get('versao') != VERSAO_FORMATO:
+            raise ValueError(f"{caminho} não é um backup no formato {FORMATO} v{VERSAO_FORMATO}")
+        yield cabecalho, None, None
+
+        tabela = colunas = None
+        for texto in entrada:
+            dados = json.loads(texto)
+            if isinstance(dados, list):
+                yield tabela, colunas, dados
+            elif 'tabela' in dados:
+                tabela, colunas = dados['tabela'], dados['colunas']
+                if tabela not in TABELAS:
+                    raise ValueError(f"Tabela desconhecida no backup: {tabela}")
+            elif 'fim' in dados:
+                tabela = colunas = None
+
+
+def restaurar_backup(caminho, lote=1000, ao_progredir=None):
+    """
+    Restaura um arquivo de backup com INSERTs em lote. Linhas que já
+    existem (mesma chave) são atualizadas, então um backup incremental pode
+    ser aplicado por cima do completo. Exclusões não são reproduzidas.
+
+    Retorna o número de linhas restauradas por tabela.
+    """
+    conn = None
+    cursor = None
+    totais = {}
+    try:
+        conn = get_dedicated_connection()
+        cursor = conn.cursor()
+
+        tabela_atual = None
+        query = None
+        bloco = []
+
+        def gravar():
+            cursor.executemany(query, bloco)
+            conn.commit()
+            totais[tabela_atual] = totais.get(tabela_atual, 0) + len(bloco)
+            if ao_progredir:
+                ao_progredir(tabela_atual, totais[tabela_atual])
+            bloco.clear()
+
+        for tabela, colunas, linha in ler_backup(caminho):
+            if colunas is None:
+                continue
+            if tabela != tabela_atual:
+                if bloco:
+                    gravar()
+                tabela_atual = tabela
+                query = f"""
+                    INSERT INTO {tabela} ({', '.join(colunas)})
+                    VALUES ({', '.join(['%s'] * len(colunas))})
+                    ON DUPLICATE KEY UPDATE {', '.join(f'{c} = VALUES({c})' for c in colunas if c != 'id')}
+                """
+            bloco.append(linha)
+            if len(bloco) >= lote:
+                gravar()
+        if bloco:
+            gravar()
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        raise e
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    bump_data_version('animais')
+    bump_data_version('fazendas')
+    return totais
@@ -0,0 +1,26 @@
+import re
+
+# Tamanho dos tokens do parser ngram do MySQL (variável ngram_token_size, padrão 2).
+# Termos menores que isso não são encontrados pelo índice FULLTEXT.
+NGRAM_TOKEN_SIZE = 2
+
+
+def termo_fulltext(termo_busca):
+    """
+    Converte o texto digitado na busca em uma expressão MATCH ... AGAINST
+    em modo booleano, exigindo todas as palavras.
+
+    Retorna None se nenhuma palavra tiver o tamanho mínimo do índice; nesse
+    caso a busca deve usar LIKE.
+    """
+    # Remover operadores do modo booleano para não quebrar a expressão
+    palavras = [p for p in re.findall(r'\w+', termo_busca or '') if len(p) >= NGRAM_TOKEN_SIZE]
+    if not palavras:
+        return None
+    return ' '.join(f'+"{p}"' for p in palavras)
+
+
+def prefixo_like(termo_busca):
+    """Padrão LIKE 'termo%' com os curingas do termo escapados"""
+    escapado = termo_busca.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escapado + '%'
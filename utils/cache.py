@@ -0,0 +1,262 @@
+from flask import request, g, has_request_context, Response
+from collections import OrderedDict
+from functools import wraps
+import logging
+import threading
+import time
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from utils.database import antes_do_commit, get_dedicated_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """
+    Cache LRU com TTL, em memória do processo (um por worker).
+
+    As versões dos dados também ficam no processo; com vários workers, uma
+    escrita só invalida o cache do worker que a recebeu e os demais dependem
+    do TTL. Para invalidação imediata entre workers use o backend redis.
+    """
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._versoes = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, ttl=None):
+        expira_em = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            self._dados[chave] = (expira_em, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entries:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+
+    def get_version(self, nome):
+        with self._lock:
+            return self._versoes.get(nome, 0)
+
+    def bump_version(self, nome):
+        with self._lock:
+            self._versoes[nome] = self._versoes.get(nome, 0) + 1
+
+    def info(self):
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "entradas": len(self._dados),
+                "max_entradas": self.max_entries,
+                "evictions": self.evictions,
+                "versoes": dict(self._versoes)
+            }
+
+
+class RedisCache:
+    """Cache compartilhado entre workers e servidores, usando Redis"""
+
+    PREFIXO = 'pecuaria:cache:'
+
+    def __init__(self, url, ttl=60):
+        # Dependência opcional: só é necessária quando este backend é usado
+        import redis
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, chave):
+        return self._redis.get(self.PREFIXO + chave)
+
+    def set(self, chave, valor, ttl=None):
+        self._redis.set(self.PREFIXO + chave, valor, ex=ttl or self.ttl)
+
+    def get_version(self, nome):
+        return int(self._redis.get(self.PREFIXO + 'versao:' + nome) or 0)
+
+    def bump_version(self, nome):
+        self._redis.incr(self.PREFIXO + 'versao:' + nome)
+
+    def info(self):
+        return {
+            "backend": "redis",
+            "entradas": self._redis.dbsize()
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Config.CACHE_BACKEND == 'redis':
+                    _backend = RedisCache(Config.CACHE_REDIS_URL, ttl=Config.CACHE_TTL)
+                else:
+                    _backend = MemoryCache(Config.CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL)
+    return _backend
+
+
+def _contar(endpoint, campo):
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+        stats[campo] += 1
+
+
+def get_cache_stats():
+    """Acertos e falhas por endpoint (deste worker) e informações do backend"""
+    with _stats_lock:
+        por_endpoint = {endpoint: dict(stats) for endpoint, stats in _stats.items()}
+    hits = sum(stats["hits"] for stats in por_endpoint.values())
+    misses = sum(stats["misses"] for stats in por_endpoint.values())
+    return {
+        "hits": hits,
+        "misses": misses,
+        "taxa_acerto": round(hits / (hits + misses), 3) if hits + misses else None,
+        "endpoints": por_endpoint,
+        "backend": get_cache().info()
+    }
+
+
+def bump_data_version(nome, banco=True):
+    """
+    Invalida as respostas em cache que dependem dos dados informados
+    ('animais', 'fazendas').
+
+    Dentro de uma requisição a versão do cache é incrementada de novo depois
+    do commit, para que uma leitura concorrente feita antes do commit não
+    fique guardada com a versão nova. O contador do banco (versoes_dados,
+    base do ETag das listagens) é incrementado na própria transação da
+    requisição, logo antes do commit. Quem grava por uma conexão própria
+    incrementa o contador com incrementar_versao() antes do seu commit e
+    passa banco=False.
+    """
+    _bump(nome)
+    if not banco:
+        return
+    if has_request_context():
+        pendentes = g.setdefault('versoes_pendentes', set())
+        if not pendentes:
+            antes_do_commit(_bump_banco_pendentes)
+        pendentes.add(nome)
+    else:
+        _bump_banco(nome)
+
+
+_INCREMENTAR_VERSAO = """
+    INSERT INTO versoes_dados (nome, versao) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE versao = versao + 1
+"""
+
+
+def incrementar_versao(cursor, nome):
+    """Incrementa o contador de versoes_dados na transação do cursor"""
+    cursor.execute(_INCREMENTAR_VERSAO, (nome,))
+
+
+def _bump_banco_pendentes(cursor):
+    # Em ordem de nome, para que duas requisições não travem uma à outra
+    for nome in sorted(g.get('versoes_pendentes', ())):
+        incrementar_versao(cursor, nome)
+
+
+def _bump_banco(nome):
+    """Incrementa o contador compartilhado por todos os workers (fora de requisição)"""
+    conn = None
+    cursor = None
+    try:
+        conn = get_dedicated_connection()
+        cursor = conn.cursor()
+        incrementar_versao(cursor, nome)
+        conn.commit()
+    except Exception:
+        logger.exception("Erro ao incrementar a versão de %s no banco; os ETags das listagens "
+                         "podem ficar desatualizados", nome)
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def _bump(nome):
+    try:
+        get_cache().bump_version(nome)
+    except Exception as e:
+        logger.warning("Erro ao invalidar cache de %s: %s", nome, e)
+
+
+def _bump_pending_versions(exc):
+    for nome in g.pop('versoes_pendentes', ()):
+        _bump(nome)
+
+
+def init_cache(app):
+    # teardown_request roda depois do after_request que confirma a transação
+    app.teardown_request(_bump_pending_versions)
+
+
+def cached_response(*dependencias, ttl=None):
+    """
+    Guarda a resposta de sucesso (status 200) de um endpoint GET.
+
+    A chave inclui o endpoint, os parâmetros da query string e a versão atual
+    de cada dado em 'dependencias'; uma escrita nesses dados muda a chave e
+    as entradas antigas expiram sozinhas pelo TTL ou pelo LRU.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = get_cache()
+            parametros = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+            try:
+                versoes = ",".join(f"{nome}={cache.get_version(nome)}" for nome in dependencias)
+                chave = f"{request.endpoint}?{parametros}|{versoes}"
+                corpo = cache.get(chave)
+            except Exception as e:
+                # Falha no backend (ex.: redis fora do ar) não derruba o endpoint
+                logger.warning("Erro ao consultar cache: %s", e)
+                return f(*args, **kwargs)
+            
+            if corpo is not None:
+                _contar(request.endpoint, "hits")
+                return Response(corpo, status=200, mimetype='application/json')
+            
+            _contar(request.endpoint, "misses")
+            resposta = f(*args, **kwargs)
+            
+            # As views retornam (jsonify(...), status)
+            if isinstance(resposta, tuple):
+                corpo_resposta, status = resposta[0], resposta[1]
+            else:
+                corpo_resposta, status = resposta, resposta.status_code
+            if status == 200:
+                try:
+                    cache.set(chave, corpo_resposta.get_data(), ttl)
+                except Exception as e:
+                    logger.warning("Erro ao gravar cache: %s", e)
+            return resposta
+        return decorated_function
+    return decorator
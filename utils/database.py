@@ -1,28 +1,364 @@
 import mysql.connector
 from mysql.connector import errorcode
+from flask import g, has_request_context, jsonify
+from collections import deque
+import logging
+import threading
+import time
 import sys
 import os
 # Adicionar o diretório pai ao path para permitir importações relativas
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from utils.query_stats import InstrumentedCursor
 
-# Função para obter uma conexão com o banco de dados
-def get_db_connection():
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(mysql.connector.errors.PoolError):
+    """Nenhuma conexão ficou livre dentro do tempo de espera do pool"""
+
+
+class VersaoConflitanteError(Exception):
+    """O registro foi alterado depois de lido (a versão informada não é a atual)"""
+
+    def __init__(self, versao_atual):
+        super().__init__("O registro foi alterado por outro usuário")
+        self.versao_atual = versao_atual
+
+
+class PooledConnection:
+    """
+    Envolve uma conexão do MySQL emprestada do pool.
+
+    Todos os atributos são repassados para a conexão real, exceto close(),
+    que devolve a conexão ao pool em vez de encerrá-la. Assim os blocos
+    finally dos models continuam funcionando sem alteração.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._returned_at = time.monotonic()
+        self._checked_out = False
+
+    def close(self):
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self)
+
+    def cursor(self, *args, **kwargs):
+        # Todas as consultas passam pela instrumentação (tempo, linhas, N+1)
+        return InstrumentedCursor(self._raw.cursor(*args, **kwargs))
+
+    def discard(self):
+        """Encerra a conexão real em vez de devolvê-la ao pool"""
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._close_raw(self)
+            self._pool._discard()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões simples, seguro para threads.
+
+    - size: número máximo de conexões abertas
+    - timeout: segundos de espera por uma conexão livre
+    - validate_after: conexões ociosas há mais tempo que isso recebem ping
+    - max_age: conexões mais antigas que isso são recicladas
+    """
+
+    def __init__(self, connect, size=5, timeout=10, validate_after=30, max_age=3600):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.max_age = max_age
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'created': 0,
+            'reconnects': 0,
+            'recycled': 0,
+        }
+
+    def get_connection(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    # Reservar a vaga; a conexão é aberta fora do lock
+                    self._open += 1
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"Nenhuma conexão livre no pool após {self.timeout}s"
+                    )
+                if not waited:
+                    waited = True
+                    self.stats['waits'] += 1
+                self._cond.wait(remaining)
+
+            self.stats['checkouts'] += 1
+
+        try:
+            if conn is None:
+                conn = self._new_connection()
+            else:
+                conn = self._check(conn)
+        except Exception:
+            self._discard()
+            raise
+
+        conn._checked_out = True
+        return conn
+
+    def _new_connection(self):
+        raw = self._connect()
+        with self._cond:
+            self.stats['created'] += 1
+        return PooledConnection(self, raw, time.monotonic())
+
+    def _check(self, conn):
+        """Recicla conexões velhas e valida as que ficaram ociosas por muito tempo"""
+        now = time.monotonic()
+
+        if self.max_age and now - conn._created_at > self.max_age:
+            self._close_raw(conn)
+            with self._cond:
+                self.stats['recycled'] += 1
+            return self._new_connection()
+
+        if now - conn._returned_at > self.validate_after:
+            try:
+                conn._raw.ping(reconnect=False)
+            except mysql.connector.Error:
+                self._close_raw(conn)
+                with self._cond:
+                    self.stats['reconnects'] += 1
+                return self._new_connection()
+
+        return conn
+
+    def _release(self, conn):
+        try:
+            # Encerrar qualquer transação pendente (inclusive de SELECTs) para
+            # que o próximo a usar a conexão não herde um snapshot antigo
+            conn._raw.rollback()
+        except mysql.connector.Error:
+            self._close_raw(conn)
+            self._discard()
+            return
+
+        conn._returned_at = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_raw(conn):
+        try:
+            conn._raw.close()
+        except mysql.connector.Error:
+            pass
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['size'] = self.size
+            stats['open'] = self._open
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open - len(self._idle)
+        return stats
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _connect():
     try:
-        print("Tentando conectar ao banco de dados...")
+        logger.debug("Abrindo nova conexão com o banco de dados")
         connection = mysql.connector.connect(
             host=Config.MYSQL_HOST,
             user=Config.MYSQL_USER,
             password=Config.MYSQL_PASSWORD,
             database=Config.MYSQL_DB
         )
-        print("Conexão bem-sucedida!")
         return connection
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
-            print("Erro: Nome de usuário ou senha incorretos")
+            logger.error("Erro: Nome de usuário ou senha incorretos")
         elif err.errno == errorcode.ER_BAD_DB_ERROR:
-            print("Erro: Banco de dados não existe")
+            logger.error("Erro: Banco de dados não existe")
         else:
-            print(f"Erro: {err}")
-        raise
\ No newline at end of file
+            logger.error("Erro ao conectar ao banco de dados: %s", err)
+        raise
+
+
+def get_pool():
+    """Retorna o pool do processo atual, criando-o na primeira chamada"""
+    global _pool, _pool_pid
+    # Cada worker do gunicorn tem o seu próprio pool; conexões herdadas
+    # de um fork não podem ser compartilhadas entre processos
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool(
+                    _connect,
+                    size=Config.MYSQL_POOL_SIZE,
+                    timeout=Config.MYSQL_POOL_TIMEOUT,
+                    validate_after=Config.MYSQL_POOL_VALIDATE_AFTER,
+                    max_age=Config.MYSQL_POOL_MAX_AGE
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def get_pool_stats():
+    return get_pool().get_stats()
+
+
+class RequestConnection:
+    """
+    Conexão compartilhada por todos os models durante uma requisição.
+
+    commit() e close() chamados pelos models não têm efeito: a transação é
+    confirmada uma única vez ao final da requisição. rollback() desfaz o que
+    foi feito até o momento e marca a requisição para não ser confirmada.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.rollback_only = False
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rollback_only = True
+        self._conn.rollback()
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+# Função para obter uma conexão com o banco de dados
+def get_db_connection():
+    # Dentro de uma requisição, todos os models usam a mesma conexão/transação
+    if has_request_context():
+        if 'db_conn' not in g:
+            g.db_conn = RequestConnection(get_pool().get_connection())
+        return g.db_conn
+    return get_pool().get_connection()
+
+
+def get_dedicated_connection():
+    """
+    Conexão própria do pool, fora da transação da requisição.
+
+    Para cursores sem buffer (streaming), que não podem dividir a conexão com
+    outras consultas. Quem chama deve fechar a conexão para devolvê-la ao pool.
+    """
+    return get_pool().get_connection()
+
+
+def _commit_request_connection(response):
+    conn = g.get('db_conn')
+    if conn is None:
+        return response
+
+    # Respostas de erro nunca confirmam escritas parciais
+    if conn.rollback_only or response.status_code >= 400:
+        conn.rollback()
+        return response
+
+    try:
+        if g.get('antes_do_commit'):
+            cursor = conn._conn.cursor()
+            try:
+                for funcao in g.pop('antes_do_commit'):
+                    funcao(cursor)
+            finally:
+                cursor.close()
+        conn._conn.commit()
+    except mysql.connector.Error as err:
+        logger.error("Erro ao confirmar transação da requisição: %s", err)
+        conn.rollback()
+        response = jsonify({
+            "success": False,
+            "error": "Erro ao salvar alterações"
+        })
+        response.status_code = 500
+    return response
+
+
+def antes_do_commit(funcao):
+    """
+    Executa funcao(cursor) na conexão da requisição logo antes do commit,
+    só se a transação for confirmada. Uma falha desfaz a requisição inteira
+    (resposta 500), como uma falha do próprio commit.
+    """
+    g.setdefault('antes_do_commit', []).append(funcao)
+
+
+def apos_transacao(funcao):
+    """
+    Executa funcao() quando a transação da requisição terminar (confirmada
+    ou desfeita), para limpar caches que uma leitura concorrente poderia ter
+    preenchido com os dados anteriores ao commit. Fora de uma requisição,
+    executa na hora.
+    """
+    if has_request_context():
+        g.setdefault('apos_transacao', []).append(funcao)
+    else:
+        funcao()
+
+
+def _release_request_connection(exc):
+    for funcao in g.pop('apos_transacao', ()):
+        try:
+            funcao()
+        except Exception:
+            logger.exception("Erro ao executar ação pós-transação")
+
+    conn = g.pop('db_conn', None)
+    if conn is None:
+        return
+    # Se a requisição terminou com exceção, after_request não chegou a rodar;
+    # o pool faz rollback de tudo que não foi confirmado ao receber a conexão
+    conn._conn.close()
+
+
+def init_request_connection(app):
+    """Registra a unidade de trabalho (uma conexão e uma transação) por requisição"""
+    app.after_request(_commit_request_connection)
+    app.teardown_request(_release_request_connection)
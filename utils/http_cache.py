@@ -0,0 +1,81 @@
+from flask import request, Response, make_response
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def conditional_get(validador):
+    """
+    Suporte a GET condicional (ETag / Last-Modified) para endpoints de listagem.
+
+    validador() deve retornar (assinatura, atualizado_em), onde assinatura é
+    uma string que muda a cada escrita nos dados e atualizado_em é o instante
+    (epoch, em segundos) da última alteração, ou None.
+
+    Se o cliente já tem a versão atual (If-None-Match / If-Modified-Since),
+    a resposta é 304 sem corpo e a view nem chega a ser executada.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                assinatura, atualizado_em = validador()
+            except Exception as e:
+                logger.warning("Erro ao calcular validador de cache HTTP: %s", e)
+                return f(*args, **kwargs)
+            
+            # O ETag depende também dos parâmetros (página, busca, limite)
+            parametros = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+            etag = hashlib.sha1(
+                f"{request.endpoint}?{parametros}|{assinatura}".encode('utf-8')
+            ).hexdigest()
+            
+            ultima_modificacao = None
+            if atualizado_em is not None:
+                ultima_modificacao = datetime.fromtimestamp(int(atualizado_em), tz=timezone.utc)
+            
+            # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+            if request.if_none_match:
+                nao_modificado = request.if_none_match.contains(etag)
+            elif request.if_modified_since and ultima_modificacao:
+                nao_modificado = ultima_modificacao <= request.if_modified_since
+            else:
+                nao_modificado = False
+            
+            if nao_modificado:
+                resposta = Response(status=304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            
+            resposta.set_etag(etag)
+            if ultima_modificacao:
+                resposta.last_modified = ultima_modificacao
+            # O navegador pode guardar a resposta, mas deve revalidar sempre
+            resposta.headers['Cache-Control'] = 'private, no-cache'
+            return resposta
+        return decorated_function
+    return decorator
+
+
+def etag_versao(versao):
+    """ETag de um registro com coluna versao (GET e resposta do PUT/PATCH)"""
+    return f'"{versao}"'
+
+
+def versao_if_match():
+    """
+    Versão exigida pelo cabeçalho If-Match de um PUT/PATCH, ou None se o
+    cliente não o enviou (ou enviou '*'), caso em que a alteração não é
+    condicional. Lança ValueError se o valor não for um ETag de versão.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    etags = list(request.if_match)
+    if len(etags) != 1 or not etags[0].isdigit():
+        raise ValueError("If-Match deve conter um único ETag de versão, como \"3\"")
+    return int(etags[0])
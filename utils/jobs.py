@@ -0,0 +1,237 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import socket
+import threading
+import time
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config, get_application_path
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+
+class TarefaCancelada(Exception):
+    """O cancelamento da tarefa foi pedido"""
+
+
+# tipo -> (função, limite de tarefas simultâneas)
+_tipos = {}
+
+
+def tarefa(tipo, limite=1):
+    """
+    Registra uma função como tipo de tarefa em segundo plano.
+
+    A função recebe um ContextoTarefa seguido dos parâmetros enviados em
+    enviar(), e o que ela retornar (serializável em JSON) vira o resultado.
+    O limite vale para todos os workers juntos e pode ser alterado em
+    JOBS_LIMITES no config.json.
+    """
+    def registrar(funcao):
+        _tipos[tipo] = (funcao, Config.JOBS_LIMITES.get(tipo, limite))
+        return funcao
+    return registrar
+
+
+class ContextoTarefa:
+    """Passado à função da tarefa para informar o andamento"""
+
+    INTERVALO = 1.0  # segundos mínimos entre gravações do andamento
+
+    def __init__(self, job):
+        self.id = job['id']
+        self.parametros = job['parametros']
+        self._ultimo = 0
+
+    def progresso(self, percentual=None, mensagem=None):
+        """
+        Registra o andamento (no máximo uma gravação por segundo) e lança
+        TarefaCancelada se o cancelamento foi pedido. Tarefas longas devem
+        chamar isto com frequência; é o único ponto de cancelamento.
+        """
+        agora = time.monotonic()
+        if agora - self._ultimo < self.INTERVALO:
+            return
+        self._ultimo = agora
+        if Job.update_progress(self.id, percentual, mensagem):
+            raise TarefaCancelada("Tarefa cancelada")
+
+
+_executor = None
+_executor_pid = None
+_ativas = 0
+_em_execucao = set()  # ids das tarefas rodando neste worker
+_lock = threading.Lock()
+
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _sinal_de_vida():
+    """Thread de cada worker: renova heartbeat_em das tarefas que ele executa"""
+    while True:
+        time.sleep(Config.JOBS_HEARTBEAT_SEGUNDOS)
+        with _lock:
+            ids = list(_em_execucao)
+        try:
+            Job.heartbeat(ids)
+        except Exception:
+            logger.exception("Erro ao registrar o sinal de vida das tarefas")
+
+
+def _get_executor():
+    global _executor, _executor_pid, _ativas
+    # Como o pool de conexões, cada worker do gunicorn tem as suas threads
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=Config.JOBS_WORKERS, thread_name_prefix='job')
+        _executor_pid = os.getpid()
+        _ativas = 0
+        _em_execucao.clear()
+        # Independente do andamento: tarefas que passam muito tempo num único
+        # comando (como o recálculo do resumo) também continuam vivas
+        threading.Thread(target=_sinal_de_vida, name='job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def jobs_dir():
+    diretorio = Config.JOBS_DIR or os.path.join(get_application_path(), 'resultados')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def _executar(job):
+    global _ativas
+    funcao, _ = _tipos[job['tipo']]
+    contexto = ContextoTarefa(job)
+    with _lock:
+        _em_execucao.add(job['id'])
+    try:
+        resultado = funcao(contexto, **job['parametros'])
+        Job.finish(job['id'], 'concluido', resultado=resultado)
+        logger.info("Tarefa %s (%s) concluída", job['id'], job['tipo'])
+    except TarefaCancelada:
+        Job.finish(job['id'], 'cancelado')
+        logger.info("Tarefa %s (%s) cancelada", job['id'], job['tipo'])
+    except Exception as e:
+        logger.exception("Erro na tarefa %s (%s)", job['id'], job['tipo'])
+        Job.finish(job['id'], 'erro', erro=str(e))
+    finally:
+        with _lock:
+            _ativas -= 1
+            _em_execucao.discard(job['id'])
+        # Vaga liberada: pegar a próxima tarefa pendente
+        despachar()
+
+
+def _recuperar_orfas():
+    """
+    Marca como erro as tarefas cujo worker parou de renovar o sinal de vida,
+    em qualquer host; sem isso elas ocupariam a vaga do tipo para sempre
+    """
+    for job in Job.expire_stale(Config.JOBS_HEARTBEAT_LIMITE):
+        logger.warning("Tarefa %s (%s) marcada como erro: worker %s sem sinal de vida",
+                       job['id'], job['tipo'], job['worker'])
+
+
+def _remover_vencidas():
+    for resultado in Job.delete_expired():
+        arquivo = resultado.get('arquivo') if isinstance(resultado, dict) else None
+        # Só apaga arquivos do diretório de resultados
+        if arquivo and os.path.dirname(os.path.abspath(arquivo)) == os.path.abspath(jobs_dir()):
+            try:
+                os.remove(arquivo)
+            except FileNotFoundError:
+                pass
+
+
+def despachar():
+    """
+    Inicia, neste worker, as tarefas pendentes para as quais houver vaga
+    (threads livres aqui e limite do tipo não atingido). Chamado ao enviar
+    e ao terminar cada tarefa, e na primeira requisição de cada worker.
+    """
+    global _ativas
+    try:
+        _recuperar_orfas()
+        _remover_vencidas()
+        for tipo, (_, limite) in _tipos.items():
+            while True:
+                with _lock:
+                    executor = _get_executor()
+                    if _ativas >= Config.JOBS_WORKERS:
+                        return
+                    _ativas += 1
+                job = None
+                try:
+                    job = Job.claim(tipo, limite, _worker_id())
+                finally:
+                    if job is None:
+                        with _lock:
+                            _ativas -= 1
+                if job is None:
+                    break
+                executor.submit(_executar, job)
+    except Exception:
+        logger.exception("Erro ao despachar tarefas")
+
+
+def enviar(tipo, parametros=None, usuario_id=None):
+    """Registra uma tarefa e a inicia se houver vaga; retorna o registro"""
+    if tipo not in _tipos:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    id = Job.create(tipo, parametros or {}, usuario_id)
+    despachar()
+    return Job.get_by_id(id)
+
+
+def executar_agora(tipo, parametros=None):
+    """
+    Executa uma tarefa neste processo (linha de comando) e retorna o
+    resultado. Ela é registrada em jobs como as demais, com sinal de vida e
+    respeitando o limite de tarefas simultâneas do tipo.
+    """
+    import utils.tarefas  # noqa: F401 (registra os tipos com @tarefa)
+    if tipo not in _tipos:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    funcao, limite = _tipos[tipo]
+    id = Job.create(tipo, parametros or {})
+    job = Job.claim(tipo, limite, _worker_id(), id=id)
+    if job is None:
+        Job.cancel(id)
+        raise RuntimeError(f"Já existem tarefas {tipo} em execução (limite {limite})")
+
+    with _lock:
+        _get_executor()  # inicia a thread do sinal de vida deste processo
+        _em_execucao.add(id)
+    try:
+        resultado = funcao(ContextoTarefa(job), **job['parametros'])
+        Job.finish(id, 'concluido', resultado=resultado)
+        return resultado
+    except TarefaCancelada:
+        Job.finish(id, 'cancelado')
+        raise
+    except Exception as e:
+        Job.finish(id, 'erro', erro=str(e))
+        raise
+    finally:
+        with _lock:
+            _em_execucao.discard(id)
+
+
+def _despachar_pendentes():
+    # Na primeira requisição de cada worker: retoma tarefas que ficaram
+    # pendentes enquanto nenhum worker tinha vaga ou estava no ar
+    if _executor_pid != os.getpid():
+        with _lock:
+            _get_executor()
+        threading.Thread(target=despachar, daemon=True).start()
+
+
+def init_jobs(app):
+    """Registra os tipos de tarefa e o despacho das pendentes em cada worker"""
+    import utils.tarefas  # noqa: F401 (registra os tipos com @tarefa)
+    app.before_request(_despachar_pendentes)
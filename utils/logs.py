@@ -0,0 +1,231 @@
+from flask import has_request_context, request
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from collections import deque
+from datetime import datetime, timezone
+import atexit
+import itertools
+import json
+import logging
+import queue
+import threading
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro de log"""
+
+    def format(self, record):
+        dados = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for campo in ('method', 'path', 'remote_addr'):
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                dados[campo] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["exception"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Anexa método, caminho e IP da requisição (roda na thread da requisição)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            record.remote_addr = request.remote_addr
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Deixa passar apenas 1 a cada 'taxa' registros DEBUG de uma mesma mensagem
+    (mesmo logger e mesmo texto antes da formatação); os demais níveis passam
+    sempre.
+    """
+
+    def __init__(self, taxa):
+        super().__init__()
+        self.taxa = max(1, int(taxa))
+        self._contadores = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.taxa == 1:
+            return True
+        chave = (record.name, record.msg)
+        contador = self._contadores.get(chave)
+        if contador is None:
+            # itertools.count é atômico sob o GIL, sem precisar de lock
+            contador = self._contadores.setdefault(chave, itertools.count())
+        return next(contador) % self.taxa == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Coloca o registro na fila sem formatá-lo: a thread da requisição só
+    resolve a mensagem e a exceção; o JSON e a escrita ficam com o listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Guarda os últimos 'capacidade' registros em memória.
+
+    emit() roda apenas na thread do QueueListener; o lock só é disputado
+    quando o painel de administração lê os registros. Cada registro recebe
+    um número de sequência crescente, usado como cursor para acompanhar
+    novos registros.
+    """
+
+    def __init__(self, capacidade=5000):
+        super().__init__()
+        self._registros = deque(maxlen=capacidade)
+        self._sequencia = itertools.count(1)
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            entrada = {
+                "seq": next(self._sequencia),
+                "created": record.created,
+                "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "method": getattr(record, 'method', None),
+                "path": getattr(record, 'path', None),
+                "exception": record.exc_text
+            }
+            with self._buffer_lock:
+                self._registros.append(entrada)
+        except Exception:
+            self.handleError(record)
+
+    def ultima_sequencia(self):
+        with self._buffer_lock:
+            return self._registros[-1]["seq"] if self._registros else 0
+
+    def consultar(self, nivel=logging.NOTSET, inicio=None, fim=None, texto=None, after=0, limite=200):
+        """
+        Registros com sequência maior que 'after', nível mínimo, intervalo de
+        tempo (epoch) e texto (no logger ou na mensagem), em ordem crescente
+        """
+        with self._buffer_lock:
+            registros = list(self._registros)
+
+        texto = texto.lower() if texto else None
+        resultado = []
+        for entrada in registros:
+            if entrada["seq"] <= after or entrada["levelno"] < nivel:
+                continue
+            if inicio is not None and entrada["created"] < inicio:
+                continue
+            if fim is not None and entrada["created"] > fim:
+                continue
+            if texto and texto not in entrada["message"].lower() and texto not in entrada["logger"].lower():
+                continue
+            resultado.append(entrada)
+            if len(resultado) >= limite:
+                break
+        return resultado
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+_handler = None
+_destinos = []
+_ring_buffer = None
+
+
+def get_ring_buffer():
+    """Buffer de registros deste worker (None se o logging não foi iniciado)"""
+    return _ring_buffer
+
+
+def _iniciar_listener():
+    # Como a gravação das métricas, o listener é iniciado uma vez por
+    # processo: com gunicorn --preload, o worker herda a fila do mestre mas
+    # não a thread, e os registros ficariam parados na fila
+    global _listener, _listener_pid
+    if _listener_pid != os.getpid():
+        with _listener_lock:
+            if _listener_pid != os.getpid():
+                fila = queue.SimpleQueue()
+                _handler.queue = fila
+                # O lock do buffer pode ter sido copiado travado no fork
+                _ring_buffer._buffer_lock = threading.Lock()
+                _listener = QueueListener(fila, *_destinos, respect_handler_level=True)
+                _listener.start()
+                atexit.register(_listener.stop)
+                _listener_pid = os.getpid()
+
+
+def init_logging(app=None, handlers=None):
+    """
+    Configura o logging da aplicação: os registros vão para uma fila em
+    memória e uma thread (QueueListener) formata e escreve em stdout. A
+    thread é iniciada agora e de novo na primeira requisição de cada worker
+    criado por fork.
+
+    handlers: handlers adicionais que também recebem os registros da fila.
+    """
+    global _handler, _destinos, _ring_buffer
+    if _handler is not None:
+        return _listener
+
+    saida = logging.StreamHandler(sys.stdout)
+    if Config.LOG_FORMAT == 'json':
+        saida.setFormatter(JsonFormatter())
+    else:
+        saida.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    _ring_buffer = RingBufferHandler(Config.LOG_BUFFER_SIZE)
+    _destinos = [saida, _ring_buffer]
+
+    if Config.LOG_FILE:
+        # Todos os workers escrevem no mesmo arquivo (modo append); a rotação
+        # fica a cargo do logrotate, e o handler reabre o arquivo quando ele
+        # é movido. Rotação feita por cada worker perderia registros.
+        arquivo = WatchedFileHandler(Config.LOG_FILE, encoding='utf-8')
+        arquivo.setFormatter(JsonFormatter())
+        _destinos.append(arquivo)
+    _destinos.extend(handlers or [])
+
+    _handler = DeferredQueueHandler(queue.SimpleQueue())
+    _handler.addFilter(DebugSamplingFilter(Config.LOG_DEBUG_SAMPLE))
+    _handler.addFilter(RequestContextFilter())
+
+    raiz = logging.getLogger()
+    raiz.handlers = [_handler]
+    raiz.setLevel(Config.LOG_LEVEL)
+    for modulo, nivel in (Config.LOG_LEVELS or {}).items():
+        logging.getLogger(modulo).setLevel(nivel)
+
+    _iniciar_listener()
+
+    if app is not None:
+        app.before_request(_iniciar_listener)
+        # Os logs do Flask passam a usar a mesma fila
+        app.logger.handlers = []
+        app.logger.propagate = True
+    return _listener
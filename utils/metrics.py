@@ -0,0 +1,284 @@
+from flask import request, g
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import sys
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores dos buckets do histograma de latência, em segundos
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+def _novo_endpoint():
+    return {
+        "buckets": [0] * (len(BUCKETS) + 1),  # o último é o +Inf
+        "soma": 0.0,
+        "contagem": 0,
+        "status": {},
+        "em_andamento": 0
+    }
+
+
+class Metricas:
+    """Histogramas de latência, contagem por status e requisições em andamento, por endpoint"""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def iniciar(self, endpoint):
+        with self._lock:
+            dados = self._endpoints.setdefault(endpoint, _novo_endpoint())
+            dados["em_andamento"] += 1
+
+    def finalizar(self, endpoint, duracao, status):
+        indice = len(BUCKETS)
+        for i, limite in enumerate(BUCKETS):
+            if duracao <= limite:
+                indice = i
+                break
+        with self._lock:
+            dados = self._endpoints.setdefault(endpoint, _novo_endpoint())
+            dados["em_andamento"] -= 1
+            dados["buckets"][indice] += 1
+            dados["soma"] += duracao
+            dados["contagem"] += 1
+            chave = str(status)
+            dados["status"][chave] = dados["status"].get(chave, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    "buckets": list(dados["buckets"]),
+                    "soma": dados["soma"],
+                    "contagem": dados["contagem"],
+                    "status": dict(dados["status"]),
+                    "em_andamento": dados["em_andamento"]
+                }
+                for endpoint, dados in self._endpoints.items()
+            }
+
+
+_metricas = Metricas()
+
+
+def get_metricas():
+    return _metricas
+
+
+def _namespace():
+    """Subdiretório desta implantação, para não somar workers de outras no mesmo host"""
+    if Config.METRICS_NAMESPACE:
+        return Config.METRICS_NAMESPACE
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    origem = f"{raiz}|{Config.MYSQL_HOST}|{Config.MYSQL_DB}"
+    return hashlib.sha1(origem.encode('utf-8')).hexdigest()[:12]
+
+
+def _metrics_dir():
+    base = Config.METRICS_DIR or os.path.join(tempfile.gettempdir(), 'pecuaria-metricas')
+    diretorio = os.path.join(base, _namespace())
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def _inicio_processo(pid):
+    """
+    Instante de início do processo (/proc/<pid>/stat), que distingue um PID
+    reutilizado. None se o processo não existe; 0 fora do Linux, onde só a
+    existência do PID é verificada.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # O nome do processo (campo 2) pode ter espaços; starttime é o
+            # 22º campo, o 20º depois do ')'
+            return int(f.read().rsplit(')', 1)[1].split()[19])
+    except FileNotFoundError:
+        if os.path.isdir('/proc'):
+            return None
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    return 0
+
+
+_arquivo_worker = {}
+
+
+def _arquivo_snapshot():
+    """<pid>-<início>.json: um worker novo com PID reutilizado não sobrescreve o antigo"""
+    pid = os.getpid()
+    if pid not in _arquivo_worker:
+        _arquivo_worker[pid] = f"{pid}-{_inicio_processo(pid) or 0}.json"
+    return os.path.join(_metrics_dir(), _arquivo_worker[pid])
+
+
+def gravar_snapshot():
+    """Grava o snapshot deste worker para ser somado aos dos outros workers"""
+    caminho = _arquivo_snapshot()
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w') as f:
+        json.dump(_metricas.snapshot(), f)
+    os.replace(temporario, caminho)
+
+
+def agregar_workers():
+    """
+    Soma os snapshots dos workers vivos desta implantação. Os arquivos de
+    workers que já terminaram são removidos; os contadores deles saem da
+    soma (o Prometheus trata a queda como reinício do contador).
+    """
+    gravar_snapshot()
+    total = {}
+    for caminho in glob.glob(os.path.join(_metrics_dir(), '*.json')):
+        try:
+            pid, inicio = (int(parte) for parte in os.path.basename(caminho)[:-5].split('-'))
+        except ValueError:
+            continue
+        atual = _inicio_processo(pid)
+        if atual is None or (inicio and atual and atual != inicio):
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(caminho) as f:
+                snapshot = json.load(f)
+        except (ValueError, OSError):
+            continue
+        for endpoint, dados in snapshot.items():
+            soma = total.setdefault(endpoint, _novo_endpoint())
+            soma["buckets"] = [a + b for a, b in zip(soma["buckets"], dados["buckets"])]
+            soma["soma"] += dados["soma"]
+            soma["contagem"] += dados["contagem"]
+            for status, quantidade in dados["status"].items():
+                soma["status"][status] = soma["status"].get(status, 0) + quantidade
+            soma["em_andamento"] += dados["em_andamento"]
+    return total
+
+
+def resumo_json(snapshot):
+    """Snapshot com buckets cumulativos e latências médias, para o painel"""
+    resultado = {}
+    for endpoint, dados in sorted(snapshot.items()):
+        acumulado = 0
+        buckets = {}
+        for limite, quantidade in zip(BUCKETS + ['+Inf'], dados["buckets"]):
+            acumulado += quantidade
+            buckets[str(limite)] = acumulado
+        resultado[endpoint] = {
+            "requisicoes": dados["contagem"],
+            "latencia_media_ms": round(dados["soma"] / dados["contagem"] * 1000, 2) if dados["contagem"] else None,
+            "latencia_buckets_segundos": buckets,
+            "status": dados["status"],
+            "em_andamento": dados["em_andamento"]
+        }
+    return resultado
+
+
+def formato_prometheus(snapshot):
+    """Snapshot no formato texto de exposição do Prometheus"""
+    linhas = [
+        "# HELP http_request_duration_seconds Latência das requisições por endpoint",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for endpoint, dados in sorted(snapshot.items()):
+        rotulo = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+        acumulado = 0
+        for limite, quantidade in zip(BUCKETS + ['+Inf'], dados["buckets"]):
+            acumulado += quantidade
+            linhas.append(f'http_request_duration_seconds_bucket{{endpoint="{rotulo}",le="{limite}"}} {acumulado}')
+        linhas.append(f'http_request_duration_seconds_sum{{endpoint="{rotulo}"}} {dados["soma"]}')
+        linhas.append(f'http_request_duration_seconds_count{{endpoint="{rotulo}"}} {dados["contagem"]}')
+
+    linhas.append("# HELP http_requests_total Requisições por endpoint e status")
+    linhas.append("# TYPE http_requests_total counter")
+    for endpoint, dados in sorted(snapshot.items()):
+        rotulo = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+        for status, quantidade in sorted(dados["status"].items()):
+            linhas.append(f'http_requests_total{{endpoint="{rotulo}",status="{status}"}} {quantidade}')
+
+    linhas.append("# HELP http_requests_in_flight Requisições em andamento por endpoint")
+    linhas.append("# TYPE http_requests_in_flight gauge")
+    for endpoint, dados in sorted(snapshot.items()):
+        rotulo = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+        linhas.append(f'http_requests_in_flight{{endpoint="{rotulo}"}} {dados["em_andamento"]}')
+    return "\n".join(linhas) + "\n"
+
+
+def _antes_da_requisicao():
+    g.metricas_endpoint = request.endpoint or '<sem_rota>'
+    g.metricas_inicio = time.perf_counter()
+    _metricas.iniciar(g.metricas_endpoint)
+
+
+def _depois_da_requisicao(response):
+    if 'metricas_inicio' in g:
+        _metricas.finalizar(
+            g.metricas_endpoint,
+            time.perf_counter() - g.pop('metricas_inicio'),
+            response.status_code
+        )
+    return response
+
+
+def _fim_da_requisicao(exc):
+    # Exceção não tratada: after_request não rodou
+    if 'metricas_inicio' in g:
+        _metricas.finalizar(
+            g.metricas_endpoint,
+            time.perf_counter() - g.pop('metricas_inicio'),
+            500
+        )
+
+
+def _gravacao_periodica():
+    while True:
+        time.sleep(Config.METRICS_FLUSH_INTERVAL)
+        try:
+            gravar_snapshot()
+        except OSError as e:
+            logger.warning("Erro ao gravar métricas do worker: %s", e)
+
+
+_gravador_pid = None
+_gravador_lock = threading.Lock()
+
+
+def _iniciar_gravador():
+    # A thread é iniciada na primeira requisição de cada worker, porque
+    # threads não sobrevivem ao fork do gunicorn com --preload
+    global _gravador_pid
+    if _gravador_pid != os.getpid():
+        with _gravador_lock:
+            if _gravador_pid != os.getpid():
+                threading.Thread(target=_gravacao_periodica, name='metricas', daemon=True).start()
+                _gravador_pid = os.getpid()
+
+
+def init_metrics(app):
+    """
+    Registra a instrumentação por endpoint. Deve ser chamado antes dos outros
+    hooks de after_request (que rodam em ordem inversa), para que a latência
+    inclua o commit da transação da requisição.
+    """
+    app.before_request(_iniciar_gravador)
+    app.before_request(_antes_da_requisicao)
+    app.after_request(_depois_da_requisicao)
+    app.teardown_request(_fim_da_requisicao)
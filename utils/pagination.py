@@ -0,0 +1,38 @@
+import base64
+import json
+
+
+def encode_cursor(values):
+    """
+    Gera um cursor opaco a partir dos valores da chave de ordenação
+    da última linha de uma página
+    """
+    raw = json.dumps(list(values), default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Converte um cursor gerado por encode_cursor de volta para a lista de valores.
+    Lança ValueError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise ValueError("Cursor de paginação inválido")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor de paginação inválido")
+    # Os valores vão direto como parâmetros da consulta
+    if any(not isinstance(value, (str, int, float)) and value is not None for value in values):
+        raise ValueError("Cursor de paginação inválido")
+    return values
+
+
+def next_cursor(rows, limit, *keys):
+    """Retorna o cursor da próxima página, ou None se esta for a última"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([last[key] for key in keys])
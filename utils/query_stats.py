@@ -0,0 +1,227 @@
+from flask import g, has_request_context, request
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import logging
+import re
+import sys
+import os
+import threading
+import time
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de impressões digitais distintas acompanhadas por worker
+MAX_FINGERPRINTS = 1000
+
+_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def fingerprint(sql):
+    """
+    Normaliza um comando SQL para agrupar execuções do mesmo formato:
+    literais e parâmetros viram ?, listas IN (...) viram IN (?+) e os
+    espaços são colapsados
+    """
+    texto = re.sub(r"'(?:[^'\\]|\\.)*'", "?", sql)
+    texto = re.sub(r"\b\d+(?:\.\d+)?\b", "?", texto)
+    texto = texto.replace("%s", "?")
+    texto = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?+)", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+def _chamador():
+    """Primeira função fora de utils/ na pilha (normalmente o método do model)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        codigo = frame.f_code
+        if not os.path.abspath(codigo.co_filename).startswith(_UTILS_DIR):
+            modulo = frame.f_globals.get('__name__', '?')
+            return f"{modulo}.{getattr(codigo, 'co_qualname', codigo.co_name)}"
+        frame = frame.f_back
+    return None
+
+
+class QueryStats:
+    """Estatísticas por impressão digital e log de consultas lentas deste worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_fingerprint = {}
+        self._lentas = deque(maxlen=Config.SQL_SLOW_LOG_SIZE)
+        self._n_mais_um = deque(maxlen=100)
+
+    def registrar(self, entrada):
+        with self._lock:
+            dados = self._por_fingerprint.get(entrada["fingerprint"])
+            if dados is None:
+                if len(self._por_fingerprint) >= MAX_FINGERPRINTS:
+                    return
+                dados = self._por_fingerprint[entrada["fingerprint"]] = {
+                    "execucoes": 0, "tempo_total_ms": 0.0, "tempo_max_ms": 0.0,
+                    "chamador": entrada["chamador"]
+                }
+            dados["execucoes"] += 1
+            dados["tempo_total_ms"] += entrada["duracao_ms"]
+            dados["tempo_max_ms"] = max(dados["tempo_max_ms"], entrada["duracao_ms"])
+            if entrada["duracao_ms"] >= Config.SQL_SLOW_MS:
+                self._lentas.append(entrada)
+
+    def registrar_n_mais_um(self, evento):
+        with self._lock:
+            self._n_mais_um.append(evento)
+
+    def consultar(self, min_ms=0, limite=100):
+        with self._lock:
+            lentas = [dict(e) for e in self._lentas if e["duracao_ms"] >= min_ms]
+            top = sorted(
+                ({"fingerprint": fp, **dados} for fp, dados in self._por_fingerprint.items()),
+                key=lambda item: item["tempo_total_ms"],
+                reverse=True
+            )[:limite]
+            n_mais_um = list(self._n_mais_um)
+        lentas.reverse()
+        return {
+            "lentas": lentas[:limite],
+            "mais_custosas": top,
+            "n_mais_um": n_mais_um
+        }
+
+
+_stats = QueryStats()
+_captura = threading.local()
+
+
+def get_query_stats():
+    return _stats
+
+
+@contextmanager
+def capturar_consultas():
+    """
+    Guarda (sql, parâmetros, chamador) de cada execute() feito nesta thread
+    enquanto o bloco estiver ativo. Usado pelo teste de planos de execução.
+    """
+    consultas = []
+    anterior = getattr(_captura, 'consultas', None)
+    _captura.consultas = consultas
+    try:
+        yield consultas
+    finally:
+        _captura.consultas = anterior
+
+
+class InstrumentedCursor:
+    """
+    Envolve um cursor do MySQL medindo cada execute/executemany: duração,
+    impressão digital, linhas e método que fez a consulta.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._entrada = None
+
+    def _medir(self, metodo, operation, params):
+        inicio = time.perf_counter()
+        try:
+            return metodo(operation, params) if params is not None else metodo(operation)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            self._registrar(operation, duracao_ms)
+
+    def _registrar(self, operation, duracao_ms):
+        try:
+            sql = operation.decode('utf-8') if isinstance(operation, bytes) else str(operation)
+            rowcount = self._cursor.rowcount
+            entrada = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "duracao_ms": round(duracao_ms, 3),
+                "fingerprint": fingerprint(sql),
+                "sql": sql.strip()[:2000],
+                "linhas": rowcount if rowcount is not None and rowcount >= 0 else 0,
+                "chamador": _chamador(),
+                "path": request.path if has_request_context() else None
+            }
+            self._entrada = entrada
+            _stats.registrar(entrada)
+            if duracao_ms >= Config.SQL_SLOW_MS:
+                logger.warning("Consulta lenta (%.1f ms) em %s: %s",
+                               duracao_ms, entrada["chamador"], entrada["fingerprint"])
+            if has_request_context():
+                g.sql_consultas = g.get('sql_consultas', 0) + 1
+                repeticoes = g.setdefault('sql_repeticoes', {})
+                repeticoes[entrada["fingerprint"]] = repeticoes.get(entrada["fingerprint"], 0) + 1
+        except Exception:
+            # A instrumentação nunca deve quebrar a consulta
+            logger.debug("Erro ao registrar consulta SQL", exc_info=True)
+
+    def _contar_linhas(self, linhas):
+        # Em cursores sem buffer, o rowcount só é conhecido durante a leitura
+        if self._entrada is not None and linhas:
+            self._entrada["linhas"] = max(self._entrada["linhas"], self._cursor.rowcount or 0)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        consultas = getattr(_captura, 'consultas', None)
+        if consultas is not None:
+            consultas.append((operation, params, _chamador()))
+        if args or kwargs:
+            inicio = time.perf_counter()
+            try:
+                return self._cursor.execute(operation, params, *args, **kwargs)
+            finally:
+                self._registrar(operation, (time.perf_counter() - inicio) * 1000)
+        return self._medir(self._cursor.execute, operation, params)
+
+    def executemany(self, operation, seq_params):
+        return self._medir(self._cursor.executemany, operation, seq_params)
+
+    def fetchone(self):
+        linha = self._cursor.fetchone()
+        self._contar_linhas([linha] if linha is not None else None)
+        return linha
+
+    def fetchmany(self, *args, **kwargs):
+        linhas = self._cursor.fetchmany(*args, **kwargs)
+        self._contar_linhas(linhas)
+        return linhas
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        self._contar_linhas(linhas)
+        return linhas
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _verificar_requisicao(response):
+    """Registra no log e nas estatísticas possíveis padrões N+1 da requisição"""
+    repeticoes = g.pop('sql_repeticoes', None)
+    total = g.pop('sql_consultas', 0)
+    if total:
+        response.headers['X-SQL-Queries'] = str(total)
+    if not repeticoes:
+        return response
+    for fp, vezes in repeticoes.items():
+        if vezes >= Config.SQL_N_PLUS_ONE:
+            evento = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "endpoint": request.endpoint,
+                "path": request.path,
+                "fingerprint": fp,
+                "repeticoes": vezes,
+                "consultas_na_requisicao": total
+            }
+            _stats.registrar_n_mais_um(evento)
+            logger.warning("Possível N+1 em %s: %d execuções de %s", request.endpoint, vezes, fp)
+    return response
+
+
+def init_query_stats(app):
+    app.after_request(_verificar_requisicao)
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryRateLimiter:
+    """
+    Token bucket em memória do processo (um por worker).
+
+    Cada chave tem até 'rajada' fichas, repostas à taxa de 'por_minuto'.
+    As chaves menos usadas são descartadas quando há mais que max_chaves.
+    """
+
+    def __init__(self, max_chaves=100000):
+        self.max_chaves = max_chaves
+        self._baldes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, rajada, por_minuto):
+        """Retorna (permitido, segundos até a próxima ficha)"""
+        taxa = por_minuto / 60.0
+        agora = time.monotonic()
+        with self._lock:
+            fichas, ultimo = self._baldes.get(chave, (rajada, agora))
+            fichas = min(rajada, fichas + (agora - ultimo) * taxa)
+            if fichas >= 1:
+                fichas -= 1
+                espera = 0
+            else:
+                espera = (1 - fichas) / taxa
+            self._baldes[chave] = (fichas, agora)
+            self._baldes.move_to_end(chave)
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        return espera == 0, espera
+
+
+class RedisRateLimiter:
+    """Token bucket compartilhado entre workers, com a lógica atômica em Lua"""
+
+    PREFIXO = 'pecuaria:limite:'
+
+    SCRIPT = """
+        local rajada = tonumber(ARGV[1])
+        local taxa = tonumber(ARGV[2])
+        local agora = tonumber(ARGV[3])
+        local dados = redis.call('HMGET', KEYS[1], 'fichas', 'ultimo')
+        local fichas = tonumber(dados[1]) or rajada
+        local ultimo = tonumber(dados[2]) or agora
+        fichas = math.min(rajada, fichas + math.max(0, agora - ultimo) * taxa)
+        local espera = 0
+        if fichas >= 1 then
+            fichas = fichas - 1
+        else
+            espera = (1 - fichas) / taxa
+        end
+        redis.call('HSET', KEYS[1], 'fichas', fichas, 'ultimo', agora)
+        redis.call('EXPIRE', KEYS[1], math.ceil(rajada / taxa) + 1)
+        return tostring(espera)
+    """
+
+    def __init__(self, url):
+        # Dependência opcional: só é necessária quando este backend é usado
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    def consumir(self, chave, rajada, por_minuto):
+        espera = float(self._script(
+            keys=[self.PREFIXO + chave],
+            args=[rajada, por_minuto / 60.0, time.time()]
+        ))
+        return espera == 0, espera
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if Config.LOGIN_LIMITE_BACKEND == 'redis':
+                    _limiter = RedisRateLimiter(Config.CACHE_REDIS_URL)
+                else:
+                    _limiter = MemoryRateLimiter()
+    return _limiter
+
+
+def limitar_login(email, ip):
+    """
+    Consome uma tentativa de login do IP e do email.
+    Retorna None se a tentativa for permitida, ou os segundos que o cliente
+    deve esperar.
+    """
+    limiter = get_limiter()
+    try:
+        permitido, espera = limiter.consumir(
+            'ip:' + (ip or ''),
+            Config.LOGIN_LIMITE_IP_RAJADA,
+            Config.LOGIN_LIMITE_IP_POR_MINUTO
+        )
+        if not permitido:
+            return espera
+
+        permitido, espera = limiter.consumir(
+            'email:' + email.strip().lower(),
+            Config.LOGIN_LIMITE_EMAIL_RAJADA,
+            Config.LOGIN_LIMITE_EMAIL_POR_MINUTO
+        )
+        if not permitido:
+            return espera
+    except Exception as e:
+        # Falha no backend compartilhado não impede o login
+        logger.warning("Erro ao verificar limite de login: %s", e)
+    return None
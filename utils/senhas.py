@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from extensions import bcrypt
+
+
+class HashOcupadoError(Exception):
+    """Todas as threads de hash estão ocupadas e a fila está cheia"""
+
+
+# O bcrypt libera o GIL, então as threads usam núcleos de verdade. O número
+# de threads limita a CPU gasta com senhas; o semáforo limita quantas
+# requisições podem esperar na fila antes de receberem 503.
+_executor = None
+_vagas = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _vagas
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _vagas = threading.BoundedSemaphore(Config.BCRYPT_WORKERS + Config.BCRYPT_MAX_QUEUE)
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.BCRYPT_WORKERS,
+                    thread_name_prefix='bcrypt'
+                )
+    return _executor
+
+
+def _executar(funcao, *args):
+    executor = _get_executor()
+    if not _vagas.acquire(blocking=False):
+        raise HashOcupadoError("Servidor ocupado verificando senhas, tente novamente")
+    try:
+        futuro = executor.submit(funcao, *args)
+    except Exception:
+        _vagas.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas.release())
+    return futuro.result()
+
+
+def verificar_senha(senha_hash, senha):
+    """
+    bcrypt.check_password_hash executado no pool de threads de hash.
+    Lança HashOcupadoError se o pool estiver saturado e ValueError se
+    senha_hash não for um hash bcrypt.
+    """
+    return _executar(bcrypt.check_password_hash, senha_hash, senha)
+
+
+def gerar_hash(senha):
+    """bcrypt.generate_password_hash executado no pool de threads de hash"""
+    return _executar(bcrypt.generate_password_hash, senha).decode('utf-8')
+
+
+def custo_hash(senha_hash):
+    """Custo (log rounds) de um hash bcrypt, ex.: $2b$12$... -> 12"""
+    try:
+        return int(senha_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def precisa_rehash(senha_hash):
+    """True se o hash foi gerado com um custo diferente do configurado"""
+    return custo_hash(senha_hash) != Config.BCRYPT_LOG_ROUNDS
@@ -0,0 +1,91 @@
+"""
+Tipos de tarefa em segundo plano. Importado por init_jobs(); cada função
+registrada com @tarefa pode ser enviada com utils.jobs.enviar(tipo, parametros).
+"""
+import csv
+import gzip
+import json
+from datetime import date
+import sys
+import os
+# Adicionar o diretório pai ao path para permitir importações relativas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.jobs import tarefa, jobs_dir
+from utils.backup import novo_backup, gerar_backup
+from models.animal import Animal, EXPORT_CAMPOS
+from models.resumo import ResumoAnimais
+
+
+@tarefa('backup', limite=1)
+def backup(job, incremental=False, desde=None):
+    status = novo_backup(job.id, incremental, desde)
+
+    def ao_progredir(status):
+        tabela = status['tabela_atual']
+        job.progresso(mensagem=f"{tabela}: {status['tabelas'].get(tabela, 0)} linhas")
+
+    status = gerar_backup(status, ao_progredir=ao_progredir)
+    return {
+        "backup_id": status['id'],
+        "tabelas": status['tabelas'],
+        "linhas": status['linhas'],
+        "bytes": status['bytes']
+    }
+
+
+@tarefa('resumo_rebuild', limite=1)
+def resumo_rebuild(job):
+    # Um único INSERT ... SELECT: sem pontos de cancelamento no meio
+    job.progresso(mensagem="Recalculando o resumo dos animais")
+    return ResumoAnimais.rebuild()
+
+
+@tarefa('export_animais', limite=2)
+def export_animais(job, formato='csv', busca=''):
+    """Exportação de animais para um arquivo gzip baixado em /api/jobs/<id>/download"""
+    if formato not in ('csv', 'ndjson'):
+        raise ValueError("Formato inválido. Use csv ou ndjson")
+
+    arquivo = os.path.join(jobs_dir(), f"job-{job.id}-animais.{formato}.gz")
+    linhas = Animal.iter_export(busca)
+    total = 0
+    try:
+        with gzip.open(arquivo, 'wt', encoding='utf-8', newline='') as saida:
+            if formato == 'csv':
+                writer = csv.DictWriter(saida, fieldnames=EXPORT_CAMPOS)
+                writer.writeheader()
+                escrever = writer.writerow
+            else:
+                escrever = lambda linha: saida.write(
+                    json.dumps(linha, default=str, ensure_ascii=False) + "\n"
+                )
+            for linha in linhas:
+                escrever(linha)
+                total += 1
+                if total % 1000 == 0:
+                    job.progresso(mensagem=f"{total} animais exportados")
+    except BaseException:
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+        raise
+    finally:
+        # Encerra o cursor sem buffer (e descarta a conexão) se parou no meio
+        linhas.close()
+
+    return {
+        "arquivo": arquivo,
+        "nome": f"animais.{formato}.gz",
+        "formato": formato,
+        "linhas": total
+    }
+
+
+@tarefa('relatorio_resumo', limite=2)
+def relatorio_resumo(job, fazenda_id=None, data_inicio=None, data_fim=None):
+    """Mesmo relatório de /api/relatorios/resumo; com período, agrupa a tabela animais"""
+    job.progresso(mensagem="Gerando relatório")
+    return ResumoAnimais.resumo_geral(
+        fazenda_id,
+        date.fromisoformat(data_inicio) if data_inicio else None,
+        date.fromisoformat(data_fim) if data_fim else None
+    )